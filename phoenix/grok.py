@@ -14,7 +14,7 @@
 
 import logging
 from dataclasses import dataclass
-from typing import NamedTuple, Optional, Sequence, Union
+from typing import List, NamedTuple, Optional, Sequence, Union
 
 import haiku as hk
 import jax
@@ -71,18 +71,38 @@ def make_recsys_attn_mask(
     return attn_mask
 
 
+class KVMemory(NamedTuple):
+    """Keys (after rotary embedding) and values of one attention layer."""
+
+    k: jax.Array  # [B, T, num_kv_heads, key_size]
+    v: jax.Array  # [B, T, num_kv_heads, value_size]
+
+
+class Memory(NamedTuple):
+    """Attention keys and values of a sequence, one KVMemory per layer.
+
+    Lets later positions attend to the sequence without re-running the transformer over it.
+    """
+
+    layers: List[KVMemory]
+    padding_mask: jax.Array  # [B, T], True for valid positions
+
+
 class MHAOutput(NamedTuple):
     """Outputs of the multi-head attention operation."""
 
     embeddings: jax.Array
+    memory: Optional[KVMemory] = None
 
 
 class DecoderOutput(NamedTuple):
     embeddings: jax.Array
+    memory: Optional[KVMemory] = None
 
 
 class TransformerOutput(NamedTuple):
     embeddings: jax.Array
+    memory: Optional[Memory] = None
 
 
 @dataclass
@@ -289,13 +309,29 @@ class MultiHeadAttention(hk.Module):
         key: jax.Array,
         value: jax.Array,
         mask: jax.Array,
+        memory: Optional[KVMemory] = None,
+        offset: int = 0,
     ) -> MHAOutput:
+        """Attention of query over key/value, or over memory and itself if memory is given.
+
+        Args:
+            query, key, value: [B, T, D] inputs
+            mask: [B, 1, T, T], or [B, 1, T, M + 1] with memory of length M: each query
+                then attends to the M memory keys and to its own key (the last column),
+                and the [T, T] logits are never computed
+            memory: Cached keys and values of earlier positions
+            offset: Position of the first query/key, for the rotary embedding
+
+        Returns:
+            MHAOutput with the attention output and the keys/values of this call's positions
+        """
         # In shape hints below, we suppress the leading dims [...] for brevity.
         # Hence e.g. [A, B] should be read in every case as [..., A, B].
         projection = self._linear_projection
 
         # Check that the keys and values have consistent batch size and sequence length.
         assert key.shape[:2] == value.shape[:2], f"key/value shape: {key.shape}/{value.shape}"
+        num_keys = memory.k.shape[1] + 1 if memory is not None else key.shape[1]
 
         if mask is not None:
             assert mask.ndim == 4
@@ -314,7 +350,7 @@ class MultiHeadAttention(hk.Module):
             }, f"mask/query shape: {mask.shape}/{query.shape}"
             assert mask.shape[3] in {
                 1,
-                key.shape[1],
+                num_keys,
             }, f"mask/query shape: {mask.shape}/{key.shape}"
 
         # Compute key/query/values (overload K/Q/V to denote the respective sizes).
@@ -324,8 +360,9 @@ class MultiHeadAttention(hk.Module):
         value_heads = projection(value, self.value_size, self.num_kv_heads, name="value")
 
         rotate = RotaryEmbedding(dim=self.key_size, base_exponent=int(1e4))
-        key_heads = rotate(key_heads, seq_dim=1, offset=0)
-        query_heads = rotate(query_heads, seq_dim=1, offset=0)
+        key_heads = rotate(key_heads, seq_dim=1, offset=offset)
+        query_heads = rotate(query_heads, seq_dim=1, offset=offset)
+        new_memory = KVMemory(k=key_heads, v=value_heads)
 
         b, t, h, d = query_heads.shape
         _, _, kv_h, _ = key_heads.shape
@@ -335,9 +372,14 @@ class MultiHeadAttention(hk.Module):
 
         # Compute attention weights.
         # Attention softmax is always carried out in fp32.
-        attn_logits = jnp.einsum("...thHd,...Thd->...hHtT", query_heads, key_heads).astype(
-            jnp.float32
-        )
+        if memory is None:
+            attn_logits = jnp.einsum("...thHd,...Thd->...hHtT", query_heads, key_heads)
+        else:
+            # [..., T, M] against memory, then [..., T, 1] against each query's own key
+            memory_logits = jnp.einsum("...thHd,...Thd->...hHtT", query_heads, memory.k)
+            self_logits = jnp.einsum("...thHd,...thd->...hHt", query_heads, key_heads)
+            attn_logits = jnp.concatenate([memory_logits, self_logits[..., None]], axis=-1)
+        attn_logits = attn_logits.astype(jnp.float32)
         attn_logits *= self.attn_output_multiplier
         max_attn_val = jnp.array(30.0, dtype=attn_logits.dtype)
         attn_logits = max_attn_val * jnp.tanh(attn_logits / max_attn_val)
@@ -354,13 +396,17 @@ class MultiHeadAttention(hk.Module):
         attn_weights = jax.nn.softmax(attn_logits).astype(query.dtype)  # [H, T', T]
 
         # Weight the values by the attention and flatten the head vectors.
-        attn = jnp.einsum("...hHtT,...Thd->...thHd", attn_weights, value_heads)
+        if memory is None:
+            attn = jnp.einsum("...hHtT,...Thd->...thHd", attn_weights, value_heads)
+        else:
+            attn = jnp.einsum("...hHtT,...Thd->...thHd", attn_weights[..., :-1], memory.v)
+            attn += jnp.einsum("...hHt,...thd->...thHd", attn_weights[..., -1], value_heads)
         leading_dims = attn.shape[:2]
         attn = jnp.reshape(attn, (*leading_dims, -1))  # [T', H*V]
 
         # Apply another projection to get the final embeddings.
         final_projection = Linear(self.model_size, with_bias=False)
-        return MHAOutput(final_projection(attn))
+        return MHAOutput(final_projection(attn), memory=new_memory)
 
     @hk.transparent
     def _linear_projection(
@@ -389,11 +435,14 @@ class MHABlock(hk.Module):
         self,
         inputs: jax.Array,  # [B, T, D]
         mask: jax.Array,  # [B, 1, T, T] or [B, 1, 1, T] or B[1, 1, 1, 1]
+        memory: Optional[KVMemory] = None,
+        offset: int = 0,
     ) -> MHAOutput:
         _, _, model_size = inputs.shape
+        num_keys = memory.k.shape[1] + 1 if memory is not None else inputs.shape[1]
         assert mask.ndim == 4, f"shape: {mask.shape}"
         assert mask.shape[2] in {1, inputs.shape[1]}, str(mask.shape)
-        assert mask.shape[3] in {1, inputs.shape[1]}, str(mask.shape)
+        assert mask.shape[3] in {1, num_keys}, str(mask.shape)
         side_input = inputs
 
         def attn_block(query, key, value, mask) -> MHAOutput:
@@ -403,12 +452,12 @@ class MHABlock(hk.Module):
                 key_size=self.key_size,
                 model_size=model_size,
                 attn_output_multiplier=self.attn_output_multiplier,
-            )(query, key, value, mask)
+            )(query, key, value, mask, memory=memory, offset=offset)
 
         attn_output = attn_block(inputs, side_input, side_input, mask)
         h_attn = attn_output.embeddings
 
-        return MHAOutput(embeddings=h_attn)
+        return MHAOutput(embeddings=h_attn, memory=attn_output.memory)
 
 
 @dataclass
@@ -458,6 +507,8 @@ class DecoderLayer(hk.Module):
         inputs: jax.Array,  # [B, T, D]
         mask: jax.Array,  # [B, 1, T, T] or [B, 1, 1, T]
         padding_mask: Optional[jax.Array],
+        memory: Optional[KVMemory] = None,
+        offset: int = 0,
     ) -> DecoderOutput:
         """Transforms input embedding sequences to output embedding sequences."""
         del padding_mask  # Unused.
@@ -472,7 +523,7 @@ class DecoderLayer(hk.Module):
             num_kv_heads=self.num_kv_heads,
             key_size=self.key_size,
             attn_output_multiplier=self.attn_output_multiplier,
-        )(layer_norm(h), mask)
+        )(layer_norm(h), mask, memory=memory, offset=offset)
         h_attn = attn_output.embeddings
 
         h_attn = layer_norm(h_attn)
@@ -494,6 +545,7 @@ class DecoderLayer(hk.Module):
 
         return DecoderOutput(
             embeddings=h,
+            memory=attn_output.memory,
         )
 
 
@@ -518,6 +570,7 @@ class Transformer(hk.Module):
         embeddings: jax.Array,  # [B, T, D]
         mask: jax.Array,  # [B, T]
         candidate_start_offset: Optional[int] = None,
+        memory: Optional[Memory] = None,
     ) -> TransformerOutput:
         """Transforms input embedding sequences to output embedding sequences.
 
@@ -528,59 +581,81 @@ class Transformer(hk.Module):
                 candidates that can only attend to positions before the offset (user+history)
                 and themselves (self-attention), but not to other candidates.
                 Used for recommendation system inference.
+            memory: If provided, the embeddings are candidates following the cached
+                sequence (user+history) in memory: each attends to all of it and to itself.
 
         Returns:
-            TransformerOutput containing the output embeddings.
+            TransformerOutput containing the output embeddings, and as memory the keys and
+            values of every layer for the positions later candidates attend to: the whole
+            sequence, the positions before candidate_start_offset, or the given memory.
         """
 
         fprop_dtype = embeddings.dtype
-        _, seq_len, _ = embeddings.shape
-        padding_mask = mask.copy()
-        mask = mask[:, None, None, :]  # [B, H=1, T'=1, T]
-
-        if candidate_start_offset is not None:
-            # Use recommendation system attention mask where candidates attend to
-            # user+history and themselves, but not to other candidates
-            attn_mask = make_recsys_attn_mask(seq_len, candidate_start_offset, fprop_dtype)
-            mask = mask * attn_mask
-        else:
-            # Standard causal mask for autoregressive sequence modelling
-            causal_mask = jnp.tril(jnp.ones((1, 1, seq_len, seq_len))).astype(
-                fprop_dtype
-            )  # [B=1, H=1, T, T]
-            mask = mask * causal_mask  # [B, H=1, T, T]
-
-        h = embeddings
-
-        def block(
-            h,
-            mask,
-            padding_mask,
-            layer_index: Optional[int] = None,
-            widening_factor: Optional[int] = None,
-            name: Optional[str] = None,
-        ) -> DecoderOutput:
-            return DecoderLayer(
+
+        layers = [
+            DecoderLayer(
                 num_q_heads=self.num_q_heads,
                 num_kv_heads=self.num_kv_heads,
                 key_size=self.key_size,
-                widening_factor=widening_factor or self.widening_factor,
+                widening_factor=self.widening_factor,
                 num_layers=self.num_layers,
                 attn_output_multiplier=self.attn_output_multiplier,
-                name=name,
-                layer_index=layer_index,
-            )(h, mask, padding_mask)
-
-        for i in range(self.num_layers):
-            decoder_output = block(
-                h,
-                mask,
-                padding_mask,
-                layer_index=i,
                 name=f"decoder_layer_{i}",
+                layer_index=i,
             )
-            h = decoder_output.embeddings
+            for i in range(self.num_layers)
+        ]
 
+        def causal(h: jax.Array, padding_mask: jax.Array) -> TransformerOutput:
+            """Causal self-attention over h; returns the keys/values of h as memory."""
+            seq_len = h.shape[1]
+            # Standard causal mask for autoregressive sequence modelling
+            causal_mask = jnp.tril(jnp.ones((1, 1, seq_len, seq_len))).astype(
+                fprop_dtype
+            )  # [B=1, H=1, T, T]
+            mask = padding_mask[:, None, None, :] * causal_mask  # [B, H=1, T, T]
+            kv_memories = []
+            for layer in layers:
+                decoder_output = layer(h, mask, padding_mask)
+                h = decoder_output.embeddings
+                kv_memories.append(decoder_output.memory)
+            return TransformerOutput(
+                embeddings=h, memory=Memory(layers=kv_memories, padding_mask=padding_mask)
+            )
+
+        def isolated(h: jax.Array, padding_mask: jax.Array, memory: Memory) -> jax.Array:
+            """Each position attends to all of memory and to itself only."""
+            batch_size, seq_len, _ = h.shape
+            prefix_len = memory.padding_mask.shape[1]
+            # [B, 1, T, prefix_len + 1]: keys in memory, then the position's own key
+            prefix_mask = jnp.broadcast_to(
+                memory.padding_mask[:, None, None, :], (batch_size, 1, seq_len, prefix_len)
+            )
+            self_mask = padding_mask[:, None, :, None]
+            mask = jnp.concatenate([prefix_mask, self_mask], axis=-1).astype(fprop_dtype)
+            for layer, layer_memory in zip(layers, memory.layers):
+                h = layer(h, mask, padding_mask, memory=layer_memory, offset=prefix_len).embeddings
+            return h
+
+        if memory is not None:
+            return TransformerOutput(embeddings=isolated(embeddings, mask, memory), memory=memory)
+
+        if candidate_start_offset is None:
+            return causal(embeddings, mask)
+
+        # Recommendation system attention (see make_recsys_attn_mask): user+history is
+        # causal and never sees the candidates, so it runs first; candidates then attend
+        # to its keys/values and to themselves. The candidate-to-candidate block of the
+        # mask, and its logits, are never materialized.
+        prefix = causal(
+            embeddings[:, :candidate_start_offset], mask[:, :candidate_start_offset]
+        )
+        candidates = isolated(
+            embeddings[:, candidate_start_offset:],
+            mask[:, candidate_start_offset:],
+            prefix.memory,  # type: ignore
+        )
         return TransformerOutput(
-            embeddings=h,
+            embeddings=jnp.concatenate([prefix.embeddings, candidates], axis=1),
+            memory=prefix.memory,
         )
@@ -21,6 +21,7 @@ import jax
 import jax.numpy as jnp
 
 from grok import (
+    Memory,
     TransformerConfig,
     Transformer,
     layer_norm,
@@ -362,21 +363,20 @@ class PhoenixModel(hk.Module):
         )
         return unembed_mat
 
-    def build_inputs(
+    def build_user_context_inputs(
         self,
         batch: RecsysBatch,
         recsys_embeddings: RecsysEmbeddings,
-    ) -> Tuple[jax.Array, jax.Array, int]:
-        """Build input embeddings from batch and pre-looked-up embeddings.
+    ) -> Tuple[jax.Array, jax.Array]:
+        """Build the user + history part of the input sequence.
 
         Args:
             batch: RecsysBatch containing hashes, actions, product surfaces
             recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
 
         Returns:
-            embeddings: [B, 1 + history_len + num_candidates, D]
-            padding_mask: [B, 1 + history_len + num_candidates]
-            candidate_start_offset: int - position where candidates start
+            embeddings: [B, 1 + history_len, D]
+            padding_mask: [B, 1 + history_len]
         """
         config = self.config
         hash_config = config.hash_config
@@ -387,12 +387,6 @@ class PhoenixModel(hk.Module):
             config.emb_size,
             "product_surface_embedding_table",
         )
-        candidate_product_surface_embeddings = self._single_hot_to_embeddings(
-            batch.candidate_product_surface,  # type: ignore
-            config.product_surface_vocab_size,
-            config.emb_size,
-            "product_surface_embedding_table",
-        )
 
         history_actions_embeddings = self._get_action_embeddings(batch.history_actions)  # type: ignore
 
@@ -415,6 +409,36 @@ class PhoenixModel(hk.Module):
             1.0,
         )
 
+        embeddings = jnp.concatenate([user_embeddings, history_embeddings], axis=1)
+        padding_mask = jnp.concatenate([user_padding_mask, history_padding_mask], axis=1)
+
+        return embeddings.astype(self.fprop_dtype), padding_mask
+
+    def build_candidate_inputs(
+        self,
+        batch: RecsysBatch,
+        recsys_embeddings: RecsysEmbeddings,
+    ) -> Tuple[jax.Array, jax.Array]:
+        """Build the candidate part of the input sequence.
+
+        Args:
+            batch: RecsysBatch containing hashes, actions, product surfaces
+            recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
+
+        Returns:
+            embeddings: [B, num_candidates, D]
+            padding_mask: [B, num_candidates]
+        """
+        config = self.config
+        hash_config = config.hash_config
+
+        candidate_product_surface_embeddings = self._single_hot_to_embeddings(
+            batch.candidate_product_surface,  # type: ignore
+            config.product_surface_vocab_size,
+            config.emb_size,
+            "product_surface_embedding_table",
+        )
+
         candidate_embeddings, candidate_padding_mask = block_candidate_reduce(
             batch.candidate_post_hashes,  # type: ignore
             recsys_embeddings.candidate_post_embeddings,  # type: ignore
@@ -425,41 +449,91 @@ class PhoenixModel(hk.Module):
             1.0,
         )
 
-        embeddings = jnp.concatenate(
-            [user_embeddings, history_embeddings, candidate_embeddings], axis=1
+        return candidate_embeddings.astype(self.fprop_dtype), candidate_padding_mask
+
+    def build_inputs(
+        self,
+        batch: RecsysBatch,
+        recsys_embeddings: RecsysEmbeddings,
+    ) -> Tuple[jax.Array, jax.Array, int]:
+        """Build input embeddings from batch and pre-looked-up embeddings.
+
+        Args:
+            batch: RecsysBatch containing hashes, actions, product surfaces
+            recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
+
+        Returns:
+            embeddings: [B, 1 + history_len + num_candidates, D]
+            padding_mask: [B, 1 + history_len + num_candidates]
+            candidate_start_offset: int - position where candidates start
+        """
+        user_context_embeddings, user_context_padding_mask = self.build_user_context_inputs(
+            batch, recsys_embeddings
+        )
+        candidate_embeddings, candidate_padding_mask = self.build_candidate_inputs(
+            batch, recsys_embeddings
         )
+
+        embeddings = jnp.concatenate([user_context_embeddings, candidate_embeddings], axis=1)
         padding_mask = jnp.concatenate(
-            [user_padding_mask, history_padding_mask, candidate_padding_mask], axis=1
+            [user_context_padding_mask, candidate_padding_mask], axis=1
         )
 
-        candidate_start_offset = user_padding_mask.shape[1] + history_padding_mask.shape[1]
+        candidate_start_offset = user_context_padding_mask.shape[1]
+
+        return embeddings, padding_mask, candidate_start_offset
+
+    @hk.transparent
+    def encode_user_context(
+        self,
+        batch: RecsysBatch,
+        recsys_embeddings: RecsysEmbeddings,
+    ) -> Memory:
+        """Run the transformer over user + history only, caching its keys and values.
+
+        Candidates attend to user + history but never to each other, so the cache can
+        score any number of candidate chunks (passed to __call__ as user_context), giving
+        the same results as a full forward pass over [user, history, chunk].
 
-        return embeddings.astype(self.fprop_dtype), padding_mask, candidate_start_offset
+        Returns:
+            Memory with per-layer keys/values [B, 1 + history_len, ...] and padding mask
+        """
+        embeddings, padding_mask = self.build_user_context_inputs(batch, recsys_embeddings)
+        return self.model(embeddings, padding_mask).memory  # type: ignore
 
     def __call__(
         self,
         batch: RecsysBatch,
         recsys_embeddings: RecsysEmbeddings,
+        user_context: Optional[Memory] = None,
     ) -> RecsysModelOutput:
         """Forward pass for ranking candidates.
 
         Args:
             batch: RecsysBatch containing hashes, actions, product surfaces
             recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
+            user_context: Memory from encode_user_context. If given, only the candidates
+                are run through the transformer, against the cached user + history, and
+                only the candidate fields of batch and recsys_embeddings are used.
 
         Returns:
             RecsysModelOutput containing logits for each candidate. Shape = [B, num_candidates, num_actions]
         """
-        embeddings, padding_mask, candidate_start_offset = self.build_inputs(
-            batch, recsys_embeddings
-        )
-
-        # transformer
-        model_output = self.model(
-            embeddings,
-            padding_mask,
-            candidate_start_offset=candidate_start_offset,
-        )
+        if user_context is not None:
+            embeddings, padding_mask = self.build_candidate_inputs(batch, recsys_embeddings)
+            model_output = self.model(embeddings, padding_mask, memory=user_context)
+            candidate_start_offset = 0
+        else:
+            embeddings, padding_mask, candidate_start_offset = self.build_inputs(
+                batch, recsys_embeddings
+            )
+
+            # transformer
+            model_output = self.model(
+                embeddings,
+                padding_mask,
+                candidate_start_offset=candidate_start_offset,
+            )
 
         out_embeddings = model_output.embeddings
 
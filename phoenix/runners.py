@@ -14,17 +14,18 @@
 
 
 import functools
+import itertools
 import logging
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, List, NamedTuple, Optional, Tuple
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 import haiku as hk
 import jax
 import jax.numpy as jnp
 import numpy as np
 
-from grok import TrainingState
+from grok import Memory, TrainingState
 from recsys_retrieval_model import PhoenixRetrievalModelConfig
 from recsys_retrieval_model import RetrievalOutput as ModelRetrievalOutput
 
@@ -225,33 +226,226 @@ ACTIONS: List[str] = [
 class RankingOutput(NamedTuple):
     """Output from ranking candidates.
 
-    Contains both the raw scores array and individual probability fields
-    for each engagement type.
+    Contains the raw scores array, the weighted scores candidates are ranked by, and
+    individual probability fields for each engagement type (None unless the runner
+    was created with per_action_outputs=True).
     """
 
     scores: jax.Array
 
     ranked_indices: jax.Array
 
-    p_favorite_score: jax.Array
-    p_reply_score: jax.Array
-    p_repost_score: jax.Array
-    p_photo_expand_score: jax.Array
-    p_click_score: jax.Array
-    p_profile_click_score: jax.Array
-    p_vqv_score: jax.Array
-    p_share_score: jax.Array
-    p_share_via_dm_score: jax.Array
-    p_share_via_copy_link_score: jax.Array
-    p_dwell_score: jax.Array
-    p_quote_score: jax.Array
-    p_quoted_click_score: jax.Array
-    p_follow_author_score: jax.Array
-    p_not_interested_score: jax.Array
-    p_block_author_score: jax.Array
-    p_mute_author_score: jax.Array
-    p_report_score: jax.Array
-    p_dwell_time: jax.Array
+    p_favorite_score: Optional[jax.Array]
+    p_reply_score: Optional[jax.Array]
+    p_repost_score: Optional[jax.Array]
+    p_photo_expand_score: Optional[jax.Array]
+    p_click_score: Optional[jax.Array]
+    p_profile_click_score: Optional[jax.Array]
+    p_vqv_score: Optional[jax.Array]
+    p_share_score: Optional[jax.Array]
+    p_share_via_dm_score: Optional[jax.Array]
+    p_share_via_copy_link_score: Optional[jax.Array]
+    p_dwell_score: Optional[jax.Array]
+    p_quote_score: Optional[jax.Array]
+    p_quoted_click_score: Optional[jax.Array]
+    p_follow_author_score: Optional[jax.Array]
+    p_not_interested_score: Optional[jax.Array]
+    p_block_author_score: Optional[jax.Array]
+    p_mute_author_score: Optional[jax.Array]
+    p_report_score: Optional[jax.Array]
+    p_dwell_time: Optional[jax.Array]
+
+    weighted_scores: Optional[jax.Array] = None
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    """Per-action weights of the home-mixer WeightedScorer (scorers/weighted_scorer.rs).
+
+    weighted_scores mirrors WeightedScorer::compute_weighted_score: the weighted sum
+    of action probabilities (the VQV weight only applies to videos longer than
+    min_video_duration_ms), then offset so that negative sums stay below positive ones.
+    The per-candidate normalize_score step is left to home-mixer. The defaults rank
+    by favorite probability alone.
+    """
+
+    favorite_weight: float = 1.0
+    reply_weight: float = 0.0
+    repost_weight: float = 0.0
+    photo_expand_weight: float = 0.0
+    click_weight: float = 0.0
+    profile_click_weight: float = 0.0
+    vqv_weight: float = 0.0
+    share_weight: float = 0.0
+    share_via_dm_weight: float = 0.0
+    share_via_copy_link_weight: float = 0.0
+    dwell_weight: float = 0.0
+    quote_weight: float = 0.0
+    quoted_click_weight: float = 0.0
+    follow_author_weight: float = 0.0
+    not_interested_weight: float = 0.0
+    block_author_weight: float = 0.0
+    mute_author_weight: float = 0.0
+    report_weight: float = 0.0
+    dwell_time_weight: float = 0.0
+
+    min_video_duration_ms: int = 0
+    negative_scores_offset: float = 0.0
+    # Default to the sum of absolute weights and of negated negative weights
+    weights_sum: Optional[float] = None
+    negative_weights_sum: Optional[float] = None
+
+    def vector(self, vqv_eligible: bool = True) -> np.ndarray:
+        """Weights in ACTIONS order [num_actions]."""
+        weights = [getattr(self, action.removesuffix("_score") + "_weight") for action in ACTIONS]
+        if not vqv_eligible:
+            weights[ACTIONS.index("vqv_score")] = 0.0
+        return np.array(weights, dtype=np.float32)
+
+    def sums(self) -> Tuple[float, float]:
+        """(weights_sum, negative_weights_sum) used to offset negative scores."""
+        weights = self.vector()
+        weights_sum = self.weights_sum
+        if weights_sum is None:
+            weights_sum = float(np.abs(weights).sum())
+        negative_weights_sum = self.negative_weights_sum
+        if negative_weights_sum is None:
+            negative_weights_sum = float(-weights[weights < 0].sum())
+        return weights_sum, negative_weights_sum
+
+    def head(self) -> "ScoringHead":
+        """The weights as inputs of the compiled ranking graph."""
+        weights_sum, negative_weights_sum = self.sums()
+        return ScoringHead(
+            weights=np.stack([self.vector(vqv_eligible=False), self.vector()], axis=1),
+            min_video_duration_ms=np.int32(self.min_video_duration_ms),
+            negative_scores_offset=np.float32(self.negative_scores_offset),
+            weights_sum=np.float32(weights_sum),
+            negative_weights_sum=np.float32(negative_weights_sum),
+        )
+
+    def weighted_scores(
+        self, probs: np.ndarray, video_duration_ms: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Weighted scores of candidates.
+
+        Args:
+            probs: Action probabilities [..., num_actions]
+            video_duration_ms: Video durations [...], 0 or None for posts without video
+
+        Returns:
+            Weighted scores [...]
+        """
+        probs = np.asarray(probs, dtype=np.float32)
+        if video_duration_ms is None:
+            video_duration_ms = np.zeros(probs.shape[:-1], dtype=np.int32)
+        return np.asarray(weighted_scores(self.head(), probs, video_duration_ms))
+
+
+class ScoringHead(NamedTuple):
+    """ScoringWeights as arrays, so changing weights does not recompile the graph."""
+
+    weights: jax.typing.ArrayLike  # [num_actions, 2]: without, then with the VQV weight
+    min_video_duration_ms: jax.typing.ArrayLike
+    negative_scores_offset: jax.typing.ArrayLike
+    weights_sum: jax.typing.ArrayLike
+    negative_weights_sum: jax.typing.ArrayLike
+
+
+def weighted_scores(
+    head: ScoringHead, probs: jax.Array, video_duration_ms: jax.Array
+) -> jax.Array:
+    """WeightedScorer::compute_weighted_score of every candidate, as one matmul.
+
+    Args:
+        head: ScoringWeights.head()
+        probs: Action probabilities [..., num_actions]
+        video_duration_ms: Video durations [...], 0 for posts without video
+
+    Returns:
+        Weighted scores [...] (float32)
+    """
+    # Both weightings at once; the VQV weight only counts for long enough videos
+    combined = jnp.dot(probs.astype(jnp.float32), head.weights)
+    vqv_eligible = video_duration_ms > head.min_video_duration_ms
+    combined = jnp.where(vqv_eligible, combined[..., 1], combined[..., 0])
+
+    weights_sum = jnp.where(head.weights_sum == 0.0, 1.0, head.weights_sum)
+    offset = jnp.where(
+        combined < 0.0,
+        (combined + head.negative_weights_sum) / weights_sum * head.negative_scores_offset,
+        combined + head.negative_scores_offset,
+    )
+    return jnp.where(head.weights_sum == 0.0, jnp.maximum(combined, 0.0), offset)
+
+
+class TopKRanking(NamedTuple):
+    """The top candidates of a ranking, best first."""
+
+    indices: np.ndarray  # [B, K] positions in the ranked candidate list
+    weighted_scores: np.ndarray  # [B, K]
+    scores: np.ndarray  # [B, K, num_actions] action probabilities
+
+
+def bucket_sizes(max_size: int) -> Tuple[int, ...]:
+    """Powers of two below max_size, followed by max_size itself."""
+    sizes = []
+    size = 1
+    while size < max_size:
+        sizes.append(size)
+        size *= 2
+    return tuple(sizes) + (max_size,)
+
+
+def _smallest_fit(sizes: Sequence[int], size: int) -> int:
+    """Smallest bucket holding size, or size itself if it exceeds every bucket."""
+    return min((s for s in sizes if s >= size), default=size)
+
+
+@dataclass(frozen=True)
+class ShapeBuckets:
+    """Padded shapes the compiled ranking path is built for.
+
+    A request of shape (batch_size, history_len, num_candidates) is padded up to the
+    smallest bucket in each dimension. A dimension larger than all of its buckets is
+    compiled at its exact size (and counted as a compile-cache miss).
+    """
+
+    batch_sizes: Tuple[int, ...]
+    history_lens: Tuple[int, ...]
+    candidate_counts: Tuple[int, ...]
+
+    def bucket(self, batch_size: int, history_len: int, num_candidates: int) -> Tuple[int, int, int]:
+        return (
+            _smallest_fit(self.batch_sizes, batch_size),
+            _smallest_fit(self.history_lens, history_len),
+            _smallest_fit(self.candidate_counts, num_candidates),
+        )
+
+    def all(self) -> List[Tuple[int, int, int]]:
+        return list(itertools.product(self.batch_sizes, self.history_lens, self.candidate_counts))
+
+
+@dataclass
+class CompileCacheStats:
+    """Compile-cache counters of the bucketed ranking path."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+def _embedding_arrays(recsys_embeddings: RecsysEmbeddings) -> Tuple[Any, ...]:
+    """RecsysEmbeddings fields as a tuple (the dataclass is not a JAX pytree)."""
+    return tuple(getattr(recsys_embeddings, f.name) for f in fields(recsys_embeddings))
+
+
+def _pad_to(x: Any, template: np.ndarray) -> np.ndarray:
+    """Copy x into the leading corner of a zero template (zeros are padding)."""
+    x = np.asarray(x, dtype=template.dtype)
+    if x.shape == template.shape:
+        return x
+    template[tuple(slice(0, n) for n in x.shape)] = x
+    return template
 
 
 @dataclass
@@ -300,20 +494,56 @@ class ModelRunner(BaseModelRunner):
 
 @dataclass
 class RecsysInferenceRunner(BaseInferenceRunner):
-    """Inference runner for the recommendation ranking model."""
+    """Inference runner for the recommendation ranking model.
+
+    Ranking runs through a jit-compiled path: requests are padded to the nearest
+    shape bucket and dispatched to an executable compiled ahead of time for it.
+    """
 
     _runner: ModelRunner
 
-    def __init__(self, runner: ModelRunner, name: str):
+    buckets: Optional[ShapeBuckets] = None
+
+    def __init__(
+        self,
+        runner: ModelRunner,
+        name: str,
+        buckets: Optional[ShapeBuckets] = None,
+        scoring_weights: Optional[ScoringWeights] = None,
+        per_action_outputs: bool = True,
+    ):
         self.name = name
         self._runner = runner
+        self.buckets = buckets
+        self.scoring_weights = scoring_weights or ScoringWeights()
+        self.per_action_outputs = per_action_outputs
+        self.compile_stats = CompileCacheStats()
 
     @property
     def runner(self) -> ModelRunner:
         return self._runner
 
-    def initialize(self):
-        """Initialize the inference runner."""
+    def default_buckets(self) -> ShapeBuckets:
+        """Power-of-two batch and candidate buckets up to the configured sizes.
+
+        History is only padded to the configured history_seq_len: rotary position
+        encodings make candidate scores depend on where candidates start, so padding
+        a history further would change the scores.
+        """
+        model_config = self.runner.model
+        return ShapeBuckets(
+            batch_sizes=bucket_sizes(self.runner.batch_size),
+            history_lens=(model_config.history_seq_len,),
+            candidate_counts=bucket_sizes(model_config.candidate_seq_len),
+        )
+
+    def initialize(self, warmup: bool = True):
+        """Initialize the inference runner.
+
+        Args:
+            warmup: Compile the ranking path for every shape bucket now rather than on
+                the first request of each shape
+        """
         runner = self.runner
 
         dummy_batch = self.create_dummy_batch(batch_size=1)
@@ -333,57 +563,378 @@ class RecsysInferenceRunner(BaseInferenceRunner):
         ) -> RecsysModelOutput:
             return model()(batch, recsys_embeddings)
 
-        def hk_rank_candidates(
-            batch: RecsysBatch, recsys_embeddings: RecsysEmbeddings
+        def rank_logits(
+            logits: jax.Array,
+            batch: RecsysBatch,
+            video_duration_ms: Optional[jax.Array],
+            head: Optional[ScoringHead],
+            top_k: Optional[int],
         ) -> RankingOutput:
-            """Rank candidates by their predicted engagement scores."""
-            output = hk_forward(batch, recsys_embeddings)
-            logits = output.logits
-
+            """Rank candidates by the weighted combination of their predicted engagement."""
             probs = jax.nn.sigmoid(logits)
 
-            primary_scores = probs[:, :, 0]
-
-            ranked_indices = jnp.argsort(-primary_scores, axis=-1)
-
+            if video_duration_ms is None:
+                video_duration_ms = jnp.zeros(probs.shape[:2], dtype=jnp.int32)
+            if head is None:
+                head = self.scoring_weights.head()
+            scores = weighted_scores(head, probs, video_duration_ms)
+            # Padding candidates (hash 0) rank last
+            candidate_padding_mask = jnp.asarray(batch.candidate_post_hashes)[:, :, 0] != 0
+            scores = jnp.where(candidate_padding_mask, scores, -jnp.inf)
+
+            _, ranked_indices = jax.lax.top_k(scores, top_k or scores.shape[-1])
+
+            per_action = {
+                f"p_{action}": probs[:, :, i] if self.per_action_outputs else None
+                for i, action in enumerate(ACTIONS)
+            }
             return RankingOutput(
                 scores=probs,
                 ranked_indices=ranked_indices,
-                p_favorite_score=probs[:, :, 0],
-                p_reply_score=probs[:, :, 1],
-                p_repost_score=probs[:, :, 2],
-                p_photo_expand_score=probs[:, :, 3],
-                p_click_score=probs[:, :, 4],
-                p_profile_click_score=probs[:, :, 5],
-                p_vqv_score=probs[:, :, 6],
-                p_share_score=probs[:, :, 7],
-                p_share_via_dm_score=probs[:, :, 8],
-                p_share_via_copy_link_score=probs[:, :, 9],
-                p_dwell_score=probs[:, :, 10],
-                p_quote_score=probs[:, :, 11],
-                p_quoted_click_score=probs[:, :, 12],
-                p_follow_author_score=probs[:, :, 13],
-                p_not_interested_score=probs[:, :, 14],
-                p_block_author_score=probs[:, :, 15],
-                p_mute_author_score=probs[:, :, 16],
-                p_report_score=probs[:, :, 17],
-                p_dwell_time=probs[:, :, 18],
+                weighted_scores=scores,
+                **per_action,
             )
 
+        def hk_rank_candidates(
+            batch: RecsysBatch,
+            recsys_embeddings: RecsysEmbeddings,
+            video_duration_ms: Optional[jax.Array] = None,
+            head: Optional[ScoringHead] = None,
+            top_k: Optional[int] = None,
+        ) -> RankingOutput:
+            """Rank candidates by their predicted engagement scores."""
+            logits = hk_forward(batch, recsys_embeddings).logits
+            return rank_logits(logits, batch, video_duration_ms, head, top_k)
+
+        def hk_encode_user_context(
+            batch: RecsysBatch, embeddings: Tuple[jax.Array, ...]
+        ) -> Memory:
+            """Encode user + history into per-layer keys and values."""
+            return model().encode_user_context(batch, RecsysEmbeddings(*embeddings))
+
+        def hk_rank_with_user_context(
+            user_context: Memory,
+            batch: RecsysBatch,
+            embeddings: Tuple[jax.Array, ...],
+            video_duration_ms: jax.Array,
+            head: ScoringHead,
+            top_k: Optional[int] = None,
+        ) -> RankingOutput:
+            """Rank a chunk of candidates against an encoded user context."""
+            output = model()(batch, RecsysEmbeddings(*embeddings), user_context=user_context)
+            return rank_logits(output.logits, batch, video_duration_ms, head, top_k)
+
         rank_ = hk.without_apply_rng(hk.transform(hk_rank_candidates))
         self.rank_candidates = rank_.apply
 
-    def rank(self, batch: RecsysBatch, recsys_embeddings: RecsysEmbeddings) -> RankingOutput:
-        """Rank candidates for the given batch.
+        encode_user_context_ = hk.without_apply_rng(hk.transform(hk_encode_user_context))
+        rank_with_user_context_ = hk.without_apply_rng(hk.transform(hk_rank_with_user_context))
+        self.encode_user_context_fn = jax.jit(encode_user_context_.apply)
+        self.rank_with_user_context_fn = jax.jit(
+            rank_with_user_context_.apply, static_argnames="top_k"
+        )
+
+        def rank_arrays(
+            params: hk.Params,
+            batch: RecsysBatch,
+            embeddings: Tuple[jax.Array, ...],
+            video_duration_ms: jax.Array,
+            head: ScoringHead,
+        ) -> RankingOutput:
+            return rank_.apply(
+                params, batch, RecsysEmbeddings(*embeddings), video_duration_ms, head
+            )
+
+        self._rank_jit = jax.jit(rank_arrays)
+        self._compiled: Dict[Tuple[int, int, int], Any] = {}
+        if self.buckets is None:
+            self.buckets = self.default_buckets()
+        if warmup:
+            self.warmup()
+
+    def warmup(self):
+        """Compile the ranking path for every shape bucket ahead of time."""
+        assert self.buckets is not None
+        for bucket in self.buckets.all():
+            if bucket not in self._compiled:
+                self._compile(bucket)
+
+    def _bucket_inputs(self, bucket: Tuple[int, int, int]) -> Tuple[RecsysBatch, RecsysEmbeddings]:
+        """Zero (all padding) inputs of a bucket's shape."""
+        batch_size, history_len, num_candidates = bucket
+        model_config = self.runner.model
+        batch = create_dummy_batch_from_config(
+            hash_config=model_config.hash_config,
+            history_len=history_len,
+            num_candidates=num_candidates,
+            num_actions=self._get_num_actions(),
+            batch_size=batch_size,
+        )
+        embeddings = create_dummy_embeddings_from_config(
+            hash_config=model_config.hash_config,
+            emb_size=model_config.emb_size,
+            history_len=history_len,
+            num_candidates=num_candidates,
+            batch_size=batch_size,
+        )
+        return batch, embeddings
+
+    def _compile(self, bucket: Tuple[int, int, int]):
+        rank_logger.info(f"Compiling ranking path for (batch, history, candidates) = {bucket}")
+        batch, embeddings = self._bucket_inputs(bucket)
+        video_duration_ms = np.zeros((bucket[0], bucket[2]), dtype=np.int32)
+        compiled = self._rank_jit.lower(
+            self.params,
+            batch,
+            _embedding_arrays(embeddings),
+            video_duration_ms,
+            self.scoring_weights.head(),
+        ).compile()
+        self._compiled[bucket] = compiled
+        return compiled
+
+    def _pad(
+        self,
+        batch: RecsysBatch,
+        recsys_embeddings: RecsysEmbeddings,
+        bucket: Tuple[int, int, int],
+    ) -> Tuple[RecsysBatch, Tuple[np.ndarray, ...]]:
+        """Pad a request to a bucket with zero hashes, which the model masks out."""
+        batch_template, embeddings_template = self._bucket_inputs(bucket)
+        padded_batch = RecsysBatch(*(_pad_to(x, t) for x, t in zip(batch, batch_template)))
+        padded_embeddings = tuple(
+            _pad_to(x, t)
+            for x, t in zip(
+                _embedding_arrays(recsys_embeddings), _embedding_arrays(embeddings_template)
+            )
+        )
+        return padded_batch, padded_embeddings
+
+    def encode_user_context(
+        self, batch: RecsysBatch, recsys_embeddings: RecsysEmbeddings
+    ) -> Memory:
+        """Encode the user and history of a batch once, for rank_with_user_context.
 
         Args:
-            batch: RecsysBatch containing hashes, actions, product surfaces
+            batch: RecsysBatch containing user and history information
             recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
 
+        Returns:
+            Memory with the per-layer keys and values of user + history
+        """
+        return self.encode_user_context_fn(
+            self.params, batch, _embedding_arrays(recsys_embeddings)
+        )
+
+    def rank_with_user_context(
+        self,
+        user_context: Memory,
+        batch: RecsysBatch,
+        recsys_embeddings: RecsysEmbeddings,
+        video_duration_ms: Optional[np.ndarray] = None,
+        top_k: Optional[int] = None,
+    ) -> RankingOutput:
+        """Rank the candidates of a batch against an encoded user context.
+
+        Gives the same scores as rank() on the batch with that user and history, without
+        running the transformer over the history again. Only the candidate fields of
+        batch and recsys_embeddings are used.
+
+        Args:
+            user_context: Memory from encode_user_context
+            batch: RecsysBatch containing candidate information
+            recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
+            video_duration_ms: Candidate video durations [B, C] for VQV eligibility;
+                None if no candidate is a video
+            top_k: Number of ranked indices to return per user (all candidates if None)
+
         Returns:
             RankingOutput with scores and ranked indices
         """
-        return self.rank_candidates(self.params, batch, recsys_embeddings)
+        if video_duration_ms is None:
+            video_duration_ms = np.zeros(np.shape(batch.candidate_post_hashes)[:2], np.int32)
+        return self.rank_with_user_context_fn(
+            self.params,
+            user_context,
+            batch,
+            _embedding_arrays(recsys_embeddings),
+            video_duration_ms,
+            self.scoring_weights.head(),
+            top_k=top_k,
+        )
+
+    def rank(
+        self,
+        batch: RecsysBatch,
+        recsys_embeddings: RecsysEmbeddings,
+        video_duration_ms: Optional[np.ndarray] = None,
+    ) -> RankingOutput:
+        """Rank candidates for the given batch by their weighted scores.
+
+        The request is padded to its shape bucket and ranked by the executable compiled
+        for that bucket; padded rows and candidates are dropped from the output.
+
+        Args:
+            batch: RecsysBatch containing hashes, actions, product surfaces
+            recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
+            video_duration_ms: Candidate video durations [B, C] for VQV eligibility;
+                None if no candidate is a video
+
+        Returns:
+            RankingOutput with scores and ranked indices, as host (numpy) arrays
+        """
+        assert self.buckets is not None, "initialize() must be called before rank()"
+        batch_size, num_candidates = np.shape(batch.candidate_post_hashes)[:2]
+        history_len = np.shape(batch.history_post_hashes)[1]
+        bucket = self.buckets.bucket(batch_size, history_len, num_candidates)
+
+        compiled = self._compiled.get(bucket)
+        if compiled is None:
+            self.compile_stats.misses += 1
+            compiled = self._compile(bucket)
+        else:
+            self.compile_stats.hits += 1
+
+        padded_batch, padded_embeddings = self._pad(batch, recsys_embeddings, bucket)
+        durations = np.zeros((bucket[0], bucket[2]), dtype=np.int32)
+        if video_duration_ms is not None:
+            durations = _pad_to(np.asarray(video_duration_ms, dtype=np.int32), durations)
+        output = jax.device_get(
+            compiled(
+                self.params,
+                padded_batch,
+                padded_embeddings,
+                durations,
+                self.scoring_weights.head(),
+            )
+        )
+        if bucket[0] == batch_size and bucket[2] == num_candidates:
+            return output
+
+        # Padded candidates rank among the real ones; keep the real ones in order
+        ranked_indices = output.ranked_indices[:batch_size]
+        ranked_indices = ranked_indices[ranked_indices < num_candidates].reshape(
+            batch_size, num_candidates
+        )
+        return output._replace(
+            ranked_indices=ranked_indices,
+            **{
+                name: x[:batch_size, :num_candidates]
+                for name, x in output._asdict().items()
+                if x is not None and name != "ranked_indices"
+            },
+        )
+
+    def rank_many(
+        self,
+        batch: RecsysBatch,
+        recsys_embeddings: RecsysEmbeddings,
+        top_k: int = 100,
+        video_duration_ms: Optional[np.ndarray] = None,
+        chunk_size: Optional[int] = None,
+    ) -> TopKRanking:
+        """Rank any number of candidates, keeping the top_k by weighted score.
+
+        User and history are encoded once (encode_user_context). The candidates are
+        then scored in chunks of chunk_size against it, the last chunk padded. Each
+        chunk is dispatched before the previous one's results are read back. Weighted
+        scores and each chunk's top_k are computed in the ranking graph; only those are
+        merged into the running top_k on the host.
+
+        Args:
+            batch: RecsysBatch with any number of candidates
+            recsys_embeddings: RecsysEmbeddings containing pre-looked-up embeddings
+            top_k: Number of candidates to return per user
+            video_duration_ms: Candidate video durations [B, num_candidates] for VQV
+                eligibility; None if no candidate is a video
+            chunk_size: Candidates per model call. Defaults to candidate_seq_len, the
+                number of candidate positions the model was trained with.
+
+        Returns:
+            TopKRanking of the best min(top_k, num_candidates) candidates
+        """
+        chunk_size = chunk_size or self.runner.model.candidate_seq_len
+        batch_size, num_candidates = np.shape(batch.candidate_post_hashes)[:2]
+        if video_duration_ms is not None:
+            video_duration_ms = np.asarray(video_duration_ms, dtype=np.int32)
+
+        user_context = self.encode_user_context(batch, recsys_embeddings)
+        candidate_batch_fields = {
+            "candidate_post_hashes",
+            "candidate_author_hashes",
+            "candidate_product_surface",
+        }
+        candidate_embedding_fields = {"candidate_post_embeddings", "candidate_author_embeddings"}
+        chunk_batch, chunk_embeddings = self._bucket_inputs((batch_size, 0, chunk_size))
+
+        def dispatch(start: int):
+            """Start scoring candidates [start, start + chunk_size) on the device."""
+            end = min(start + chunk_size, num_candidates)
+            padded = chunk_batch._replace(
+                **{
+                    name: _pad_to(
+                        np.asarray(getattr(batch, name))[:, start:end],
+                        np.zeros_like(getattr(chunk_batch, name)),
+                    )
+                    for name in candidate_batch_fields
+                }
+            )
+            embeddings = RecsysEmbeddings(
+                **{
+                    f.name: (
+                        _pad_to(
+                            np.asarray(getattr(recsys_embeddings, f.name))[:, start:end],
+                            np.zeros_like(getattr(chunk_embeddings, f.name)),
+                        )
+                        if f.name in candidate_embedding_fields
+                        else getattr(chunk_embeddings, f.name)
+                    )
+                    for f in fields(RecsysEmbeddings)
+                }
+            )
+            durations = np.zeros((batch_size, chunk_size), dtype=np.int32)
+            if video_duration_ms is not None:
+                durations = _pad_to(video_duration_ms[:, start:end], durations)
+            output = self.rank_with_user_context(
+                user_context, padded, embeddings, durations, top_k=min(top_k, chunk_size)
+            )
+            return start, end, output
+
+        best_indices = np.zeros((batch_size, 0), dtype=np.int64)
+        best_scores = np.zeros((batch_size, 0), dtype=np.float32)
+        best_probs = np.zeros((batch_size, 0, self._get_num_actions()), dtype=np.float32)
+
+        pending = None
+        for start in itertools.chain(range(0, num_candidates, chunk_size), [None]):
+            # Queue the next chunk before blocking on the previous one's results
+            dispatched = dispatch(start) if start is not None else None
+            if pending is not None:
+                chunk_start, chunk_end, output = pending
+                # Padding ranks last in the chunk's top-k; keep the real candidates only
+                ranked = np.asarray(output.ranked_indices)[:, : chunk_end - chunk_start]
+                scores = np.asarray(output.weighted_scores)
+                probs = np.asarray(output.scores, dtype=np.float32)
+                best_indices = np.concatenate([best_indices, ranked + chunk_start], axis=1)
+                best_scores = np.concatenate(
+                    [best_scores, np.take_along_axis(scores, ranked, axis=1)], axis=1
+                )
+                best_probs = np.concatenate(
+                    [best_probs, np.take_along_axis(probs, ranked[:, :, None], axis=1)], axis=1
+                )
+                if best_scores.shape[1] > top_k:
+                    keep = np.argpartition(-best_scores, top_k - 1, axis=1)[:, :top_k]
+                    best_indices = np.take_along_axis(best_indices, keep, axis=1)
+                    best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                    best_probs = np.take_along_axis(best_probs, keep[:, :, None], axis=1)
+            pending = dispatched
+
+        # Best first, ties by candidate position
+        order = np.lexsort((best_indices, -best_scores), axis=1)
+        return TopKRanking(
+            indices=np.take_along_axis(best_indices, order, axis=1),
+            weighted_scores=np.take_along_axis(best_scores, order, axis=1),
+            scores=np.take_along_axis(best_probs, order[:, :, None], axis=1),
+        )
 
 
 def create_example_batch(
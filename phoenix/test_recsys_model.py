@@ -12,11 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import haiku as hk
+import jax
 import jax.numpy as jnp
 import numpy as np
 import pytest
 
-from grok import make_recsys_attn_mask
+from grok import DecoderLayer, TransformerConfig, make_recsys_attn_mask
+from recsys_model import HashConfig, PhoenixModelConfig
+from recsys_model import RecsysEmbeddings
+from runners import (
+    ACTIONS,
+    ModelRunner,
+    RecsysInferenceRunner,
+    ScoringWeights,
+    ShapeBuckets,
+    bucket_sizes,
+    create_example_batch,
+)
 
 
 class TestMakeRecsysAttnMask:
@@ -183,5 +196,353 @@ class TestMakeRecsysAttnMask:
         np.testing.assert_array_equal(np.array(mask_2d), expected)
 
 
+class TestCandidateIsolatedAttention:
+    """The transformer's recsys path must equal attention under make_recsys_attn_mask."""
+
+    def test_matches_dense_recsys_mask(self):
+        config = TransformerConfig(
+            emb_size=32,
+            widening_factor=2,
+            key_size=16,
+            num_q_heads=4,
+            num_kv_heads=2,
+            num_layers=2,
+            attn_output_multiplier=0.125,
+        )
+        batch_size, seq_len, candidate_start_offset = 2, 12, 7
+
+        def forward(embeddings, padding_mask):
+            return config.make()(embeddings, padding_mask, candidate_start_offset).embeddings
+
+        def dense_forward(embeddings, padding_mask):
+            mask = padding_mask[:, None, None, :] * make_recsys_attn_mask(
+                seq_len, candidate_start_offset
+            )
+            h = embeddings
+            with hk.name_scope("transformer"):
+                for i in range(config.num_layers):
+                    h = DecoderLayer(
+                        num_q_heads=config.num_q_heads,
+                        num_kv_heads=config.num_kv_heads,
+                        key_size=config.key_size,
+                        num_layers=config.num_layers,
+                        widening_factor=config.widening_factor,
+                        attn_output_multiplier=config.attn_output_multiplier,
+                        name=f"decoder_layer_{i}",
+                    )(h, mask, padding_mask).embeddings
+            return h
+
+        rng = np.random.default_rng(0)
+        embeddings = jnp.asarray(rng.normal(size=(batch_size, seq_len, 32)), jnp.float32)
+        padding_mask = jnp.asarray(rng.random((batch_size, seq_len)) > 0.2)
+
+        forward_fn = hk.without_apply_rng(hk.transform(forward))
+        params = forward_fn.init(jax.random.PRNGKey(0), embeddings, padding_mask)
+        params = jax.tree.map(lambda p: p + 0.2 * rng.normal(size=p.shape), params)
+
+        np.testing.assert_allclose(
+            forward_fn.apply(params, embeddings, padding_mask),
+            hk.without_apply_rng(hk.transform(dense_forward)).apply(
+                params, embeddings, padding_mask
+            ),
+            rtol=1e-5,
+            atol=1e-5,
+        )
+
+
+def make_ranking_runner(buckets=None, **kwargs) -> RecsysInferenceRunner:
+    """A small ranking runner with random (non-zero) parameters."""
+    config = PhoenixModelConfig(
+        emb_size=64,
+        num_actions=len(ACTIONS),
+        history_seq_len=16,
+        candidate_seq_len=8,
+        hash_config=HashConfig(),
+        model=TransformerConfig(
+            emb_size=64,
+            widening_factor=2,
+            key_size=32,
+            num_q_heads=2,
+            num_kv_heads=2,
+            num_layers=1,
+            attn_output_multiplier=0.125,
+        ),
+    )
+    runner = RecsysInferenceRunner(
+        runner=ModelRunner(model=config, bs_per_device=0.125),
+        name="test_ranking",
+        buckets=buckets,
+        **kwargs,
+    )
+    runner.initialize(warmup=False)
+    rng = np.random.default_rng(0)
+    runner.params = jax.tree.map(
+        lambda p: (p + 0.2 * rng.normal(size=p.shape)).astype(p.dtype), runner.params
+    )
+    return runner
+
+
+def example_batch(batch_size, num_candidates, history_len=16):
+    return create_example_batch(
+        batch_size=batch_size,
+        emb_size=64,
+        history_len=history_len,
+        num_candidates=num_candidates,
+        num_actions=len(ACTIONS),
+    )
+
+
+class TestRecsysInferenceRunner:
+    """Tests for the compiled, shape-bucketed ranking path."""
+
+    def test_bucket_sizes(self):
+        assert bucket_sizes(1) == (1,)
+        assert bucket_sizes(8) == (1, 2, 4, 8)
+        assert bucket_sizes(12) == (1, 2, 4, 8, 12)
+
+    def test_bucket_selection(self):
+        buckets = ShapeBuckets(batch_sizes=(1, 4), history_lens=(16,), candidate_counts=(4, 8))
+        assert buckets.bucket(1, 16, 4) == (1, 16, 4)
+        assert buckets.bucket(3, 10, 5) == (4, 16, 8)
+        # Beyond the largest bucket a dimension keeps its exact size
+        assert buckets.bucket(6, 16, 9) == (6, 16, 9)
+        assert len(buckets.all()) == 4
+
+    def test_parameter_names(self):
+        runner = make_ranking_runner()
+        assert {"phoenix_model", "phoenix_model/rms_norm"} <= set(runner.params)
+        assert "transformer/decoder_layer_0/multi_head_attention/query" in runner.params
+
+    def test_default_buckets(self):
+        runner = make_ranking_runner()
+        assert runner.buckets == ShapeBuckets(
+            batch_sizes=(1,), history_lens=(16,), candidate_counts=(1, 2, 4, 8)
+        )
+
+    def test_compiled_rank_matches_eager(self):
+        runner = make_ranking_runner(buckets=ShapeBuckets((2,), (16,), (8,)))
+        batch, embeddings = example_batch(batch_size=2, num_candidates=8)
+
+        expected = runner.rank_candidates(runner.params, batch, embeddings)
+        output = runner.rank(batch, embeddings)
+
+        np.testing.assert_allclose(
+            np.asarray(output.scores, np.float32), np.asarray(expected.scores, np.float32), atol=1e-2
+        )
+        np.testing.assert_array_equal(
+            np.asarray(output.p_reply_score), np.asarray(output.scores)[:, :, 1]
+        )
+
+    def test_padded_rank_matches_unpadded(self):
+        """Padding the batch and candidate dimensions does not change any score."""
+        runner = make_ranking_runner(buckets=ShapeBuckets((1, 4), (16,), (4, 8)))
+        batch, embeddings = example_batch(batch_size=3, num_candidates=5)
+
+        expected = runner.rank_candidates(runner.params, batch, embeddings)
+        output = runner.rank(batch, embeddings)
+
+        assert output.scores.shape == (3, 5, len(ACTIONS))
+        assert output.p_favorite_score.shape == (3, 5)
+        np.testing.assert_allclose(
+            np.asarray(output.scores, np.float32), np.asarray(expected.scores, np.float32), atol=1e-2
+        )
+        assert output.ranked_indices.shape == (3, 5)
+        for row in range(3):
+            assert sorted(output.ranked_indices[row]) == list(range(5))
+            favorite = output.p_favorite_score[row][output.ranked_indices[row]].astype(np.float32)
+            assert np.all(np.diff(favorite) <= 0)
+
+    def test_compile_cache_counters(self):
+        runner = make_ranking_runner(buckets=ShapeBuckets((1,), (16,), (4, 8)))
+        runner.warmup()
+
+        runner.rank(*example_batch(batch_size=1, num_candidates=3))
+        runner.rank(*example_batch(batch_size=1, num_candidates=8))
+        assert (runner.compile_stats.hits, runner.compile_stats.misses) == (2, 0)
+
+        # Larger than every candidate bucket: compiled at its own size once
+        runner.rank(*example_batch(batch_size=1, num_candidates=10))
+        runner.rank(*example_batch(batch_size=1, num_candidates=10))
+        assert (runner.compile_stats.hits, runner.compile_stats.misses) == (3, 1)
+
+
+def candidate_slice(batch, embeddings, chunk):
+    """The batch and embeddings restricted to a slice of the candidates."""
+    return (
+        batch._replace(
+            candidate_post_hashes=batch.candidate_post_hashes[:, chunk],
+            candidate_author_hashes=batch.candidate_author_hashes[:, chunk],
+            candidate_product_surface=batch.candidate_product_surface[:, chunk],
+        ),
+        RecsysEmbeddings(
+            user_embeddings=embeddings.user_embeddings,
+            history_post_embeddings=embeddings.history_post_embeddings,
+            candidate_post_embeddings=embeddings.candidate_post_embeddings[:, chunk],
+            history_author_embeddings=embeddings.history_author_embeddings,
+            candidate_author_embeddings=embeddings.candidate_author_embeddings[:, chunk],
+        ),
+    )
+
+
+class TestUserContextCache:
+    """Tests for scoring candidate chunks against a cached user context."""
+
+    def test_chunks_match_full_forward(self):
+        runner = make_ranking_runner(buckets=ShapeBuckets((2,), (16,), (8,)))
+        batch, embeddings = example_batch(batch_size=2, num_candidates=8)
+        user_context = runner.encode_user_context(batch, embeddings)
+
+        assert len(user_context.layers) == 1
+        assert user_context.layers[0].k.shape == (2, 17, 2, 32)
+        assert user_context.padding_mask.shape == (2, 17)
+
+        # Score the candidates as two chunks of 4 against the same context
+        for chunk in (slice(0, 4), slice(4, 8)):
+            chunk_batch, chunk_embeddings = candidate_slice(batch, embeddings, chunk)
+            expected = runner.rank_candidates(runner.params, chunk_batch, chunk_embeddings)
+            output = runner.rank_with_user_context(user_context, chunk_batch, chunk_embeddings)
+
+            np.testing.assert_allclose(
+                np.asarray(output.scores, np.float32),
+                np.asarray(expected.scores, np.float32),
+                atol=1e-2,
+            )
+
+
+class TestScoringWeights:
+    """Tests for the WeightedScorer port."""
+
+    def test_weighted_sum_and_vqv_eligibility(self):
+        weights = ScoringWeights(
+            favorite_weight=1.0, reply_weight=2.0, vqv_weight=4.0, min_video_duration_ms=1000
+        )
+        probs = np.zeros((3, len(ACTIONS)), dtype=np.float32)
+        probs[:, ACTIONS.index("favorite_score")] = 0.5
+        probs[:, ACTIONS.index("reply_score")] = 0.25
+        probs[:, ACTIONS.index("vqv_score")] = 0.5
+
+        scores = weights.weighted_scores(probs, video_duration_ms=np.array([0, 1000, 1001]))
+
+        np.testing.assert_allclose(scores, [1.0, 1.0, 3.0])
+        np.testing.assert_allclose(weights.weighted_scores(probs), [1.0, 1.0, 1.0])
+
+    def test_negative_scores_are_offset_below_positive_ones(self):
+        weights = ScoringWeights(
+            favorite_weight=1.0, block_author_weight=-3.0, negative_scores_offset=0.5
+        )
+        assert weights.sums() == (4.0, 3.0)
+        probs = np.zeros((2, len(ACTIONS)), dtype=np.float32)
+        probs[0, ACTIONS.index("favorite_score")] = 0.5
+        probs[1, ACTIONS.index("block_author_score")] = 0.5
+
+        np.testing.assert_allclose(
+            weights.weighted_scores(probs), [0.5 + 0.5, (-1.5 + 3.0) / 4.0 * 0.5]
+        )
+
+    def test_zero_weights_sum_clamps_at_zero(self):
+        weights = ScoringWeights(favorite_weight=0.0)
+        probs = np.full((1, len(ACTIONS)), 0.5, dtype=np.float32)
+        np.testing.assert_allclose(weights.weighted_scores(probs), [0.0])
+
+
+class TestWeightedScoringHead:
+    """Tests for weighted scoring and top-k inside the compiled ranking graph."""
+
+    def test_ranks_by_weighted_scores(self):
+        runner = make_ranking_runner(buckets=ShapeBuckets((2,), (16,), (8,)))
+        runner.warmup()
+        runner.scoring_weights = ScoringWeights(
+            favorite_weight=1.0,
+            repost_weight=2.0,
+            vqv_weight=4.0,
+            report_weight=-3.0,
+            min_video_duration_ms=1000,
+            negative_scores_offset=0.1,
+        )
+        batch, embeddings = example_batch(batch_size=2, num_candidates=6)
+        video_duration_ms = np.array([[0, 500, 2000, 0, 5000, 1001]] * 2)
+
+        output = runner.rank(batch, embeddings, video_duration_ms=video_duration_ms)
+
+        expected = runner.scoring_weights.weighted_scores(
+            np.asarray(output.scores, np.float32), video_duration_ms
+        )
+        np.testing.assert_allclose(output.weighted_scores, expected, atol=2e-2)
+        for row in range(2):
+            assert sorted(output.ranked_indices[row]) == list(range(6))
+            assert np.all(np.diff(output.weighted_scores[row][output.ranked_indices[row]]) <= 0)
+        # Weights are graph inputs: changing them does not recompile
+        assert runner.compile_stats.misses == 0
+
+    def test_per_action_outputs_disabled(self):
+        runner = make_ranking_runner(
+            buckets=ShapeBuckets((1,), (16,), (8,)), per_action_outputs=False
+        )
+        batch, embeddings = example_batch(batch_size=1, num_candidates=5)
+
+        output = runner.rank(batch, embeddings)
+
+        assert output.p_favorite_score is None and output.p_dwell_time is None
+        assert output.scores.shape == (1, 5, len(ACTIONS))
+        assert output.weighted_scores.shape == (1, 5)
+
+
+class TestRankMany:
+    """Tests for ranking large candidate sets in chunks with a running top-K."""
+
+    def test_matches_chunked_full_forward(self):
+        runner = make_ranking_runner(buckets=ShapeBuckets((2,), (16,), (8,)))
+        runner.scoring_weights = ScoringWeights(
+            favorite_weight=1.0,
+            reply_weight=2.0,
+            vqv_weight=3.0,
+            block_author_weight=-5.0,
+            min_video_duration_ms=1000,
+            negative_scores_offset=0.1,
+        )
+        batch, embeddings = example_batch(batch_size=2, num_candidates=30)
+        video_duration_ms = np.random.default_rng(1).integers(0, 3000, size=(2, 30))
+
+        output = runner.rank_many(batch, embeddings, top_k=5, video_duration_ms=video_duration_ms)
+
+        probs = np.concatenate(
+            [
+                np.asarray(
+                    runner.rank_candidates(
+                        runner.params, *candidate_slice(batch, embeddings, slice(start, start + 8))
+                    ).scores,
+                    np.float32,
+                )
+                for start in range(0, 30, 8)
+            ],
+            axis=1,
+        )
+        expected = runner.scoring_weights.weighted_scores(probs, video_duration_ms)
+
+        assert output.indices.shape == (2, 5)
+        assert output.scores.shape == (2, 5, len(ACTIONS))
+        np.testing.assert_allclose(
+            output.weighted_scores, np.sort(expected, axis=1)[:, ::-1][:, :5], atol=5e-2
+        )
+        np.testing.assert_allclose(
+            output.scores, np.take_along_axis(probs, output.indices[:, :, None], axis=1), atol=1e-2
+        )
+        assert np.all(np.diff(output.weighted_scores, axis=1) <= 0)
+
+    def test_top_k_larger_than_candidates(self):
+        runner = make_ranking_runner()
+        batch, embeddings = example_batch(batch_size=1, num_candidates=11)
+
+        output = runner.rank_many(batch, embeddings, top_k=50)
+
+        assert sorted(output.indices[0]) == list(range(11))
+        # Default weights rank by favorite probability (before its bf16 rounding)
+        np.testing.assert_allclose(
+            output.weighted_scores,
+            output.scores[:, :, ACTIONS.index("favorite_score")],
+            atol=1e-2,
+        )
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
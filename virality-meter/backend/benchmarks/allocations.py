@@ -0,0 +1,97 @@
+"""
+Allocation benchmark for the per-draft scoring pipeline.
+
+Uses tracemalloc to measure, per draft:
+- retained: memory blocks/bytes still alive for the (features, signals)
+  pair, i.e. what the analysis cache and executor results hold on to
+- peak: the highest traced memory while scoring one draft, relative to the
+  memory traced before the call (transient allocations included)
+
+Only public ViralityScorer methods are used, so the script also runs against
+older revisions for comparison.
+
+Usage (from virality-meter/backend):
+    python benchmarks/allocations.py --drafts 2000
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+POSTS = [
+    "Hot take: most AI demos are overrated. What do you think? #AI 🚀",
+    "Just shipped the new release!\nHuge thanks to @team for the amazing work 🎉",
+    "Nobody talks about this, but here's why the algorithm rewards threads. 1/",
+    "BREAKING: markets are bullish on nvidia after the h100 numbers https://x.com/a",
+    "gm",
+]
+
+
+def drafts(count: int):
+    # Unique content per draft, like real traffic
+    return [f"{POSTS[i % len(POSTS)]} #{i}" for i in range(count)]
+
+
+def score(scorer, content: str):
+    features = scorer.extract_features(content, False, "none", 0)
+    signals = scorer.calculate_signal_scores(features)
+    scorer.calculate_final_score(signals)
+    return features, signals
+
+
+def measure(count: int) -> dict:
+    sys.path.insert(0, BACKEND_DIR)
+    from services.scorer import scorer
+
+    contents = drafts(count)
+    for content in contents[:50]:
+        score(scorer, content)  # warm up regex caches and lazy imports
+
+    tracemalloc.start()
+
+    # Retained memory per result
+    results = []
+    before = tracemalloc.take_snapshot()
+    for content in contents:
+        results.append(score(scorer, content))
+    after = tracemalloc.take_snapshot()
+    stats = after.compare_to(before, "filename")
+    retained_blocks = sum(stat.count_diff for stat in stats)
+    retained_bytes = sum(stat.size_diff for stat in stats)
+    # The content strings themselves are inputs, not scoring overhead
+    content_bytes = sum(sys.getsizeof(content) for content in contents)
+    del results
+
+    # Peak transient memory per call
+    peaks = []
+    for content in contents:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        score(scorer, content)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+
+    tracemalloc.stop()
+    peaks.sort()
+    return {
+        "drafts": count,
+        "retained_blocks_per_draft": round(retained_blocks / count, 1),
+        "retained_bytes_per_draft": round((retained_bytes - content_bytes) / count),
+        "peak_bytes_p50": peaks[len(peaks) // 2],
+        "peak_bytes_max": peaks[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--drafts", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, value in measure(args.drafts).items():
+        print(f"{name:28s} {value}")
+
+
+if __name__ == "__main__":
+    main()
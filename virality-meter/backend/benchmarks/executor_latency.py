@@ -0,0 +1,114 @@
+"""
+Event-loop latency benchmark for the scoring executor.
+
+Sends /api/analyze requests through an in-process ASGI client on an open-loop
+schedule (a fixed arrival rate, so time spent waiting for a blocked event
+loop counts towards latency): a mix of short posts and 4000-char longform
+posts. Reports p50/p99 latency of the short requests - the ones that suffer
+when a long post blocks the event loop - for each SCORING_EXECUTOR mode.
+Every request has unique content so the analysis cache never hits.
+
+Usage (from virality-meter/backend):
+    python benchmarks/executor_latency.py --modes inline process
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHORT_POST = "Hot take: most AI demos are overrated. What do you think? #AI 🚀"
+LONG_POST = ("Nobody talks about this, but here's why the algorithm rewards threads. "
+             "Replies, quotes and dwell time all compound, and the best creators know it. ")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load(requests: int, rate: float, long_every: int) -> dict:
+    import httpx
+    from main import app
+    from services.executor import scoring_executor
+
+    short_latencies, long_latencies, statuses = [], [], {}
+
+    async def one(client, i, scheduled):
+        is_long = i % long_every == 0
+        body = (LONG_POST * 40)[:3990] if is_long else SHORT_POST
+        payload = {"content": f"{body} {i}"}
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        response = await client.post("/api/analyze", json=payload)
+        elapsed = (time.perf_counter() - scheduled) * 1000
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        (long_latencies if is_long else short_latencies).append(elapsed)
+
+    async def load(client, count):
+        start = time.perf_counter()
+        await asyncio.gather(*(one(client, i, start + i / rate) for i in range(count)))
+        return time.perf_counter() - start
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up the pool (process workers import the scorer on first use)
+        await load(client, 20)
+        short_latencies.clear()
+        long_latencies.clear()
+        statuses.clear()
+
+        wall = await load(client, requests)
+
+    scoring_executor.shutdown()
+    return {
+        "mode": scoring_executor.mode,
+        "workers": scoring_executor.max_workers,
+        "requests": requests,
+        "offered_rate": rate,
+        "req_per_sec": round(requests / wall, 1),
+        "short_p50_ms": round(percentile(short_latencies, 50), 2),
+        "short_p99_ms": round(percentile(short_latencies, 99), 2),
+        "long_p99_ms": round(percentile(long_latencies, 99), 2) if long_latencies else None,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modes", nargs="+", default=["inline", "process"])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=200.0, help="arrivals per second")
+    parser.add_argument("--max-pending", type=int, default=256)
+    parser.add_argument("--long-every", type=int, default=10,
+                        help="every Nth request is a 4000-char post")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, BACKEND_DIR)
+        result = asyncio.run(run_load(args.requests, args.rate, args.long_every))
+        print(json.dumps(result))
+        return
+
+    # One interpreter per mode: the executor singleton reads SCORING_EXECUTOR at import
+    for mode in args.modes:
+        env = dict(os.environ, SCORING_EXECUTOR=mode, SCORING_MAX_PENDING=str(args.max_pending))
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child",
+             "--requests", str(args.requests), "--rate", str(args.rate),
+             "--long-every", str(args.long_every)],
+            env=env, cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+        ).stdout
+        print(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Scoring throughput benchmark and regression gate.
+
+Measures posts/sec and per-call latency (p50/p99) of
+- extract_features
+- calculate_signal_scores
+- the full /api/analyze path through an in-process ASGI client (analysis
+  cache cleared every round, so every request is scored)
+over deterministic corpora:
+- synthetic:    random mixes of the scorer's own pattern fragments
+- short:        tweet-length posts shaped like recorded traffic
+- longform:     ~4000-char multi-paragraph posts
+- emoji:        emoji-heavy posts (including emoji outside the classic block)
+- hashtag_spam: hashtag walls and follow-for-follow spam
+
+Each measurement runs several rounds and keeps the fastest, which is the
+least noisy estimate on a shared machine. Results can be saved as a JSON
+baseline; with --baseline the run exits with status 1 when any throughput
+falls more than --max-regression below the baseline. Baselines are only
+comparable on the machine (and Python) they were recorded on.
+
+Usage (from virality-meter/backend):
+    python benchmarks/scoring.py --save benchmarks/baseline.json
+    python benchmarks/scoring.py --baseline benchmarks/baseline.json --max-regression 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ("extract_features", "signal_scores", "api")
+
+SENTENCES = [
+    "Just shipped the new release after three months of work.",
+    "Hot take: most AI demos are overrated.",
+    "Here's what nobody tells you about building in public.",
+    "The market is bullish again and everyone is suddenly an expert.",
+    "I spent 3 hours on a task that now takes 10 minutes.",
+    "What do you think?",
+    "Thread: how we scaled to a million users 🧵",
+    "This is absolutely mind-blowing.",
+    "Bookmark this for later.",
+    "Unpopular opinion: meetings should be emails.",
+    "Huge thanks to @team for the amazing work!",
+    "Read the full write-up here https://example.com/post",
+    "Honestly, this changed how I think about the algorithm.",
+]
+EMOJI = ["🚀", "🔥", "😂", "🎉", "💡", "👀", "🙌", "✨", "🫠", "🥹", "❤️", "👍🏽", "🇺🇸", "🧵", "📈", "🤖"]
+HASHTAGS = ["#AI", "#Tech", "#Crypto", "#Bitcoin", "#Startup", "#Growth", "#Follow", "#F4F",
+            "#Marketing", "#Web3", "#NFT", "#Viral", "#Trending", "#Money", "#Success"]
+SPAM = ["follow for follow", "like for like", "f4f", "check my bio", "dm me", "giveaway"]
+
+
+def _pattern_fragments() -> List[str]:
+    """Scorer patterns as plain text (regex escapes dropped)"""
+    from services.scorer import (CONTROVERSY_PATTERNS, CTA_PATTERNS, DEBOOST_PATTERNS, EMOTIONAL_PATTERNS,
+                                 QUESTION_PATTERNS, TRENDING_TOPICS, VIRAL_HOOKS)
+    fragments = []
+    for patterns in [QUESTION_PATTERNS, CTA_PATTERNS, VIRAL_HOOKS, DEBOOST_PATTERNS, CONTROVERSY_PATTERNS,
+                     TRENDING_TOPICS, *EMOTIONAL_PATTERNS.values()]:
+        fragments += [pattern.replace("\\", "") for pattern in patterns]
+    return fragments
+
+
+def build_corpus(name: str, count: int, seed: int = 16) -> List[str]:
+    """Deterministic corpus of count posts"""
+    rng = random.Random(f"{name}:{seed}")
+    posts = []
+    if name == "synthetic":
+        fragments = _pattern_fragments() + SENTENCES + EMOJI + HASHTAGS + ["@user", "\n", "?"]
+        for _ in range(count):
+            post = " ".join(rng.choice(fragments) for _ in range(rng.randint(1, 40)))
+            posts.append(post.upper() if rng.random() < 0.1 else post)
+    elif name == "short":
+        for _ in range(count):
+            post = " ".join(rng.sample(SENTENCES, rng.randint(1, 3)))
+            if rng.random() < 0.4:
+                post += " " + rng.choice(EMOJI)
+            if rng.random() < 0.3:
+                post += " " + " ".join(rng.sample(HASHTAGS, rng.randint(1, 2)))
+            posts.append(post[:280])
+    elif name == "longform":
+        for _ in range(count):
+            paragraphs = []
+            while sum(map(len, paragraphs)) < 3900:
+                paragraphs.append(" ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 7))))
+            posts.append("\n\n".join(paragraphs)[:4000])
+    elif name == "emoji":
+        for _ in range(count):
+            parts = []
+            for _ in range(rng.randint(5, 30)):
+                parts.append("".join(rng.choice(EMOJI) for _ in range(rng.randint(1, 4))))
+                if rng.random() < 0.3:
+                    parts.append(rng.choice(SENTENCES))
+            posts.append(" ".join(parts)[:4000])
+    elif name == "hashtag_spam":
+        for _ in range(count):
+            parts = rng.sample(HASHTAGS, rng.randint(8, len(HASHTAGS)))
+            parts += [rng.choice(SPAM) for _ in range(rng.randint(1, 4))]
+            rng.shuffle(parts)
+            posts.append(" ".join(parts + [rng.choice(EMOJI)]))
+    else:
+        raise ValueError(f"Unknown corpus {name!r}")
+    return posts
+
+
+CORPORA = ("synthetic", "short", "longform", "emoji", "hashtag_spam")
+
+
+def _summary(round_seconds: List[float], latencies_ns: List[int], count: int) -> Dict[str, float]:
+    latencies_ns.sort()
+
+    def pct(q: float) -> float:
+        return latencies_ns[min(len(latencies_ns) - 1, int(q * len(latencies_ns)))] / 1000
+
+    return {
+        "posts_per_sec": round(count / min(round_seconds), 1),
+        "p50_us": round(pct(0.50), 1),
+        "p99_us": round(pct(0.99), 1),
+    }
+
+
+def bench_calls(fn: Callable, inputs: Sequence, rounds: int) -> Dict[str, float]:
+    """Time fn(input) for every input, for several rounds"""
+    for item in inputs[:20]:
+        fn(item)  # Warm-up
+    clock = time.perf_counter_ns
+    round_seconds, latencies = [], []
+    for _ in range(rounds):
+        started = clock()
+        for item in inputs:
+            call_started = clock()
+            fn(item)
+            latencies.append(clock() - call_started)
+        round_seconds.append((clock() - started) / 1e9)
+    return _summary(round_seconds, latencies, len(inputs))
+
+
+async def bench_api(posts: Sequence[str], rounds: int) -> Dict[str, float]:
+    """Sequential POST /api/analyze requests through an in-process ASGI client"""
+    import httpx
+    from main import app
+    from services.cache import analysis_cache
+
+    clock = time.perf_counter_ns
+    round_seconds, latencies = [], []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for post in posts[:20]:
+            await client.post("/api/analyze", json={"content": post})  # Warm-up
+        for _ in range(rounds):
+            analysis_cache.clear()
+            started = clock()
+            for post in posts:
+                call_started = clock()
+                response = await client.post("/api/analyze", json={"content": post})
+                latencies.append(clock() - call_started)
+                if response.status_code != 200:
+                    raise RuntimeError(f"/api/analyze returned {response.status_code}: {response.text[:200]}")
+            round_seconds.append((clock() - started) / 1e9)
+    return _summary(round_seconds, latencies, len(posts))
+
+
+def run(corpora: Sequence[str], count: int, rounds: int, stages: Sequence[str]) -> dict:
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("SCORING_EXECUTOR", "inline")  # Measure scoring, not IPC
+    from services.scorer import scorer
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name in corpora:
+        # Longform posts are ~20x the work of short ones; keep rounds comparable in length
+        posts = build_corpus(name, max(count // 10, 20) if name == "longform" else count)
+        corpus_results = results[name] = {"posts": len(posts)}
+        if "extract_features" in stages:
+            corpus_results["extract_features"] = bench_calls(scorer.extract_features, posts, rounds)
+        if "signal_scores" in stages:
+            features = [scorer.extract_features(post) for post in posts]
+            corpus_results["signal_scores"] = bench_calls(scorer.calculate_signal_scores, features, rounds)
+        if "api" in stages:
+            corpus_results["api"] = asyncio.run(bench_api(posts, rounds))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "executor": os.environ["SCORING_EXECUTOR"],
+            "rounds": rounds,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Throughput regressions beyond max_regression (a fraction) against the baseline"""
+    regressions = []
+    for corpus, stages in baseline["results"].items():
+        for stage, metrics in stages.items():
+            if not isinstance(metrics, dict):
+                continue
+            measured = current["results"].get(corpus, {}).get(stage)
+            if measured is None:
+                continue
+            floor = metrics["posts_per_sec"] * (1 - max_regression)
+            if measured["posts_per_sec"] < floor:
+                regressions.append(
+                    f"{corpus}/{stage}: {measured['posts_per_sec']} posts/s, baseline "
+                    f"{metrics['posts_per_sec']} (-{1 - measured['posts_per_sec'] / metrics['posts_per_sec']:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpora", nargs="+", choices=CORPORA, default=list(CORPORA))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--posts", type=int, default=300, help="posts per corpus (a tenth for longform)")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per measurement; the fastest is kept")
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", help="compare against this JSON baseline")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="allowed throughput drop against the baseline (fraction)")
+    args = parser.parse_args()
+
+    current = run(args.corpora, args.posts, args.rounds, args.stages)
+
+    print(f"{'corpus':14s} {'stage':18s} {'posts/s':>10s} {'p50 us':>9s} {'p99 us':>9s}")
+    for corpus, stages in current["results"].items():
+        for stage, metrics in stages.items():
+            if isinstance(metrics, dict):
+                print(f"{corpus:14s} {stage:18s} {metrics['posts_per_sec']:10.1f} "
+                      f"{metrics['p50_us']:9.1f} {metrics['p99_us']:9.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"saved baseline to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.max_regression)
+        if regressions:
+            print(f"throughput regressed more than {args.max_regression:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"no throughput regression beyond {args.max_regression:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Bulk Virality Scoring CLI
+
+Streams posts from a JSONL or CSV file (or stdin), scores them with the
+vectorized batch scorer on every core and writes one NDJSON result per post.
+Meant for offline backfills (e.g. tier calibration over millions of
+historical posts) where the HTTP API is far too slow.
+
+Memory stays constant: posts are read lazily in chunks and only a bounded
+number of chunks is in flight at once.
+
+Each input record needs a "content" field and may carry "has_media",
+"media_type", "video_duration_ms" and an "id" that is copied to the output.
+Every output line carries the record's "offset" (0-based index among the
+non-empty input records), so an interrupted run can continue with
+--start-offset; progress lines report the offset below which everything has
+been written. With --unordered, some records past that offset may already
+have been written too, so deduplicate resumed output by offset. Records
+before --start-offset are skipped without being decoded.
+
+Usage (from virality-meter/backend):
+    python bulk_score.py posts.jsonl -o scores.ndjson
+    python bulk_score.py posts.csv --unordered --workers 8 -o scores.ndjson
+    cat posts.jsonl | python bulk_score.py - > scores.ndjson
+    python bulk_score.py posts.jsonl --start-offset 1200000 -o scores.ndjson --append
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from models.schemas import MediaType
+from models.tiers import get_tier_for_score
+from services.batch import batch_scorer
+from services.scorer import SIGNAL_NAMES
+
+# (offset, id, content, has_media, media_type, video_duration_ms), or
+# (offset, None, None, error message, None, None) for an unreadable record
+Record = Tuple[int, Any, Optional[str], Any, Optional[str], Optional[int]]
+
+MEDIA_TYPES = {media_type.value for media_type in MediaType}
+TRUE_STRINGS = {"1", "true", "yes", "y", "t"}
+
+
+# =============================================================================
+# Input
+# =============================================================================
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_STRINGS
+    return bool(value)
+
+
+def _as_record(offset: int, row: Dict[str, Any], content_field: str, id_field: str) -> Record:
+    """Validate one parsed input row"""
+    content = row.get(content_field)
+    if not isinstance(content, str) or not content:
+        return (offset, row.get(id_field), None, f"missing or empty '{content_field}'", None, None)
+    media_type = str(row.get("media_type") or "none").strip().lower()
+    if media_type not in MEDIA_TYPES:
+        return (offset, row.get(id_field), None, f"unknown media_type {media_type!r}", None, None)
+    try:
+        video_duration_ms = int(row.get("video_duration_ms") or 0)
+    except (TypeError, ValueError):
+        return (offset, row.get(id_field), None, "video_duration_ms is not an integer", None, None)
+    return (offset, row.get(id_field), content, _as_bool(row.get("has_media")),
+            media_type, video_duration_ms)
+
+
+def read_jsonl(stream: TextIO, content_field: str, id_field: str,
+               start_offset: int = 0) -> Iterator[Record]:
+    offset = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        if offset < start_offset:  # Resuming: skip the line without decoding it
+            offset += 1
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("record is not a JSON object")
+        except ValueError as e:
+            yield (offset, None, None, f"invalid JSON: {e}", None, None)
+        else:
+            yield _as_record(offset, row, content_field, id_field)
+        offset += 1
+
+
+def read_csv(stream: TextIO, content_field: str, id_field: str,
+             start_offset: int = 0) -> Iterator[Record]:
+    csv.field_size_limit(sys.maxsize)
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None:
+        return
+    # Quoted fields may span lines, so skipped rows are still split by the csv
+    # module, but not turned into dicts and records. Blank rows are not records
+    # (DictReader skips them too).
+    skipped = 0
+    while skipped < start_offset:
+        row = next(reader.reader, None)
+        if row is None:
+            return
+        if row:
+            skipped += 1
+    for offset, row in enumerate(reader, start_offset):
+        yield _as_record(offset, row, content_field, id_field)
+
+
+def chunked(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# =============================================================================
+# Scoring (runs in worker processes)
+# =============================================================================
+
+def score_chunk(chunk: List[Record], include_signals: bool) -> List[str]:
+    """Score one chunk and return its NDJSON lines, in input order"""
+    valid = [record for record in chunk if record[2] is not None]
+    result = batch_scorer.score([record[2:] for record in valid]) if valid else None
+
+    lines: Dict[int, str] = {}
+    if result is not None:
+        final_scores = result.final_scores.tolist()
+        breakdown = {name: values.tolist() for name, values in result.breakdown.items()}
+        signal_rows = result.signal_scores.tolist() if include_signals else None
+        for i, record in enumerate(valid):
+            tier = get_tier_for_score(final_scores[i])
+            output = {
+                "offset": record[0],
+                "id": record[1],
+                "score": final_scores[i],
+                "tier_level": tier.level,
+                "tier_name": tier.name,
+                "engagement_potential": round(breakdown["engagement_potential"][i], 3),
+                "shareability": round(breakdown["shareability"][i], 3),
+                "controversy_risk": round(breakdown["controversy_risk"][i], 3),
+                "negative_signal_risk": round(breakdown["negative_signal_risk"][i], 3),
+                "diversity_score": result.diversity_scores[i],
+            }
+            if signal_rows is not None:
+                output["signals"] = dict(zip(SIGNAL_NAMES, (round(v, 3) for v in signal_rows[i])))
+            lines[record[0]] = json.dumps(output, ensure_ascii=False)
+
+    for record in chunk:
+        if record[2] is None:
+            lines[record[0]] = json.dumps({"offset": record[0], "id": record[1], "error": record[3]},
+                                          ensure_ascii=False)
+    return [lines[record[0]] for record in chunk]
+
+
+# =============================================================================
+# Driver
+# =============================================================================
+
+class Progress:
+    """Throughput reporting on stderr plus the resume watermark"""
+
+    def __init__(self, start_offset: int, interval: float, quiet: bool):
+        self.interval = interval
+        self.quiet = quiet
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.scored = 0
+        self.errors = 0
+        # Every record before this offset has been written
+        self.watermark = start_offset
+        self._done_chunks: Dict[int, int] = {}  # first offset -> offset after the chunk
+
+    def chunk_done(self, chunk: List[Record], lines: List[str]) -> None:
+        errors = sum(1 for record in chunk if record[2] is None)
+        self.errors += errors
+        self.scored += len(chunk) - errors
+        self._done_chunks[chunk[0][0]] = chunk[-1][0] + 1
+        while self.watermark in self._done_chunks:
+            self.watermark = self._done_chunks.pop(self.watermark)
+
+        now = time.monotonic()
+        if not self.quiet and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(final=False)
+
+    def report(self, final: bool) -> None:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        total = self.scored + self.errors
+        print(
+            f"{'done' if final else 'progress'}: {total} records "
+            f"({self.scored} scored, {self.errors} errors) in {elapsed:.1f}s, "
+            f"{total / elapsed:.0f} records/s, resume with --start-offset {self.watermark}",
+            file=sys.stderr, flush=True,
+        )
+
+
+def run(chunks: Iterator[List[Record]], output: TextIO, workers: int, ordered: bool,
+        include_signals: bool, progress: Progress) -> None:
+    """Score chunks on a process pool, keeping at most 2 chunks per worker in flight"""
+
+    def write(chunk: List[Record], lines: List[str]) -> None:
+        output.write("\n".join(lines) + "\n")
+        progress.chunk_done(chunk, lines)
+
+    if workers <= 1:
+        for chunk in chunks:
+            write(chunk, score_chunk(chunk, include_signals))
+        return
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: "deque[Tuple[List[Record], Future]]" = deque()
+        pending: Dict[Future, List[Record]] = {}
+
+        def drain(block_until: int) -> None:
+            # Write finished chunks until fewer than block_until remain in flight
+            if ordered:
+                while in_flight and (len(in_flight) >= block_until or in_flight[0][1].done()):
+                    chunk, future = in_flight.popleft()
+                    write(chunk, future.result())
+            else:
+                while pending and len(pending) >= block_until:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(pending.pop(future), future.result())
+
+        for chunk in chunks:
+            future = pool.submit(score_chunk, chunk, include_signals)
+            if ordered:
+                in_flight.append((chunk, future))
+            else:
+                pending[future] = chunk
+            drain(max_in_flight)
+        drain(1)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score posts from JSONL/CSV and write NDJSON results.")
+    parser.add_argument("input", help="JSONL or CSV file, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default: stdout)")
+    parser.add_argument("--append", action="store_true", help="Append to the output file (for resumed runs)")
+    parser.add_argument("--format", choices=("jsonl", "csv"),
+                        help="Input format (default: from the file extension, jsonl for stdin)")
+    parser.add_argument("--content-field", default="content")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (1 scores in this process)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Records per worker task")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Write chunks as they finish instead of in input order")
+    parser.add_argument("--start-offset", type=int, default=0, help="Skip records before this offset")
+    parser.add_argument("--limit", type=int, help="Stop after this many records")
+    parser.add_argument("--signals", action="store_true", help="Include per-signal scores")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1 or args.start_offset < 0:
+        parser.error("--chunk-size must be positive and --start-offset non-negative")
+
+    input_format = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    reader = read_csv if input_format == "csv" else read_jsonl
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    output = sys.stdout if args.output == "-" else open(args.output, "a" if args.append else "w",
+                                                        encoding="utf-8")
+    progress = Progress(args.start_offset, args.progress_interval, args.quiet)
+    try:
+        records = islice(reader(source, args.content_field, args.id_field, args.start_offset),
+                         args.limit)
+        run(chunked(records, args.chunk_size), output, args.workers, not args.unordered,
+            args.signals, progress)
+    except KeyboardInterrupt:
+        progress.report(final=True)
+        return 130
+    finally:
+        output.flush()
+        if output is not sys.stdout:
+            output.close()
+        if source is not sys.stdin:
+            source.close()
+    progress.report(final=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,28 @@ A FastAPI service that analyzes content against X's recommendation algorithm
 and provides virality predictions with humorous tier classifications.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from routers import analyze_router
+from services.executor import scoring_executor
+from services.scorer import trending_topics
+from services.timing import stage_metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    scoring_executor.shutdown()
+    trending_topics.stop()
+
 
 app = FastAPI(
     title="X Algorithm Virality Meter",
     description="Analyze your content's viral potential using X's actual algorithm signals",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for frontend
@@ -35,8 +49,15 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "analyze": "/api/analyze - Analyze content for virality",
+            "batch": "/api/analyze/batch - Analyze many drafts in one call",
+            "thread": "/api/analyze/thread - Score each tweet of a thread",
+            "variants": "/api/analyze/variants - Score automatic rewrites of a draft",
+            "live": "/api/analyze/live - Incremental re-analysis while editing",
             "account": "/api/account/simulate - Simulate account virality",
+            "account_batch": "/api/account/simulate/batch - Simulate many accounts in one call",
+            "account_sweep": "/api/account/simulate/sweep - What-if grid over account metrics",
             "tiers": "/api/tiers - Get all virality tier definitions",
+            "metrics": "/metrics - Per-stage latency histograms (Prometheus)",
             "docs": "/docs - Interactive API documentation",
         }
     }
@@ -47,6 +68,12 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-stage latency histograms in the Prometheus text format (filled when PIPELINE_TIMING is on)"""
+    return PlainTextResponse(stage_metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
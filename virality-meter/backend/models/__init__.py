@@ -1,2 +1,10 @@
-from .tiers import ViralityTier, VIRALITY_TIERS, get_tier_for_score, get_all_tiers
+from .tiers import (
+    ViralityTier,
+    VIRALITY_TIERS,
+    TierScheme,
+    TierRegistry,
+    tier_registry,
+    get_tier_for_score,
+    get_all_tiers,
+)
 from .schemas import *
@@ -119,6 +119,39 @@ class AccountSimulationResponse(BaseModel):
     projected_reach_multiplier: float
     viral_post_probability: float
 
+class AccountSimulationBatchRequest(BaseModel):
+    """Request to simulate many accounts in one call"""
+    items: List[AccountSimulationRequest] = Field(..., min_length=1, max_length=10000)
+
+class AccountSimulationBatchResponse(BaseModel):
+    """Response with one account simulation per account, in request order"""
+    count: int
+    results: List[AccountSimulationResponse]
+
+class SweepField(str, Enum):
+    FOLLOWERS_COUNT = "followers_count"
+    FOLLOWING_COUNT = "following_count"
+    AVG_LIKES = "avg_likes"
+    AVG_REPLIES = "avg_replies"
+    AVG_RETWEETS = "avg_retweets"
+    POSTS_PER_WEEK = "posts_per_week"
+    ACCOUNT_AGE_DAYS = "account_age_days"
+    IS_VERIFIED = "is_verified"
+
+class SweepAxis(BaseModel):
+    """One swept account field: explicit values, or `steps` evenly spaced values from `start` to `stop`"""
+    field: SweepField
+    values: Optional[List[float]] = Field(default=None, min_length=1, max_length=1000)
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: Optional[int] = Field(default=None, ge=1, le=1000)
+
+class AccountSweepRequest(BaseModel):
+    """What-if grid over an account: every combination of the axis values"""
+    account: AccountSimulationRequest
+    axes: List[SweepAxis] = Field(..., max_length=8)
+    chunk_size: int = Field(default=10000, ge=1, le=100000, description="Grid points per streamed line")
+
 class CombinedAnalysisRequest(BaseModel):
     """Request to analyze content and account together"""
     # Content fields
@@ -149,3 +182,107 @@ class CombinedAnalysisResponse(BaseModel):
     aggregate_tier_emoji: str
     aggregate_tier_description: str
     aggregate_tier_color: str
+
+class BatchAnalysisRequest(BaseModel):
+    """Request to analyze many drafts in one call"""
+    items: List[ContentAnalysisRequest] = Field(..., min_length=1, max_length=1000)
+
+class BatchAnalysisItem(BaseModel):
+    """Compact virality analysis for one draft of a batch"""
+    index: int  # Position in the request's items list
+    score: int = Field(..., ge=0, le=100)
+    tier_level: int
+    tier_name: str
+    tier_emoji: str
+    signals: Dict[str, float]  # signal name -> predicted score
+    engagement_potential: float
+    shareability: float
+    controversy_risk: float
+    negative_signal_risk: float
+    diversity_score: float
+
+class BatchAnalysisResponse(BaseModel):
+    """Response with one compact analysis per draft, in request order"""
+    count: int
+    results: List[BatchAnalysisItem]
+
+class ThreadAnalysisRequest(BaseModel):
+    """Request to analyze a thread tweet by tweet"""
+    content: str = Field(..., min_length=1, max_length=28000, description="The whole thread; tweets start at '1/', '2/' markers or are separated by blank lines")
+    has_media: bool = Field(default=False, description="Whether the opening tweet has media")
+    media_type: MediaType = Field(default=MediaType.NONE, description="Type of media on the opening tweet")
+    video_duration_ms: Optional[int] = Field(default=None, description="Video duration in milliseconds")
+
+class ThreadTweetAnalysis(BatchAnalysisItem):
+    """Compact virality analysis for one tweet of a thread"""
+    content: str
+
+class ThreadAnalysisResponse(BaseModel):
+    """Per-tweet and aggregate analysis of a thread"""
+    tweet_count: int
+    split_by: str  # "numbered", "blank_lines" or "single"
+    tweets: List[ThreadTweetAnalysis]
+    aggregate_score: int = Field(..., ge=0, le=100)
+    aggregate_tier_level: int
+    aggregate_tier_name: str
+    aggregate_tier_emoji: str
+    aggregate_tier_description: str
+    aggregate_tier_color: str
+    hook_score: int  # Score of the opening tweet
+    weakest_tweet: int  # Index of the lowest-scoring tweet
+    signals: Dict[str, float]  # Signal scores averaged over the tweets
+
+class DraftVariant(BaseModel):
+    """One automatic rewrite of a draft, scored"""
+    kind: str  # "add_question", "add_hook", "trim_hashtags", ... or "combined"
+    rule: str  # Improvement tip rule the rewrite applies
+    description: str
+    content: str
+    score: int = Field(..., ge=0, le=100)
+    score_delta: int  # Change against the original draft
+    tier_level: int
+    tier_name: str
+    tier_emoji: str
+    signals: Dict[str, float]
+    engagement_potential: float
+    shareability: float
+    controversy_risk: float
+    negative_signal_risk: float
+    diversity_score: float
+
+class VariantAnalysisResponse(BaseModel):
+    """The draft's score and its rewrites, best first"""
+    score: int = Field(..., ge=0, le=100)
+    tier_level: int
+    tier_name: str
+    tier_emoji: str
+    count: int
+    variants: List[DraftVariant]
+
+class TextEdit(BaseModel):
+    """Replace content[start:end] with text (offsets in Unicode code points)"""
+    start: int = Field(..., ge=0)
+    end: int = Field(..., ge=0)
+    text: str = Field(default="", max_length=4000)
+
+class LiveAnalysisRequest(BaseModel):
+    """Incremental re-analysis of a previously analyzed draft"""
+    analysis_id: str = Field(..., description="ID returned by the previous live analysis")
+    edits: List[TextEdit] = Field(default_factory=list, max_length=100)
+    has_media: Optional[bool] = None
+    media_type: Optional[MediaType] = None
+    video_duration_ms: Optional[int] = None
+
+class LiveAnalysisResponse(BaseModel):
+    """Lightweight analysis for as-you-type scoring"""
+    analysis_id: str  # Send this with the next edit
+    score: int = Field(..., ge=0, le=100)
+    tier_level: int
+    tier_name: str
+    tier_emoji: str
+    tier_color: str
+    engagement_potential: float
+    shareability: float
+    controversy_risk: float
+    negative_signal_risk: float
+    content_stats: Dict[str, Any]
@@ -3,8 +3,12 @@ X Algorithm Virality Tiers - 10 Humorous Classifications
 Based on the scoring system from the x-algorithm codebase
 """
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+import hashlib
+import json
+import os
 
 @dataclass
 class ViralityTier:
@@ -109,25 +113,97 @@ VIRALITY_TIERS: List[ViralityTier] = [
     ),
 ]
 
-def get_tier_for_score(score: int) -> ViralityTier:
-    """Get the virality tier for a given score (0-100)"""
-    score = max(0, min(100, score))  # Clamp to 0-100
-    for tier in VIRALITY_TIERS:
-        if tier.min_score <= score <= tier.max_score:
-            return tier
-    return VIRALITY_TIERS[0]  # Default to lowest tier
-
-def get_all_tiers() -> List[dict]:
-    """Get all tiers as dictionaries"""
-    return [
-        {
-            "level": t.level,
-            "name": t.name,
-            "emoji": t.emoji,
-            "description": t.description,
-            "min_score": t.min_score,
-            "max_score": t.max_score,
-            "color": t.color
-        }
-        for t in VIRALITY_TIERS
-    ]
+
+class TierScheme:
+    """
+    A named set of tiers covering every score from 0 to 100 exactly once.
+
+    Lookups index a precomputed 101-entry table, and the /api/tiers payload
+    is serialized once together with its ETag.
+    """
+
+    def __init__(self, name: str, tiers: List[ViralityTier]):
+        ordered = sorted(tiers, key=lambda t: t.min_score)
+        expected = 0
+        for tier in ordered:
+            if tier.min_score != expected or tier.max_score < tier.min_score:
+                raise ValueError(
+                    f"Tier scheme {name!r} must cover 0-100 without gaps or overlaps; "
+                    f"tier {tier.level} spans {tier.min_score}-{tier.max_score}, expected a start at {expected}"
+                )
+            expected = tier.max_score + 1
+        if expected != 101:
+            raise ValueError(f"Tier scheme {name!r} must end at 100, ends at {expected - 1}")
+
+        self.name = name
+        self.tiers: Tuple[ViralityTier, ...] = tuple(tiers)
+        self._by_score: Tuple[ViralityTier, ...] = tuple(
+            tier for tier in ordered for _ in range(tier.min_score, tier.max_score + 1)
+        )
+        self.levels: Tuple[int, ...] = tuple(tier.level for tier in self._by_score)  # Level per score
+
+        dicts = [asdict(t) for t in self.tiers]
+        self.dicts: Tuple[Mapping, ...] = tuple(MappingProxyType(d) for d in dicts)  # Read-only
+        self.payload: bytes = json.dumps({"tiers": dicts}, ensure_ascii=False, separators=(",", ":")).encode()
+        self.etag = '"' + hashlib.blake2b(self.payload, digest_size=16).hexdigest() + '"'
+
+    def tier_for(self, score: int) -> ViralityTier:
+        """Tier for a score (clamped to 0-100)"""
+        return self._by_score[max(0, min(100, int(score)))]
+
+    @classmethod
+    def from_dicts(cls, name: str, items: List[dict],
+                   base: Optional["TierScheme"] = None) -> "TierScheme":
+        """
+        Build a scheme from tier dicts. Fields missing from an entry are taken
+        from the base scheme's tier with the same level, so a per-niche scheme
+        can list just {"level", "min_score", "max_score"}.
+        """
+        inherited = {t.level: asdict(t) for t in base.tiers} if base is not None else {}
+        return cls(name, [ViralityTier(**{**inherited.get(item["level"], {}), **item}) for item in items])
+
+
+class TierRegistry:
+    """Tier schemes by name, always including the default scheme"""
+
+    DEFAULT = "default"
+
+    def __init__(self, default_tiers: List[ViralityTier]):
+        self._schemes: Dict[str, TierScheme] = {}
+        self.default = self.register(TierScheme(self.DEFAULT, default_tiers))
+
+    def register(self, scheme: TierScheme) -> TierScheme:
+        self._schemes = {**self._schemes, scheme.name: scheme}  # Copy-on-write; readers never lock
+        return scheme
+
+    def scheme(self, name: Optional[str] = None) -> TierScheme:
+        """Scheme by name (default when name is None); KeyError if unknown"""
+        return self._schemes[name or self.DEFAULT]
+
+    def resolve(self, name: Optional[str]) -> TierScheme:
+        """Scheme by name, falling back to the default for unknown names (e.g. a niche without one)"""
+        return self._schemes.get(name or self.DEFAULT, self.default)
+
+    def names(self) -> List[str]:
+        return list(self._schemes)
+
+    def load_file(self, path: str) -> List[TierScheme]:
+        """Register schemes from a JSON file: {"scheme name": [tier dicts, ...], ...}"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return [self.register(TierScheme.from_dicts(name, items, base=self.default))
+                for name, items in data.items()]
+
+
+tier_registry = TierRegistry(VIRALITY_TIERS)
+if os.environ.get("TIER_SCHEMES_FILE"):
+    tier_registry.load_file(os.environ["TIER_SCHEMES_FILE"])
+
+
+def get_tier_for_score(score: int, scheme: Optional[str] = None) -> ViralityTier:
+    """Get the virality tier for a given score (0-100), optionally from a named scheme"""
+    return tier_registry.resolve(scheme).tier_for(score)
+
+def get_all_tiers(scheme: Optional[str] = None) -> List[dict]:
+    """Get all tiers as dictionaries (copies; changing them does not affect the scheme)"""
+    return [dict(tier) for tier in tier_registry.scheme(scheme).dicts]
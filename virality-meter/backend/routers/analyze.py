@@ -2,227 +2,571 @@
 Content Analysis API Router
 """
 
-from fastapi import APIRouter, HTTPException
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Type
+import json
+import os
+import time
+
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException, Response
+from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
 from models.schemas import (
     ContentAnalysisRequest,
     ContentAnalysisResponse,
-    SignalScore,
     ImprovementTip,
-    DiversityScore,
     AccountSimulationRequest,
     AccountSimulationResponse,
+    AccountSimulationBatchRequest,
+    AccountSimulationBatchResponse,
+    AccountSweepRequest,
+    SweepAxis,
     CombinedAnalysisRequest,
     CombinedAnalysisResponse,
+    BatchAnalysisRequest,
+    BatchAnalysisItem,
+    BatchAnalysisResponse,
+    LiveAnalysisRequest,
+    LiveAnalysisResponse,
+    ThreadAnalysisRequest,
+    ThreadAnalysisResponse,
+    VariantAnalysisResponse,
+)
+from models.tiers import TierScheme, ViralityTier, get_tier_for_score, tier_registry
+from services.account import ACCOUNT_TIPS, AccountGrid, AccountScores, account_scorer
+from services.improvements import Tip
+from services.batch import BatchResult
+from services.scorer import SIGNAL_NAMES, SignalScores, scorer, trending_topics
+from services.timing import TIMING_ENABLED, StageTimes, stage_metrics
+from services.cache import analysis_cache
+from services.thread import THREAD_MULTIPLIER, aggregate_thread_score, split_thread
+from services.incremental import incremental_analyzer, InvalidEdit, SessionNotFound
+from services.executor import (
+    ExecutorSaturated,
+    ScoredDraft,
+    score_batch,
+    score_draft,
+    score_variants,
+    scoring_executor,
 )
-from models.tiers import get_tier_for_score, get_all_tiers
-from services.scorer import scorer
 
 router = APIRouter(prefix="/api", tags=["analysis"])
 
+# Opt-in: serialize analysis responses straight from the internal records,
+# skipping response_model validation. Output is byte-identical either way
+# (see tests/test_fast_responses.py).
+FAST_RESPONSES = os.environ.get("FAST_RESPONSES", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _overloaded(error: ExecutorSaturated) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+
+def _json_response(payload: Dict[str, Any]) -> Response:
+    """Serialize a response payload exactly like FastAPI's default JSONResponse does"""
+    return Response(
+        content=json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None,
+                           separators=(",", ":")).encode("utf-8"),
+        media_type="application/json",
+    )
+
+
+def _respond(payload: Dict[str, Any], model: Type[BaseModel], times: Optional[StageTimes] = None):
+    """
+    Response payloads are plain dicts laid out like their response models.
+    By default FastAPI validates them against the endpoint's response_model;
+    in fast mode they are encoded directly.
+
+    With stage timing on, validation and encoding happen here so they can be
+    timed; the request's stages are recorded and sent as Server-Timing.
+    """
+    if times is None:
+        return _json_response(payload) if FAST_RESPONSES else payload
+
+    started = time.perf_counter_ns()
+    if not FAST_RESPONSES:
+        # Same validation and dump FastAPI applies for response_model
+        payload = model.model_validate(payload).model_dump(mode="json", by_alias=True)
+        validated = time.perf_counter_ns()
+        times.add("validate", validated - started)
+        started = validated
+    response = _json_response(payload)
+    finished = time.perf_counter_ns()
+    times.add("serialize", finished - started)
+    times.add("total", finished - times.started)
+
+    stage_metrics.record(times)
+    response.headers["Server-Timing"] = times.server_timing()
+    return response
+
+
+def _signal_scores(signals: SignalScores) -> List[Dict[str, Any]]:
+    """Per-signal response entries (SignalScore) from the score vector"""
+    return [
+        {
+            "signal": spec.name,
+            "score": round(score, 3),
+            "weight": round(spec.weight, 3),
+            "impact": spec.impact,
+            "explanation": spec.explanation,
+        }
+        for spec, score in signals
+    ]
+
+
+@lru_cache(maxsize=1024)
+def _improvement_tip(tip: Tip) -> Dict[str, Any]:
+    """ImprovementTip entry for a tip; tips are immutable, so each is built once (treat as read-only)"""
+    return {name: getattr(tip, name) for name in ImprovementTip.model_fields}
+
+
+def _content_analysis(draft: ScoredDraft, score: int, tier: ViralityTier) -> Dict[str, Any]:
+    """ContentAnalysisResponse payload for a scored draft"""
+    features, breakdown, diversity = draft.features, draft.breakdown, draft.diversity
+    return {
+        "score": score,
+        "tier_level": tier.level,
+        "tier_name": tier.name,
+        "tier_emoji": tier.emoji,
+        "tier_description": tier.description,
+        "tier_color": tier.color,
+        "signal_scores": _signal_scores(draft.signals),
+        "engagement_potential": round(breakdown["engagement_potential"], 3),
+        "shareability": round(breakdown["shareability"], 3),
+        "controversy_risk": round(breakdown["controversy_risk"], 3),
+        "negative_signal_risk": round(breakdown["negative_signal_risk"], 3),
+        "diversity": {
+            "diversity_score": diversity["diversity_score"],
+            "diversity_tier": diversity["diversity_tier"],
+            "tier_description": diversity["tier_description"],
+            "factors": diversity["factors"],
+        },
+        "improvements": [_improvement_tip(tip) for tip in draft.improvements],
+        "content_stats": {
+            "char_count": features.char_count,
+            "word_count": features.word_count,
+            "hashtag_count": features.hashtag_count,
+            "mention_count": features.mention_count,
+            "has_question": features.has_question,
+            "has_cta": features.has_cta,
+            "emotional_tone": features.emotional_tone,
+            "viral_hooks": features.viral_hook_count,
+            "diversity_score": features.diversity_score,
+        },
+    }
+
+
+async def _score_draft(content: str, has_media: bool, media_type: str,
+                       video_duration_ms: int, times: Optional[StageTimes] = None) -> ScoredDraft:
+    """
+    Score a draft. Features and signal scores are served from the analysis
+    cache when possible, and only misses go to the scoring executor. A hit
+    needs just the final score, improvements and diversity, which are cheap
+    enough for the event loop, so hits never queue behind the pool or get a 503.
+
+    With stage timing on, the scorer's stages are merged into times, plus the
+    cache lookup and, for misses, the executor overhead (queueing and transfer).
+    """
+    started = time.perf_counter_ns() if times is not None else 0
+    trending_version = trending_topics.version
+    key = analysis_cache.make_key(content, has_media, media_type, video_duration_ms, trending_version)
+    cached = analysis_cache.get(key)
+    if times is not None:
+        submitted = time.perf_counter_ns()
+        times.add("cache", submitted - started)
+    if cached is not None:
+        draft = score_draft(content, has_media, media_type, video_duration_ms, cached)
+        if times is not None:
+            times.merge(draft.timings)
+        return draft
+
+    draft = await scoring_executor.run(score_draft, content, has_media, media_type, video_duration_ms)
+    # Process workers reload the trending index on their own schedule; store
+    # the result under the version it was computed with
+    if draft.trending_version != trending_version:
+        key = analysis_cache.make_key(content, has_media, media_type, video_duration_ms,
+                                      draft.trending_version)
+    analysis_cache.put(key, (draft.features, draft.signals))
+    if times is not None:
+        scored = draft.timings.ns.get("score", 0) if draft.timings is not None else 0
+        times.merge(draft.timings)
+        times.add("executor", time.perf_counter_ns() - submitted - scored)
+    return draft
+
 
 @router.post("/analyze", response_model=ContentAnalysisResponse)
 async def analyze_content(request: ContentAnalysisRequest):
     """
     Analyze content for virality potential using X's algorithm signals.
     """
+    times = StageTimes() if TIMING_ENABLED else None
     try:
-        # Extract features from content
-        features = scorer.extract_features(
+        # Features, signals, final score, improvements and diversity
+        draft = await _score_draft(
             content=request.content,
             has_media=request.has_media,
             media_type=request.media_type.value,
             video_duration_ms=request.video_duration_ms or 0,
+            times=times,
         )
 
-        # Calculate signal scores
-        signals = scorer.calculate_signal_scores(features)
+        # Get tier
+        tier = get_tier_for_score(draft.final_score)
 
-        # Calculate final score
-        final_score, breakdown = scorer.calculate_final_score(signals)
+        return _respond(_content_analysis(draft, draft.final_score, tier), ContentAnalysisResponse, times)
 
-        # Get tier
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _batch_items(result: BatchResult) -> List[Dict[str, Any]]:
+    """BatchAnalysisItem fields for every draft of a batch result"""
+    signal_rows = [[round(v, 3) for v in row] for row in result.signal_scores.tolist()]
+    final_scores = result.final_scores.tolist()
+    breakdown = {name: values.tolist() for name, values in result.breakdown.items()}
+
+    items = []
+    for i, final_score in enumerate(final_scores):
         tier = get_tier_for_score(final_score)
+        items.append({
+            "index": i,
+            "score": final_score,
+            "tier_level": tier.level,
+            "tier_name": tier.name,
+            "tier_emoji": tier.emoji,
+            "signals": dict(zip(SIGNAL_NAMES, signal_rows[i])),
+            "engagement_potential": round(breakdown["engagement_potential"][i], 3),
+            "shareability": round(breakdown["shareability"][i], 3),
+            "controversy_risk": round(breakdown["controversy_risk"][i], 3),
+            "negative_signal_risk": round(breakdown["negative_signal_risk"][i], 3),
+            "diversity_score": result.diversity_scores[i],
+        })
+    return items
+
+
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analyze many drafts (A/B variants, scheduled queues) in one call.
+
+    Features are extracted per draft, then signal, final and diversity scores
+    are computed for the whole batch at once with NumPy.
+    """
+    try:
+        result = await scoring_executor.run(score_batch, [
+            (item.content, item.has_media, item.media_type.value, item.video_duration_ms or 0)
+            for item in request.items
+        ])
+
+        results = [BatchAnalysisItem(**item) for item in _batch_items(result)]
+        return BatchAnalysisResponse(count=len(results), results=results)
+
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Generate improvements
-        improvements = scorer.generate_improvements(features, signals)
 
-        # Calculate diversity score
-        diversity_data = scorer.calculate_diversity_score(features)
-        diversity = DiversityScore(
-            diversity_score=diversity_data["diversity_score"],
-            diversity_tier=diversity_data["diversity_tier"],
-            tier_description=diversity_data["tier_description"],
-            factors=diversity_data["factors"],
+@router.post("/analyze/thread", response_model=ThreadAnalysisResponse)
+async def analyze_thread(request: ThreadAnalysisRequest):
+    """
+    Analyze a thread tweet by tweet.
+
+    The thread is split on '1/', '2/' markers (or blank lines) and all tweets
+    are scored together in one batch pass. Media applies to the opening tweet.
+    The aggregate weighs the opening tweet and the thread average, with the
+    thread content-type bonus.
+    """
+    try:
+        thread = split_thread(request.content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = await scoring_executor.run(score_batch, [
+            (tweet, request.has_media, request.media_type.value, request.video_duration_ms or 0) if i == 0
+            else (tweet, False, "none", 0)
+            for i, tweet in enumerate(thread.tweets)
+        ])
+
+        tweets = _batch_items(result)
+        for item, tweet in zip(tweets, thread.tweets):
+            item["content"] = tweet
+        scores = [item["score"] for item in tweets]
+        aggregate_score = aggregate_thread_score(scores)
+        aggregate_tier = get_tier_for_score(aggregate_score)
+        mean_signals = result.signal_scores.mean(axis=0).tolist()
+
+        return _respond({
+            "tweet_count": len(tweets),
+            "split_by": thread.split_by,
+            "tweets": tweets,
+            "aggregate_score": aggregate_score,
+            "aggregate_tier_level": aggregate_tier.level,
+            "aggregate_tier_name": aggregate_tier.name,
+            "aggregate_tier_emoji": aggregate_tier.emoji,
+            "aggregate_tier_description": aggregate_tier.description,
+            "aggregate_tier_color": aggregate_tier.color,
+            "hook_score": scores[0],
+            "weakest_tweet": scores.index(min(scores)),
+            "signals": {name: round(value, 3) for name, value in zip(SIGNAL_NAMES, mean_signals)},
+        }, ThreadAnalysisResponse)
+
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analyze/variants", response_model=VariantAnalysisResponse)
+async def analyze_variants(request: ContentAnalysisRequest):
+    """
+    Rewrite a draft for the improvement tips that fire on it (add a question,
+    open with a hook, trim hashtags, add a CTA, ...) and score every variant
+    in one pass, best first.
+
+    The draft is analyzed once; variant features are derived from it by
+    recounting only the edited text.
+    """
+    try:
+        variant_set = await scoring_executor.run(
+            score_variants, request.content, request.has_media, request.media_type.value,
+            request.video_duration_ms or 0,
+        )
+
+        rows = _batch_items(variant_set.result)
+        variants = []
+        for variant in variant_set.variants:
+            item = rows[variant.row]
+            variants.append({
+                "kind": variant.kind,
+                "rule": variant.rule,
+                "description": variant.description,
+                "content": variant.content,
+                "score": item["score"],
+                "score_delta": variant_set.delta(variant),
+                **{field: item[field] for field in _VARIANT_FIELDS},
+            })
+
+        base = rows[0]
+        return _respond({
+            "score": base["score"],
+            "tier_level": base["tier_level"],
+            "tier_name": base["tier_name"],
+            "tier_emoji": base["tier_emoji"],
+            "count": len(variants),
+            "variants": variants,
+        }, VariantAnalysisResponse)
+
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Batch item fields copied into each DraftVariant, in model order
+_VARIANT_FIELDS = (
+    "tier_level", "tier_name", "tier_emoji", "signals", "engagement_potential", "shareability",
+    "controversy_risk", "negative_signal_risk", "diversity_score",
+)
+
+
+def _live_response(analysis_id: str, features) -> LiveAnalysisResponse:
+    signals = scorer.calculate_signal_scores(features)
+    final_score, breakdown = scorer.calculate_final_score(signals)
+    tier = get_tier_for_score(final_score)
+    return LiveAnalysisResponse(
+        analysis_id=analysis_id,
+        score=final_score,
+        tier_level=tier.level,
+        tier_name=tier.name,
+        tier_emoji=tier.emoji,
+        tier_color=tier.color,
+        engagement_potential=round(breakdown["engagement_potential"], 3),
+        shareability=round(breakdown["shareability"], 3),
+        controversy_risk=round(breakdown["controversy_risk"], 3),
+        negative_signal_risk=round(breakdown["negative_signal_risk"], 3),
+        content_stats={
+            "char_count": features.char_count,
+            "word_count": features.word_count,
+            "hashtag_count": features.hashtag_count,
+            "mention_count": features.mention_count,
+            "has_question": features.has_question,
+            "has_cta": features.has_cta,
+            "emotional_tone": features.emotional_tone,
+            "viral_hooks": features.viral_hook_count,
+            "diversity_score": features.diversity_score,
+        },
+    )
+
+
+@router.post("/analyze/live", response_model=LiveAnalysisResponse)
+async def analyze_live_start(request: ContentAnalysisRequest):
+    """
+    Start as-you-type analysis of a draft.
+
+    Returns an analysis ID; send edits against it to /api/analyze/live/edit
+    instead of re-posting the whole draft. Live scoring is cheap enough to
+    stay on the event loop.
+    """
+    try:
+        analysis_id, features = incremental_analyzer.start(
+            content=request.content,
+            has_media=request.has_media,
+            media_type=request.media_type.value,
+            video_duration_ms=request.video_duration_ms or 0,
         )
+        return _live_response(analysis_id, features)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analyze/live/edit", response_model=LiveAnalysisResponse)
+async def analyze_live_edit(request: LiveAnalysisRequest):
+    """
+    Re-analyze a draft from a previous analysis ID plus text edits.
 
-        # Build response
-        signal_scores = [
-            SignalScore(
-                signal=name,
-                score=round(data["score"], 3),
-                weight=round(data["weight"], 3),
-                impact=data["impact"],
-                explanation=data["explanation"],
-            )
-            for name, data in signals.items()
-        ]
-
-        improvement_tips = [
-            ImprovementTip(**tip) for tip in improvements
-        ]
-
-        return ContentAnalysisResponse(
-            score=final_score,
-            tier_level=tier.level,
-            tier_name=tier.name,
-            tier_emoji=tier.emoji,
-            tier_description=tier.description,
-            tier_color=tier.color,
-            signal_scores=signal_scores,
-            engagement_potential=round(breakdown["engagement_potential"], 3),
-            shareability=round(breakdown["shareability"], 3),
-            controversy_risk=round(breakdown["controversy_risk"], 3),
-            negative_signal_risk=round(breakdown["negative_signal_risk"], 3),
-            diversity=diversity,
-            improvements=improvement_tips,
-            content_stats={
-                "char_count": features.char_count,
-                "word_count": features.word_count,
-                "hashtag_count": features.hashtag_count,
-                "mention_count": features.mention_count,
-                "has_question": features.has_question,
-                "has_cta": features.has_cta,
-                "emotional_tone": features.emotional_tone,
-                "viral_hooks": features.viral_hook_count,
-                "diversity_score": features.diversity_score,
-            },
+    Only the region around each edit is recounted. The previous ID is
+    consumed; a 404 means the client should start over via /api/analyze/live.
+    """
+    try:
+        analysis_id, features = incremental_analyzer.apply(
+            request.analysis_id,
+            [(edit.start, edit.end, edit.text) for edit in request.edits],
+            has_media=request.has_media,
+            media_type=request.media_type.value if request.media_type else None,
+            video_duration_ms=request.video_duration_ms,
         )
+        return _live_response(analysis_id, features)
 
+    except SessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidEdit as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Account recommendation tips are static; build their entries once
+_ACCOUNT_TIPS = {key: _improvement_tip(Tip(**tip)) for key, tip in ACCOUNT_TIPS.items()}
+
+
+def _account_analyses(scores: AccountScores,
+                      niches: List[Optional[str]]) -> List[Dict[str, Any]]:
+    """AccountSimulationResponse payload per scored account, in order"""
+    overall_scores = scores.overall_score.tolist()
+    engagement_rates = scores.engagement_rate.tolist()
+    follower_quality = scores.follower_quality.tolist()
+    consistency = scores.consistency.tolist()
+    growth_potential = scores.growth_potential.tolist()
+    viral_probability = scores.viral_probability.tolist()
+
+    responses = []
+    for i, overall_score in enumerate(overall_scores):
+        tier = get_tier_for_score(overall_score, scheme=niches[i])
+        responses.append({
+            "account_tier": tier.level,
+            "account_tier_name": tier.name,
+            "account_tier_emoji": tier.emoji,
+            "overall_score": overall_score,
+            "engagement_rate": round(engagement_rates[i], 2),
+            "follower_quality_score": round(follower_quality[i], 3),
+            "consistency_score": round(consistency[i], 3),
+            "growth_potential": round(growth_potential[i], 3),
+            "recommendations": [_ACCOUNT_TIPS[key] for key in scores.recommendations(i)],
+            "projected_reach_multiplier": round(1 + (overall_score / 50), 2),
+            "viral_post_probability": round(viral_probability[i], 3),
+        })
+    return responses
+
+
 @router.post("/account/simulate", response_model=AccountSimulationResponse)
 async def simulate_account(request: AccountSimulationRequest):
     """
     Simulate account virality tier based on metrics.
     """
     try:
-        # Calculate engagement rate
-        total_engagement = request.avg_likes + request.avg_replies + request.avg_retweets
-        engagement_rate = (total_engagement / max(request.followers_count, 1)) * 100
-
-        # Follower quality score (ratio-based)
-        if request.followers_count > 0:
-            ratio = request.followers_count / max(request.following_count, 1)
-            follower_quality = min(ratio / 5, 1.0)  # Cap at 5:1 ratio
-        else:
-            follower_quality = 0.1
-
-        # Consistency score
-        posts_per_day = request.posts_per_week / 7
-        if 1 <= posts_per_day <= 5:
-            consistency = 0.8 + (posts_per_day / 25)
-        elif posts_per_day < 1:
-            consistency = posts_per_day * 0.8
-        else:
-            consistency = max(0.5, 1.0 - (posts_per_day - 5) * 0.05)
-
-        # Growth potential
-        growth_potential = (
-            follower_quality * 0.3 +
-            min(engagement_rate / 5, 1.0) * 0.4 +
-            consistency * 0.3
-        )
+        scores = account_scorer.score_accounts([request])
+        return _respond(_account_analyses(scores, [request.niche])[0], AccountSimulationResponse)
 
-        # Calculate overall score
-        overall_score = int(
-            (engagement_rate * 10) +  # Engagement is king
-            (follower_quality * 20) +
-            (consistency * 15) +
-            (growth_potential * 15) +
-            (15 if request.is_verified else 0) +
-            min(request.account_age_days / 365, 1.0) * 10
-        )
-        overall_score = max(0, min(100, overall_score))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Get tier
-        tier = get_tier_for_score(overall_score)
-
-        # Generate recommendations
-        recommendations = []
-
-        if engagement_rate < 2:
-            recommendations.append(ImprovementTip(
-                signal="engagement",
-                tip="Your engagement rate is low. Focus on creating conversation-starting content.",
-                impact="+20-40%",
-                priority="high",
-                emoji="💬"
-            ))
-
-        if follower_quality < 0.5:
-            recommendations.append(ImprovementTip(
-                signal="followers",
-                tip="Improve follower quality by engaging with your niche community, not follow-for-follow.",
-                impact="+15-25%",
-                priority="medium",
-                emoji="🎯"
-            ))
-
-        if posts_per_day < 1:
-            recommendations.append(ImprovementTip(
-                signal="consistency",
-                tip="Post at least once daily. Consistency signals to the algorithm you're active.",
-                impact="+10-20%",
-                priority="high",
-                emoji="📅"
-            ))
-        elif posts_per_day > 10:
-            recommendations.append(ImprovementTip(
-                signal="consistency",
-                tip="Posting too much can feel spammy. Quality over quantity.",
-                impact="+5-10%",
-                priority="medium",
-                emoji="🎯"
-            ))
-
-        if not request.is_verified:
-            recommendations.append(ImprovementTip(
-                signal="verification",
-                tip="Verified accounts get algorithm priority. Consider X Premium.",
-                impact="+15-30%",
-                priority="low",
-                emoji="✓"
-            ))
-
-        # Viral probability
-        viral_probability = min(
-            (engagement_rate / 10) * 0.4 +
-            follower_quality * 0.3 +
-            (0.2 if request.is_verified else 0) +
-            consistency * 0.1,
-            0.95
-        )
 
-        return AccountSimulationResponse(
-            account_tier=tier.level,
-            account_tier_name=tier.name,
-            account_tier_emoji=tier.emoji,
-            overall_score=overall_score,
-            engagement_rate=round(engagement_rate, 2),
-            follower_quality_score=round(follower_quality, 3),
-            consistency_score=round(consistency, 3),
-            growth_potential=round(growth_potential, 3),
-            recommendations=recommendations,
-            projected_reach_multiplier=round(1 + (overall_score / 50), 2),
-            viral_post_probability=round(viral_probability, 3),
-        )
+@router.post("/account/simulate/batch", response_model=AccountSimulationBatchResponse)
+async def simulate_account_batch(request: AccountSimulationBatchRequest):
+    """
+    Simulate many accounts (e.g. a whole creator roster) in one call.
+
+    All accounts are scored at once with NumPy; results are identical to
+    calling /account/simulate for each account.
+    """
+    try:
+        scores = account_scorer.score_accounts(request.items)
+        results = _account_analyses(scores, [item.niche for item in request.items])
+        return _respond({"count": len(results), "results": results}, AccountSimulationBatchResponse)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sweep_values(axis: SweepAxis) -> List[float]:
+    if axis.values is not None:
+        return axis.values
+    if axis.start is None or axis.stop is None or axis.steps is None:
+        raise ValueError(f"Axis {axis.field.value!r} needs either values or start, stop and steps")
+    return np.linspace(axis.start, axis.stop, axis.steps).tolist()
+
+
+def _sweep_lines(grid: AccountGrid, scheme: TierScheme, chunk_size: int) -> Iterator[str]:
+    """NDJSON header line with the axes, then one line of results per chunk of grid points"""
+    yield json.dumps({
+        "fields": grid.fields,
+        "shape": list(grid.shape),
+        "points": grid.size,
+        "axes": {name: values.tolist() for name, values in zip(grid.fields, grid.values)},
+        "tiers": [{"level": t.level, "name": t.name, "emoji": t.emoji} for t in scheme.tiers],
+    }, ensure_ascii=False) + "\n"
+
+    levels = np.array(scheme.levels)
+    for start in range(0, grid.size, chunk_size):
+        stop = min(start + chunk_size, grid.size)
+        scores = account_scorer.score(grid.points(start, stop))
+        yield json.dumps({
+            "start": start,
+            "overall_score": scores.overall_score.tolist(),
+            "tier_level": levels[scores.overall_score].tolist(),
+            "viral_post_probability": [round(v, 3) for v in scores.viral_probability.tolist()],
+        }) + "\n"
+
+
+@router.post("/account/simulate/sweep")
+async def simulate_account_sweep(request: AccountSweepRequest):
+    """
+    What-if grid for an account (e.g. growth heatmaps).
+
+    Every combination of the axis values is scored with the same formula as
+    /account/simulate. The response is NDJSON: a header line with the axes,
+    grid shape and tier legend, then one line per chunk of points in row-major
+    order (last axis fastest) with overall scores, tier levels and viral post
+    probabilities. Chunks are computed as they are streamed.
+    """
+    try:
+        grid = AccountGrid(request.account, [
+            (axis.field.value, _sweep_values(axis)) for axis in request.axes
+        ])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    scheme = tier_registry.resolve(request.account.niche)
+    return StreamingResponse(_sweep_lines(grid, scheme, request.chunk_size),
+                             media_type="application/x-ndjson")
+
+
 @router.post("/analyze/combined", response_model=CombinedAnalysisResponse)
 async def analyze_combined(request: CombinedAnalysisRequest):
     """
@@ -233,6 +577,7 @@ async def analyze_combined(request: CombinedAnalysisRequest):
     - Content quality determines engagement potential
     - Combined score reflects real-world virality likelihood
     """
+    times = StageTimes() if TIMING_ENABLED else None
     try:
         # 1. Analyze content
         content_request = ContentAnalysisRequest(
@@ -242,210 +587,37 @@ async def analyze_combined(request: CombinedAnalysisRequest):
             video_duration_ms=request.video_duration_ms,
         )
 
-        # Extract features from content with content type consideration
-        features = scorer.extract_features(
+        # Features, signals, final score, improvements and diversity
+        draft = await _score_draft(
             content=request.content,
             has_media=request.has_media,
             media_type=request.media_type.value,
             video_duration_ms=request.video_duration_ms or 0,
+            times=times,
         )
 
         # Apply content type multipliers
         content_type_multipliers = {
             "short": 1.0,      # Standard tweets
-            "thread": 1.15,    # Threads get more engagement
+            "thread": THREAD_MULTIPLIER,  # Threads get more engagement
             "article": 1.05,   # Articles get quality readers
             "longform": 0.95,  # Long-form can be harder to engage with
             "quote": 1.1,      # Quote tweets benefit from original context
         }
         content_type_multiplier = content_type_multipliers.get(request.content_type.value, 1.0)
 
-        # Calculate signal scores
-        signals = scorer.calculate_signal_scores(features)
-
-        # Calculate final content score with content type adjustment
-        raw_post_score, breakdown = scorer.calculate_final_score(signals)
-        adjusted_post_score = min(100, int(raw_post_score * content_type_multiplier))
+        # Final content score with content type adjustment
+        adjusted_post_score = min(100, int(draft.final_score * content_type_multiplier))
 
         # Get tier for post
-        post_tier = get_tier_for_score(adjusted_post_score)
-
-        # Generate improvements
-        improvements = scorer.generate_improvements(features, signals)
+        post_tier = get_tier_for_score(adjusted_post_score, scheme=request.niche)
 
         # Build content response
-        signal_scores = [
-            SignalScore(
-                signal=name,
-                score=round(data["score"], 3),
-                weight=round(data["weight"], 3),
-                impact=data["impact"],
-                explanation=data["explanation"],
-            )
-            for name, data in signals.items()
-        ]
-
-        improvement_tips = [ImprovementTip(**tip) for tip in improvements]
-
-        # Calculate diversity score for combined analysis
-        diversity_data = scorer.calculate_diversity_score(features)
-        diversity = DiversityScore(
-            diversity_score=diversity_data["diversity_score"],
-            diversity_tier=diversity_data["diversity_tier"],
-            tier_description=diversity_data["tier_description"],
-            factors=diversity_data["factors"],
-        )
-
-        post_score = ContentAnalysisResponse(
-            score=adjusted_post_score,
-            tier_level=post_tier.level,
-            tier_name=post_tier.name,
-            tier_emoji=post_tier.emoji,
-            tier_description=post_tier.description,
-            tier_color=post_tier.color,
-            signal_scores=signal_scores,
-            engagement_potential=round(breakdown["engagement_potential"], 3),
-            shareability=round(breakdown["shareability"], 3),
-            controversy_risk=round(breakdown["controversy_risk"], 3),
-            negative_signal_risk=round(breakdown["negative_signal_risk"], 3),
-            diversity=diversity,
-            improvements=improvement_tips,
-            content_stats={
-                "char_count": features.char_count,
-                "word_count": features.word_count,
-                "hashtag_count": features.hashtag_count,
-                "mention_count": features.mention_count,
-                "has_question": features.has_question,
-                "has_cta": features.has_cta,
-                "emotional_tone": features.emotional_tone,
-                "viral_hooks": features.viral_hook_count,
-                "diversity_score": features.diversity_score,
-            },
-        )
+        post_score = _content_analysis(draft, adjusted_post_score, post_tier)
 
         # 2. Analyze account
-        account_request = AccountSimulationRequest(
-            followers_count=request.followers_count,
-            following_count=request.following_count,
-            avg_likes=request.avg_likes,
-            avg_replies=request.avg_replies,
-            avg_retweets=request.avg_retweets,
-            posts_per_week=request.posts_per_week,
-            account_age_days=request.account_age_days,
-            is_verified=request.is_verified,
-            niche=request.niche,
-        )
-
-        # Calculate engagement rate
-        total_engagement = request.avg_likes + request.avg_replies + request.avg_retweets
-        engagement_rate = (total_engagement / max(request.followers_count, 1)) * 100
-
-        # Follower quality score
-        if request.followers_count > 0:
-            ratio = request.followers_count / max(request.following_count, 1)
-            follower_quality = min(ratio / 5, 1.0)
-        else:
-            follower_quality = 0.1
-
-        # Consistency score
-        posts_per_day = request.posts_per_week / 7
-        if 1 <= posts_per_day <= 5:
-            consistency = 0.8 + (posts_per_day / 25)
-        elif posts_per_day < 1:
-            consistency = posts_per_day * 0.8
-        else:
-            consistency = max(0.5, 1.0 - (posts_per_day - 5) * 0.05)
-
-        # Growth potential
-        growth_potential = (
-            follower_quality * 0.3 +
-            min(engagement_rate / 5, 1.0) * 0.4 +
-            consistency * 0.3
-        )
-
-        # Calculate overall account score
-        account_score_value = int(
-            (engagement_rate * 10) +
-            (follower_quality * 20) +
-            (consistency * 15) +
-            (growth_potential * 15) +
-            (15 if request.is_verified else 0) +
-            min(request.account_age_days / 365, 1.0) * 10
-        )
-        account_score_value = max(0, min(100, account_score_value))
-
-        # Get tier for account
-        account_tier = get_tier_for_score(account_score_value)
-
-        # Generate account recommendations
-        recommendations = []
-
-        if engagement_rate < 2:
-            recommendations.append(ImprovementTip(
-                signal="engagement",
-                tip="Your engagement rate is low. Focus on creating conversation-starting content.",
-                impact="+20-40%",
-                priority="high",
-                emoji="💬"
-            ))
-
-        if follower_quality < 0.5:
-            recommendations.append(ImprovementTip(
-                signal="followers",
-                tip="Improve follower quality by engaging with your niche community, not follow-for-follow.",
-                impact="+15-25%",
-                priority="medium",
-                emoji="🎯"
-            ))
-
-        if posts_per_day < 1:
-            recommendations.append(ImprovementTip(
-                signal="consistency",
-                tip="Post at least once daily. Consistency signals to the algorithm you're active.",
-                impact="+10-20%",
-                priority="high",
-                emoji="📅"
-            ))
-        elif posts_per_day > 10:
-            recommendations.append(ImprovementTip(
-                signal="consistency",
-                tip="Posting too much can feel spammy. Quality over quantity.",
-                impact="+5-10%",
-                priority="medium",
-                emoji="🎯"
-            ))
-
-        if not request.is_verified:
-            recommendations.append(ImprovementTip(
-                signal="verification",
-                tip="Verified accounts get algorithm priority. Consider X Premium.",
-                impact="+15-30%",
-                priority="low",
-                emoji="✓"
-            ))
-
-        # Viral probability
-        viral_probability = min(
-            (engagement_rate / 10) * 0.4 +
-            follower_quality * 0.3 +
-            (0.2 if request.is_verified else 0) +
-            consistency * 0.1,
-            0.95
-        )
-
-        account_score = AccountSimulationResponse(
-            account_tier=account_tier.level,
-            account_tier_name=account_tier.name,
-            account_tier_emoji=account_tier.emoji,
-            overall_score=account_score_value,
-            engagement_rate=round(engagement_rate, 2),
-            follower_quality_score=round(follower_quality, 3),
-            consistency_score=round(consistency, 3),
-            growth_potential=round(growth_potential, 3),
-            recommendations=recommendations,
-            projected_reach_multiplier=round(1 + (account_score_value / 50), 2),
-            viral_post_probability=round(viral_probability, 3),
-        )
+        account_score = _account_analyses(account_scorer.score_accounts([request]), [request.niche])[0]
+        account_score_value = account_score["overall_score"]
 
         # 3. Calculate aggregate score using X algorithm principles
         # Account quality acts as a multiplier for content distribution
@@ -469,24 +641,58 @@ async def analyze_combined(request: CombinedAnalysisRequest):
         aggregate_score = max(0, min(100, aggregate_score))
 
         # Get tier for aggregate
-        aggregate_tier = get_tier_for_score(aggregate_score)
-
-        return CombinedAnalysisResponse(
-            account_score=account_score,
-            post_score=post_score,
-            aggregate_score=aggregate_score,
-            aggregate_tier_level=aggregate_tier.level,
-            aggregate_tier_name=aggregate_tier.name,
-            aggregate_tier_emoji=aggregate_tier.emoji,
-            aggregate_tier_description=aggregate_tier.description,
-            aggregate_tier_color=aggregate_tier.color,
-        )
-
+        aggregate_tier = get_tier_for_score(aggregate_score, scheme=request.niche)
+
+        return _respond({
+            "account_score": account_score,
+            "post_score": post_score,
+            "aggregate_score": aggregate_score,
+            "aggregate_tier_level": aggregate_tier.level,
+            "aggregate_tier_name": aggregate_tier.name,
+            "aggregate_tier_emoji": aggregate_tier.emoji,
+            "aggregate_tier_description": aggregate_tier.description,
+            "aggregate_tier_color": aggregate_tier.color,
+        }, CombinedAnalysisResponse, times)
+
+    except ExecutorSaturated as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/tiers")
-async def get_tiers():
-    """Get all virality tier definitions"""
-    return {"tiers": get_all_tiers()}
+async def get_tiers(scheme: Optional[str] = None,
+                    if_none_match: Optional[str] = Header(default=None)):
+    """
+    Get all virality tier definitions (of the default or a named scheme).
+
+    The body is serialized once per scheme; clients revalidating with
+    If-None-Match get a 304.
+    """
+    try:
+        tiers = tier_registry.scheme(scheme)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tier scheme {scheme!r}")
+
+    headers = {"ETag": tiers.etag, "Cache-Control": "public, max-age=300"}
+    if if_none_match is not None and tiers.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=tiers.payload, media_type="application/json", headers=headers)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters of the analysis cache"""
+    return analysis_cache.stats()
+
+
+@router.get("/executor/stats")
+async def get_executor_stats():
+    """Execution mode, queue depth and rejected job count of the scoring executor"""
+    return scoring_executor.stats()
+
+
+@router.get("/trending/stats")
+async def get_trending_stats():
+    """Trending topic index size, source, load timings and match timings"""
+    return trending_topics.stats()
@@ -1 +1,4 @@
 from .scorer import scorer, ViralityScorer
+from .batch import batch_scorer, BatchScorer
+from .account import account_scorer, AccountScorer
+from .cache import analysis_cache, AnalysisCache
@@ -0,0 +1,348 @@
+"""
+Batch Virality Scorer
+
+Scores many posts together. Text features are still extracted per post (the
+pattern matching is inherently per string), but they are packed into a
+columnar NumPy structure and every downstream formula - signal scores, the
+weighted final score and the diversity score - runs as array operations over
+the whole batch.
+
+The formulas mirror ViralityScorer exactly. Conditional bonuses are applied as
+``x += np.where(cond, bonus, 0.0)`` and weighted sums accumulate signal by
+signal in the same order as the scalar code, so every post gets bit-for-bit
+the same score it would get from /api/analyze.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .scorer import (
+    SIGNAL_INDEX,
+    SIGNAL_NAMES,
+    SIGNAL_WEIGHTS,
+    ContentFeatures,
+    ViralityScorer,
+    scorer,
+)
+
+
+@dataclass
+class FeatureColumns:
+    """One array per ContentFeatures field, indexed by post"""
+    char_count: np.ndarray
+    word_count: np.ndarray
+    hashtag_count: np.ndarray
+    mention_count: np.ndarray
+    url_count: np.ndarray
+    emoji_count: np.ndarray
+    has_question: np.ndarray
+    has_cta: np.ndarray
+    has_media: np.ndarray
+    is_image: np.ndarray
+    is_video: np.ndarray
+    video_duration_ms: np.ndarray
+    is_neutral: np.ndarray
+    is_controversial_tone: np.ndarray
+    emotional_intensity: np.ndarray
+    controversy_score: np.ndarray
+    trending_alignment: np.ndarray
+    viral_hook_count: np.ndarray
+    line_count: np.ndarray
+    caps_ratio: np.ndarray
+    deboost_risk: np.ndarray
+
+    @classmethod
+    def from_features(cls, features: Sequence[ContentFeatures],
+                      deboost_risk: Sequence[float]) -> "FeatureColumns":
+        """Pack per-post feature records into columns"""
+        def column(name: str, dtype) -> np.ndarray:
+            return np.fromiter((getattr(f, name) for f in features), dtype=dtype, count=len(features))
+
+        media_type = [f.media_type for f in features]
+        tone = [f.emotional_tone for f in features]
+        return cls(
+            char_count=column("char_count", np.int64),
+            word_count=column("word_count", np.int64),
+            hashtag_count=column("hashtag_count", np.int64),
+            mention_count=column("mention_count", np.int64),
+            url_count=column("url_count", np.int64),
+            emoji_count=column("emoji_count", np.int64),
+            has_question=column("has_question", bool),
+            has_cta=column("has_cta", bool),
+            has_media=column("has_media", bool),
+            is_image=np.array([m == "image" for m in media_type], dtype=bool),
+            is_video=np.array([m == "video" for m in media_type], dtype=bool),
+            video_duration_ms=column("video_duration_ms", np.int64),
+            is_neutral=np.array([t == "neutral" for t in tone], dtype=bool),
+            is_controversial_tone=np.array([t == "controversial" for t in tone], dtype=bool),
+            emotional_intensity=column("emotional_intensity", np.float64),
+            controversy_score=column("controversy_score", np.float64),
+            trending_alignment=column("trending_alignment", np.float64),
+            viral_hook_count=column("viral_hook_count", np.int64),
+            line_count=column("line_count", np.int64),
+            caps_ratio=column("caps_ratio", np.float64),
+            deboost_risk=np.asarray(deboost_risk, dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.char_count)
+
+
+@dataclass
+class BatchResult:
+    """
+    Scores for a batch of posts (row i belongs to input item i).
+
+    The feature records carry their diversity_score but not the detailed
+    diversity report unless they came in with one; calculate_diversity_score
+    builds it when it is missing.
+    """
+    features: List[ContentFeatures]
+    signal_scores: np.ndarray       # [N, len(SIGNAL_NAMES)]
+    signal_weights: np.ndarray      # [len(SIGNAL_NAMES)]
+    final_scores: np.ndarray        # [N] int
+    breakdown: Dict[str, np.ndarray]
+    diversity_scores: List[float]
+
+
+def _add(cond: np.ndarray, bonus: float) -> np.ndarray:
+    """Conditional bonus, exact: adding 0.0 leaves a float unchanged"""
+    return np.where(cond, bonus, 0.0)
+
+
+class BatchScorer:
+    """
+    Vectorized counterpart of ViralityScorer for many posts at once.
+    """
+
+    def __init__(self, base: ViralityScorer):
+        self.base = base
+        self.signal_weights = np.array(SIGNAL_WEIGHTS, dtype=np.float64)
+
+    def extract_columns(self, items: Sequence[Tuple[str, bool, str, int]]
+                        ) -> Tuple[List[ContentFeatures], FeatureColumns]:
+        """Extract per-post text features into columns (diversity is left for diversity_scores)"""
+        features = [
+            self.base._extract_preliminary_features(content, has_media, media_type, video_duration_ms)
+            for content, has_media, media_type, video_duration_ms in items
+        ]
+        deboost_risk = [self.base._analyze_deboost_risk(f.content) for f in features]
+        return features, FeatureColumns.from_features(features, deboost_risk)
+
+    def base_quality(self, cols: FeatureColumns) -> np.ndarray:
+        """Vectorized ViralityScorer._calculate_base_quality"""
+        n = len(cols)
+        score = np.full(n, 0.3)
+
+        optimal = (cols.char_count >= 100) & (cols.char_count <= 280)
+        acceptable = (cols.char_count >= 50) & (cols.char_count <= 400)
+        score += np.where(optimal, 0.15, np.where(acceptable, 0.08, 0.0))
+
+        score += _add(cols.has_media, 0.15)
+
+        hashtag_sweet = (cols.hashtag_count >= 1) & (cols.hashtag_count <= 2)
+        score += np.where(hashtag_sweet, 0.05, np.where(cols.hashtag_count > 5, -0.10, 0.0))
+
+        score += _add((cols.mention_count >= 1) & (cols.mention_count <= 3), 0.05)
+        score += _add((cols.emoji_count >= 1) & (cols.emoji_count <= 4), 0.05)
+
+        score += cols.viral_hook_count * 0.08
+
+        return np.minimum(np.maximum(score, 0.1), 0.9)
+
+    def signal_matrix(self, cols: FeatureColumns) -> np.ndarray:
+        """Vectorized ViralityScorer.calculate_signal_scores -> [N, len(SIGNAL_NAMES)]"""
+        base = self.base_quality(cols)
+        out = np.empty((len(cols), len(SIGNAL_NAMES)))
+
+        def put(name: str, value: np.ndarray) -> None:
+            out[:, SIGNAL_INDEX[name]] = np.minimum(value, 1.0)
+
+        favorite = base * 0.7
+        favorite += _add(cols.has_media, 0.15)
+        favorite += _add(cols.emotional_intensity > 0.5, 0.10)
+        put("favorite", favorite)
+
+        reply = base * 0.5
+        reply += _add(cols.has_question, 0.25)
+        reply += _add(cols.controversy_score > 0.3, 0.20)
+        put("reply", reply)
+
+        retweet = base * 0.5
+        retweet += _add(cols.viral_hook_count > 0, 0.20)
+        retweet += _add(cols.trending_alignment > 0.3, 0.15)
+        retweet += _add(cols.has_cta, 0.10)
+        put("retweet", retweet)
+
+        quote = base * 0.4
+        quote += _add(cols.controversy_score > 0.5, 0.25)
+        quote += _add(cols.is_controversial_tone, 0.15)
+        put("quote", quote)
+
+        follow = base * 0.3
+        follow += _add(cols.viral_hook_count >= 2, 0.15)
+        put("follow_author", follow)
+
+        click = base * 0.6
+        click += _add(cols.line_count > 3, 0.15)
+        put("click", click)
+
+        profile = base * 0.4
+        profile += _add(cols.controversy_score > 0.3, 0.10)
+        put("profile_click", profile)
+
+        put("photo_expand", np.where(cols.has_media & cols.is_image, base * 0.7 + 0.2, 0.1))
+
+        vqv = np.where(cols.has_media & cols.is_video, base * 0.6 + 0.2, 0.1)
+        optimal_video = (cols.video_duration_ms >= 30000) & (cols.video_duration_ms <= 120000)
+        vqv += _add(cols.has_media & cols.is_video & optimal_video, 0.15)
+        put("video_quality_view", vqv)
+
+        dwell = base * 0.5
+        dwell += _add(cols.char_count > 200, 0.15)
+        dwell += _add(cols.line_count > 2, 0.10)
+        put("dwell_time", dwell)
+
+        share_base = base * 0.4
+        put("share", share_base + 0.1)
+        put("share_dm", share_base * 0.8)
+        put("share_copy_link", share_base * 0.7)
+
+        negative_base = 0.05
+        not_interested = np.full(len(cols), negative_base)
+        not_interested += _add(cols.caps_ratio > 0.5, 0.15)
+        not_interested += _add(cols.hashtag_count > 5, 0.20)
+        put("not_interested", not_interested)
+
+        extreme_risk = np.full(len(cols), negative_base)
+        extreme_risk += _add(cols.caps_ratio > 0.7, 0.10)
+        put("block_author", extreme_risk)
+        put("mute_author", extreme_risk + 0.05)
+        put("report", extreme_risk * 0.5)
+
+        out[:, SIGNAL_INDEX["deboost"]] = cols.deboost_risk
+        return out
+
+    def final_scores(self, signals: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Vectorized ViralityScorer.calculate_final_score"""
+        n = signals.shape[0]
+        positive_sum = np.zeros(n)
+        negative_sum = np.zeros(n)
+        weights_sum = 0.0
+
+        # Accumulate in signal order so rounding matches the scalar loop
+        for j, weight in enumerate(self.signal_weights.tolist()):
+            if weight > 0:
+                positive_sum = positive_sum + signals[:, j] * weight
+                weights_sum += weight
+            else:
+                negative_sum = negative_sum + signals[:, j] * abs(weight)
+
+        positive_normalized = positive_sum / weights_sum if weights_sum > 0 else np.zeros(n)
+        final = positive_normalized - (negative_sum * 0.5)
+        final_scores = np.maximum(0, np.minimum(100, final * 100)).astype(np.int64)
+
+        col = lambda name: signals[:, SIGNAL_INDEX[name]]
+        breakdown = {
+            "engagement_potential": positive_normalized,
+            "shareability": col("retweet") * 0.5 + col("quote") * 0.3 + col("share") * 0.2,
+            "controversy_risk": col("quote") * 0.5 + (col("reply") - 0.3) * 0.5,
+            "negative_signal_risk": negative_sum,
+        }
+        return final_scores, breakdown
+
+    def diversity_scores(self, cols: FeatureColumns) -> List[float]:
+        """Vectorized compact score of ViralityScorer._analyze_diversity"""
+        n = len(cols)
+
+        # 1. Content type diversity
+        content_elements = (
+            cols.has_media.astype(np.int64)
+            + (cols.url_count > 0)
+            + ((cols.hashtag_count > 0) & (cols.hashtag_count <= 3))
+            + ((cols.mention_count > 0) & (cols.mention_count <= 3))
+            + ((cols.emoji_count > 0) & (cols.emoji_count <= 5))
+        )
+        diversity = np.zeros(n)
+        diversity += np.minimum(content_elements / 5, 1.0) * 0.3
+
+        # 2. Engagement mechanism diversity
+        engagement_mechanisms = (
+            cols.has_question.astype(np.int64)
+            + cols.has_cta
+            + (cols.controversy_score > 0.2)
+            + (cols.viral_hook_count > 0)
+            + (cols.trending_alignment > 0.3)
+        )
+        diversity += np.minimum(engagement_mechanisms / 5, 1.0) * 0.3
+
+        # 3. Length and structure diversity
+        chars = cols.char_count
+        length_score = np.where(
+            (chars >= 50) & (chars <= 500), 1.0,
+            np.where(chars < 50, chars / 50, np.maximum(0, 1.0 - (chars - 500) / 1000)),
+        )
+        structure_bonus = np.minimum(cols.line_count / 10, 0.2)
+        diversity += np.minimum(length_score + structure_bonus, 1.0) * 0.2
+
+        # 4. Emotional diversity
+        intensity = cols.emotional_intensity
+        emotional = np.where(
+            (intensity >= 0.3) & (intensity <= 0.7), 1.0,
+            np.where(intensity < 0.3, intensity / 0.3 * 0.8,
+                     np.maximum(0.5, 1.0 - (intensity - 0.7) * 1.5)),
+        )
+        emotional = np.where(cols.is_neutral, 0.6, emotional)
+        diversity += emotional * 0.2
+
+        # Spam penalty
+        spam_penalty = np.zeros(n)
+        spam_penalty += _add(cols.caps_ratio > 0.5, 0.2)
+        spam_penalty += _add(cols.hashtag_count > 5, 0.15)
+        spam_penalty += _add(cols.mention_count > 5, 0.15)
+
+        diversity = np.maximum(0, np.minimum(diversity - spam_penalty, 1.0))
+
+        # Python's round() is correctly rounded; np.round is not, so finish per value
+        return [round(value, 3) for value in diversity.tolist()]
+
+    def score(self, items: Sequence[Tuple[str, bool, str, int]]) -> BatchResult:
+        """Score (content, has_media, media_type, video_duration_ms) tuples in one pass"""
+        features, cols = self.extract_columns(items)
+        result = self.score_columns(features, cols)
+        # The records were built above, so they take their diversity score in place
+        for record, diversity_score in zip(features, result.diversity_scores):
+            record.diversity_score = diversity_score
+        return result
+
+    def score_features(self, features: List[ContentFeatures]) -> BatchResult:
+        """
+        Score already extracted feature records. The records passed in are not
+        modified; the result holds copies with the recomputed diversity_score.
+        """
+        deboost_risk = [self.base._analyze_deboost_risk(f.content) for f in features]
+        result = self.score_columns(features, FeatureColumns.from_features(features, deboost_risk))
+        result.features = [
+            replace(record, diversity_score=diversity_score)
+            for record, diversity_score in zip(features, result.diversity_scores)
+        ]
+        return result
+
+    def score_columns(self, features: List[ContentFeatures], cols: FeatureColumns) -> BatchResult:
+        """Signal, final and diversity scores for packed feature columns (features is not modified)"""
+        signals = self.signal_matrix(cols)
+        final_scores, breakdown = self.final_scores(signals)
+        return BatchResult(
+            features=features,
+            signal_scores=signals,
+            signal_weights=self.signal_weights,
+            final_scores=final_scores,
+            breakdown=breakdown,
+            diversity_scores=self.diversity_scores(cols),
+        )
+
+
+# Singleton instance
+batch_scorer = BatchScorer(scorer)
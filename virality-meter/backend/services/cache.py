@@ -0,0 +1,125 @@
+"""
+Content-Addressed Analysis Cache
+
+In-process LRU/TTL cache of (ContentFeatures, signal scores) keyed by a hash
+of everything extract_features depends on, including the version of the
+trending index, so a reloaded term list is never answered from old entries.
+Identical drafts that come back while users tweak other fields (account
+metrics, content type) skip feature extraction and signal scoring entirely.
+
+The cache is bounded both by entry count and by an approximate byte budget;
+whichever limit is hit first evicts the least recently used entries.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import os
+import sys
+import threading
+import time
+
+from .scorer import ContentFeatures, SignalScores
+
+# Rough size of a ContentFeatures record plus its SignalScores vector and
+# the LRU bookkeeping, excluding the content string itself (measured with
+# benchmarks/allocations.py).
+ENTRY_OVERHEAD_BYTES = 1024
+
+CachedAnalysis = Tuple[ContentFeatures, SignalScores]
+
+
+class AnalysisCache:
+    """
+    Thread-safe LRU cache with a TTL, an entry limit and a byte budget.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[str, Tuple[float, int, CachedAnalysis]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(content: str, has_media: bool, media_type: str, video_duration_ms: int,
+                 trending_version: str = "") -> str:
+        """Hash of every input extract_features depends on"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(
+            f"{int(has_media)}\x1f{media_type}\x1f{video_duration_ms}\x1f{trending_version}\x1f".encode()
+        )
+        digest.update(content.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[CachedAnalysis]:
+        """Return the cached analysis for key, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, size, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: CachedAnalysis) -> None:
+        """Insert value, evicting least recently used entries to stay in budget"""
+        size = sys.getsizeof(value[0].content) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return  # Would evict everything else; not worth caching
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (time.monotonic(), size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "approx_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Singleton instance (limits can be tuned per deployment)
+analysis_cache = AnalysisCache(
+    max_entries=int(os.environ.get("ANALYSIS_CACHE_MAX_ENTRIES", 4096)),
+    max_bytes=int(os.environ.get("ANALYSIS_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    ttl_seconds=float(os.environ.get("ANALYSIS_CACHE_TTL_SECONDS", 600)),
+)
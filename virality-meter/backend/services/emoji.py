@@ -0,0 +1,63 @@
+"""
+Emoji Matching
+
+EMOJI_RE matches one emoji as a reader sees it, across the whole emoji range
+rather than only U+1F300-1F9FF:
+
+- pictographs from the Supplemental Symbols, Symbols & Pictographs Extended-A,
+  Misc Symbols, Dingbats, Misc Technical and Arrows blocks, optionally with a
+  variation selector (U+FE0F)
+- text-style symbols (©, ™, ▶ ...) only when followed by U+FE0F
+- skin tone modifiers, tag sequences (subdivision flags) and ZWJ sequences
+  (👩‍👧, 👨‍👩‍👧‍👦) as part of the emoji they modify
+- flags (pairs of regional indicators) and keycaps (#️⃣, 1️⃣; the digit
+  itself is left to word matching)
+
+So "👍🏽", "🇺🇸" and "👩‍👧" each count as one emoji. An emoji never contains
+whitespace, so counts over a text are the sum of counts over its
+whitespace-separated chunks. Digit-like symbols (❶, 🄁) are left out because
+they are word characters.
+
+The pattern starts with a single character class, which lets the regex
+engine skip non-candidate characters quickly.
+"""
+
+import re
+
+REGIONAL_INDICATORS = "\U0001F1E6-\U0001F1FF"
+PICTOGRAPHS = (
+    "\U0001F000-\U0001F0FF\U0001F10D-\U0001FAFF"  # Includes regional indicators and skin tones
+    "\u2600-\u2775\u2794-\u27BF"  # Misc Symbols and Dingbats, without the circled digits
+    "\u2B00-\u2BFF"  # Arrows and stars
+    "\u231A\u231B\u2328\u23CF\u23E9-\u23F3\u23F8-\u23FA"  # Watch, hourglass, media controls
+    "\u3030\u303D\u3297\u3299"
+)
+TEXT_SYMBOLS = (
+    "\u00A9\u00AE\u203C\u2049\u2122\u2139\u2194-\u2199\u21A9\u21AA\u24C2"
+    "\u25AA\u25AB\u25B6\u25C0\u25FB-\u25FE\u2934\u2935"
+)
+SKIN_TONES = "\U0001F3FB-\U0001F3FF"
+TAGS = "\U000E0020-\U000E007F"
+VS16 = "\uFE0F"
+KEYCAP = "\u20E3"
+ZWJ = "\u200D"
+
+_MODIFIERS = f"[{SKIN_TONES}]?[{TAGS}]*"
+_ELEMENT = f"(?:[{PICTOGRAPHS}]{VS16}?|[{TEXT_SYMBOLS}]{VS16}){_MODIFIERS}"
+
+EMOJI_RE = re.compile(
+    # First character, then what may follow it
+    f"[{PICTOGRAPHS}{TEXT_SYMBOLS}#*{VS16}{KEYCAP}]"
+    f"(?:(?<=[{REGIONAL_INDICATORS}])[{REGIONAL_INDICATORS}]?"
+    f"|(?<=[#*]){VS16}?{KEYCAP}"
+    f"|(?<={VS16}){KEYCAP}"
+    f"|(?<={KEYCAP})"
+    f"|(?<=[{PICTOGRAPHS}]){VS16}?"
+    f"|(?<=[{TEXT_SYMBOLS}]){VS16})"
+    f"{_MODIFIERS}(?:{ZWJ}{_ELEMENT})*"
+)
+
+
+def count_emoji(text: str) -> int:
+    """Number of emoji in text"""
+    return len(EMOJI_RE.findall(text))
@@ -0,0 +1,200 @@
+"""
+Scoring Executor
+
+Runs CPU-bound scoring off the asyncio event loop so one long post cannot
+stall every other connection.
+
+Modes (SCORING_EXECUTOR environment variable):
+- "inline":  score on the event loop (default)
+- "thread":  thread pool; only useful for throughput on free-threaded builds
+- "process": process pool
+- "auto":    process pool, thread pool when the GIL is disabled, inline on
+             single-CPU hosts where a pool only adds IPC overhead
+
+Pools are opt-in: on one core a process pool made short-post latency worse
+(benchmarks/executor_latency.py), so measure on the target hosts first.
+
+At most SCORING_MAX_PENDING jobs may be queued or running at once; beyond
+that run() raises ExecutorSaturated so the API can answer 503 instead of
+letting latency grow without bound.
+"""
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from .batch import BatchResult, batch_scorer
+from .improvements import Tip
+from .scorer import ContentFeatures, SignalScores, scorer
+from .timing import StageTimes, collect_stage_times
+from .variants import VariantSet, variant_generator
+
+EXECUTOR_MODES = ("inline", "thread", "process", "auto")
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the scoring queue is full"""
+
+
+@dataclass
+class ScoredDraft:
+    """Everything the analysis endpoints need for one draft"""
+    features: ContentFeatures
+    signals: SignalScores
+    final_score: int
+    breakdown: Dict[str, float]
+    improvements: List[Tip]
+    diversity: Dict[str, Any]
+    timings: Optional[StageTimes] = None  # Only when PIPELINE_TIMING is on
+    trending_version: Optional[str] = None  # Trending index features were extracted with
+
+
+def score_draft(content: str, has_media: bool, media_type: str, video_duration_ms: int,
+                cached: Optional[Tuple[ContentFeatures, SignalScores]] = None) -> ScoredDraft:
+    """
+    Full scoring pass for one draft. Module-level so process pools can pickle it.
+
+    When cached (features, signals) are given, feature extraction and signal
+    scoring are skipped.
+    """
+    with collect_stage_times() as timings:
+        started = time.perf_counter_ns()
+        trending_version = None
+        if cached is None:
+            trending_version = scorer.trending.version
+            features = scorer.extract_features(
+                content=content,
+                has_media=has_media,
+                media_type=media_type,
+                video_duration_ms=video_duration_ms,
+            )
+            signals = scorer.calculate_signal_scores(features)
+        else:
+            features, signals = cached
+
+        final_score, breakdown = scorer.calculate_final_score(signals)
+        draft = ScoredDraft(
+            features=features,
+            signals=signals,
+            final_score=final_score,
+            breakdown=breakdown,
+            improvements=scorer.generate_improvements(features, signals),
+            diversity=scorer.calculate_diversity_score(features),
+            timings=timings,
+            trending_version=trending_version,
+        )
+        if timings is not None:
+            timings.add("score", time.perf_counter_ns() - started)
+    return draft
+
+
+def score_batch(items: List[Tuple[str, bool, str, int]]) -> BatchResult:
+    """Vectorized scoring of many drafts (see services.batch)"""
+    return batch_scorer.score(items)
+
+
+def score_variants(content: str, has_media: bool, media_type: str, video_duration_ms: int) -> VariantSet:
+    """Rewrites of one draft for the tips that fire on it, scored together (see services.variants)"""
+    return variant_generator.generate(content, has_media, media_type, video_duration_ms)
+
+
+def _gil_disabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class ScoringExecutor:
+    """
+    Bounded async front-end over an inline, thread or process executor.
+    """
+
+    def __init__(self, mode: str = "inline", max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown scoring executor mode {mode!r}, expected one of {EXECUTOR_MODES}")
+        if mode == "auto":
+            if _available_cpus() == 1:
+                mode = "inline"
+            else:
+                mode = "thread" if _gil_disabled() else "process"
+        self.mode = mode
+        self.max_workers = max_workers or _available_cpus()
+        self.max_pending = max_pending or self.max_workers * 8
+
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="scoring")
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) according to the execution mode, respecting the queue bound"""
+        if self.mode == "inline":
+            return fn(*args)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"Scoring queue is full ({self._pending} pending); retry shortly"
+                )
+            self._pending += 1
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # A cancelled request leaves its job running in the pool, so the slot is
+        # released when the job ends rather than when the caller stops waiting
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Optional[Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+# Singleton instance
+scoring_executor = ScoringExecutor(
+    mode=os.environ.get("SCORING_EXECUTOR", "inline"),
+    max_workers=_env_int("SCORING_WORKERS"),
+    max_pending=_env_int("SCORING_MAX_PENDING"),
+)
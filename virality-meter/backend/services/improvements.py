@@ -0,0 +1,340 @@
+"""
+Improvement Tip Rules
+
+Improvement tips are a declarative rule table: each rule is a conjunction of
+conditions on the draft's features or predicted signal scores, plus the tip
+shown when all of them hold. Rules are compiled once into immutable Tip
+objects; a request only evaluates predicates and collects references.
+
+The table is kept ordered by priority (stable within a priority), so the top
+tips are simply the first matches - no per-request sort, and evaluation stops
+as soon as enough tips are found.
+
+The built-in table can be replaced by a JSON file (IMPROVEMENT_TIPS_FILE)
+holding a list in the same format as DEFAULT_TIP_RULES:
+
+    [{"name": "add_question",
+      "when": [["has_question", "==", false], ["signals.reply", "<", 0.6]],
+      "tip": {"signal": "reply", "tip": "...", "impact": "+15-20%",
+              "priority": "high", "emoji": "❓"}}]
+
+Condition operands name a ContentFeatures field, or a signal as "signals.<name>".
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import operator
+
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+SIGNAL_PREFIX = "signals."
+
+# Tips returned per draft
+MAX_TIPS = 6
+
+DEFAULT_TIP_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "add_question",
+        "when": [["has_question", "==", False], ["signals.reply", "<", 0.6]],
+        "tip": {
+            "signal": "reply",
+            "tip": "Add a question to spark replies",
+            "action": "End with: 'What's your take?' or 'Anyone else experience this?' or 'Thoughts?'",
+            "example": "→ 'The best time to post is 9am EST. Agree or disagree?'",
+            "impact": "+15-20%",
+            "priority": "high",
+            "emoji": "❓",
+        },
+    },
+    {
+        "name": "add_media",
+        "when": [["has_media", "==", False]],
+        "tip": {
+            "signal": "favorite",
+            "tip": "Add visual content for 2x engagement",
+            "action": "Attach an image, screenshot, meme, or short video clip",
+            "example": "→ Screenshots of tweets, charts, behind-the-scenes photos work best",
+            "impact": "+25-40%",
+            "priority": "high",
+            "emoji": "🖼️",
+        },
+    },
+    {
+        "name": "add_viral_hook",
+        "when": [["viral_hook_count", "==", 0]],
+        "tip": {
+            "signal": "retweet",
+            "tip": "Open with a viral hook",
+            "action": "Start with: 'Thread:', 'Hot take:', 'POV:', 'Nobody talks about...'",
+            "example": "→ 'Unpopular opinion: [your take]' or '1/ Here's why...'",
+            "impact": "+10-15%",
+            "priority": "medium",
+            "emoji": "🪝",
+        },
+    },
+    {
+        "name": "expand_post",
+        "when": [["char_count", "<", 80]],
+        "tip": {
+            "signal": "dwell_time",
+            "tip": "Expand your post for better engagement",
+            "action": "Add context, reasoning, or a personal angle to reach 100-200 chars",
+            "example": "→ Instead of 'AI is changing everything' try 'AI is changing everything. I spent 3 hours on a task that now takes 10 minutes. Here's how...'",
+            "impact": "+8-12%",
+            "priority": "medium",
+            "emoji": "📝",
+        },
+    },
+    {
+        "name": "split_into_thread",
+        "when": [["char_count", ">", 400]],
+        "tip": {
+            "signal": "favorite",
+            "tip": "Break into a numbered thread",
+            "action": "Split into 3-5 tweets with '1/', '2/', '3/' format",
+            "example": "→ First tweet hooks, subsequent tweets deliver value. End with a CTA to follow.",
+            "impact": "+10-15%",
+            "priority": "medium",
+            "emoji": "🧵",
+        },
+    },
+    {
+        "name": "remove_hashtags",
+        "when": [["hashtag_count", ">", 3]],
+        "tip": {
+            "signal": "not_interested",
+            "tip": "Remove excess hashtags",
+            "action": "Keep only 1-2 most relevant hashtags at the end",
+            "example": "→ '#AI #Tech' is fine. '#AI #Tech #Future #Innovation #Startup #Growth' is spam.",
+            "impact": "-15% risk",
+            "priority": "high",
+            "emoji": "🚫",
+        },
+    },
+    {
+        "name": "add_hashtags",
+        "when": [["hashtag_count", "==", 0], ["trending_alignment", "<", 0.3]],
+        "tip": {
+            "signal": "retweet",
+            "tip": "Add 1-2 discovery hashtags",
+            "action": "Add relevant trending or niche hashtags at the end",
+            "example": "→ If posting about crypto, add '#Bitcoin' or '#Crypto'. For tech, '#AI' or '#Tech'.",
+            "impact": "+5-10%",
+            "priority": "low",
+            "emoji": "#️⃣",
+        },
+    },
+    {
+        "name": "add_cta",
+        "when": [["has_cta", "==", False], ["signals.retweet", "<", 0.5]],
+        "tip": {
+            "signal": "retweet",
+            "tip": "Add a call-to-action",
+            "action": "End with a soft CTA that encourages engagement",
+            "example": "→ 'Bookmark this for later' or 'RT to help others' or 'Follow for more'",
+            "impact": "+8-12%",
+            "priority": "medium",
+            "emoji": "📣",
+        },
+    },
+    {
+        "name": "reduce_caps",
+        "when": [["caps_ratio", ">", 0.3]],
+        "tip": {
+            "signal": "not_interested",
+            "tip": "Reduce ALL CAPS usage",
+            "action": "Use caps sparingly for ONE word emphasis only",
+            "example": "→ 'This is HUGE' ✓ vs 'THIS IS HUGE NEWS EVERYONE' ✗",
+            "impact": "-10% risk",
+            "priority": "high",
+            "emoji": "🔇",
+        },
+    },
+    {
+        "name": "add_emotion",
+        "when": [["emotional_intensity", "<", 0.2]],
+        "tip": {
+            "signal": "favorite",
+            "tip": "Add emotional language",
+            "action": "Include words that trigger emotion: amazing, terrible, mind-blowing, frustrating",
+            "example": "→ 'New feature released' vs 'This new feature is absolutely game-changing'",
+            "impact": "+10-15%",
+            "priority": "medium",
+            "emoji": "💥",
+        },
+    },
+    {
+        "name": "add_contrarian_angle",
+        "when": [["controversy_score", "<", 0.2], ["signals.quote", "<", 0.4]],
+        "tip": {
+            "signal": "quote",
+            "tip": "Add a contrarian angle",
+            "action": "Challenge conventional wisdom or share an unpopular take",
+            "example": "→ 'Everyone says X but I think Y because...' drives quote tweets",
+            "impact": "+15-25%",
+            "priority": "low",
+            "emoji": "🌶️",
+        },
+    },
+    {
+        "name": "tag_accounts",
+        "when": [["mention_count", "==", 0], ["signals.reply", "<", 0.5]],
+        "tip": {
+            "signal": "reply",
+            "tip": "Tag relevant accounts",
+            "action": "Mention 1-2 accounts who'd find this valuable or might engage",
+            "example": "→ Tag the creator you're discussing or someone in your niche",
+            "impact": "+5-10%",
+            "priority": "low",
+            "emoji": "📍",
+        },
+    },
+    {
+        "name": "add_emojis",
+        "when": [["emoji_count", "==", 0], ["emotional_intensity", "<", 0.3]],
+        "tip": {
+            "signal": "click",
+            "tip": "Add 1-2 relevant emojis",
+            "action": "Use emojis to break up text and add visual interest",
+            "example": "→ Lead with an emoji: '🚀 Just launched...' or '💡 Pro tip:...'",
+            "impact": "+3-5%",
+            "priority": "low",
+            "emoji": "✨",
+        },
+    },
+]
+
+
+@dataclass(frozen=True)
+class Tip:
+    """One improvement tip (same fields as the ImprovementTip response model)"""
+    signal: str
+    tip: str
+    impact: str
+    priority: str
+    emoji: str
+    action: Optional[str] = None
+    example: Optional[str] = None
+
+
+TIP_FIELDS = frozenset(f.name for f in fields(Tip))
+
+# (is_signal, feature or signal name, comparison, threshold)
+Condition = Tuple[bool, str, Callable[[Any, Any], bool], Any]
+
+
+@dataclass(frozen=True)
+class TipRule:
+    """A tip and the conditions that must all hold for it to be shown"""
+    name: str
+    conditions: Tuple[Condition, ...]
+    tip: Tip
+
+    def matches(self, features: Any, signals: Any) -> bool:
+        for is_signal, name, compare, threshold in self.conditions:
+            value = signals[name] if is_signal else getattr(features, name)
+            if not compare(value, threshold):
+                return False
+        return True
+
+
+class TipRuleTable:
+    """
+    Immutable, priority-ordered set of tip rules.
+    """
+
+    def __init__(self, rules: Iterable[TipRule]):
+        # sorted() is stable: rules of the same priority keep their table order
+        self.rules: Tuple[TipRule, ...] = tuple(
+            sorted(rules, key=lambda rule: PRIORITY_ORDER[rule.tip.priority])
+        )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def select(self, features: Any, signals: Any, limit: int = MAX_TIPS) -> List[Tip]:
+        """Highest-priority matching tips, at most limit of them"""
+        tips: List[Tip] = []
+        if limit <= 0:
+            return tips
+        for rule in self.rules:
+            if rule.matches(features, signals):
+                tips.append(rule.tip)
+                if len(tips) == limit:
+                    break
+        return tips
+
+    @classmethod
+    def from_dicts(cls, items: Sequence[Dict[str, Any]], feature_names: Iterable[str],
+                   signal_names: Iterable[str]) -> "TipRuleTable":
+        """Compile rule dicts, validating every operand, operator and tip field"""
+        feature_names = set(feature_names)
+        signal_names = set(signal_names)
+        rules = []
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f"Tip rule {position}: expected an object, got {item!r}")
+            name = item.get("name") or f"rule {position}"
+
+            conditions = []
+            when = item.get("when", ())
+            if not isinstance(when, (list, tuple)):
+                raise ValueError(f"Tip rule {name!r}: 'when' must be a list of conditions")
+            for condition in when:
+                if not isinstance(condition, (list, tuple)) or len(condition) != 3 \
+                        or not isinstance(condition[0], str):
+                    raise ValueError(f"Tip rule {name!r}: condition {condition!r} is not [operand, operator, value]")
+                operand, op, threshold = condition
+                if op not in OPERATORS:
+                    raise ValueError(f"Tip rule {name!r}: unknown operator {op!r}")
+                if operand.startswith(SIGNAL_PREFIX):
+                    signal = operand[len(SIGNAL_PREFIX):]
+                    if signal not in signal_names:
+                        raise ValueError(f"Tip rule {name!r}: unknown signal {signal!r}")
+                    conditions.append((True, signal, OPERATORS[op], threshold))
+                elif operand in feature_names:
+                    conditions.append((False, operand, OPERATORS[op], threshold))
+                else:
+                    raise ValueError(f"Tip rule {name!r}: unknown feature {operand!r}")
+
+            tip = item.get("tip")
+            if not isinstance(tip, dict):
+                raise ValueError(f"Tip rule {name!r}: missing 'tip' object")
+            unknown = set(tip) - TIP_FIELDS
+            if unknown:
+                raise ValueError(f"Tip rule {name!r}: unknown tip fields {sorted(unknown)}")
+            if tip.get("priority") not in PRIORITY_ORDER:
+                raise ValueError(f"Tip rule {name!r}: priority must be one of {list(PRIORITY_ORDER)}")
+            try:
+                tip = Tip(**tip)
+            except TypeError as e:
+                raise ValueError(f"Tip rule {name!r}: {e}") from None
+
+            rules.append(TipRule(name=name, conditions=tuple(conditions), tip=tip))
+        return cls(rules)
+
+    @classmethod
+    def load_file(cls, path: str, feature_names: Iterable[str],
+                  signal_names: Iterable[str]) -> "TipRuleTable":
+        """Rule table from a JSON file holding a list of rule dicts"""
+        with open(path, encoding="utf-8") as f:
+            try:
+                items = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"{path}: invalid JSON: {e}") from None
+        if not isinstance(items, list):
+            raise ValueError(f"{path}: expected a list of tip rules")
+        try:
+            return cls.from_dicts(items, feature_names, signal_names)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
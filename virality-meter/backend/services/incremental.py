@@ -0,0 +1,274 @@
+"""
+Incremental Re-Analysis
+
+Keeps per-draft analysis state so an editor can send small text edits
+instead of the whole draft on every keystroke. Each edit only recounts a
+window around the changed region:
+
+- Basic counts (words, hashtags, mentions, URLs, emojis, letters, lines) are
+  additive over whitespace-separated chunks, so only the chunks touched by
+  the edit are recounted.
+- Pattern families keep the number of start positions each pattern matches
+  at; starts near the edit are recounted (see PatternEngine.count_starts).
+- Trending terms keep per-term occurrence counts; occurrences within a few
+  tokens of the edit are recounted (see TrendingIndex.count_starts). A
+  session is recounted in full when the trending index has been reloaded.
+
+The resulting ContentFeatures are identical to a full extract_features pass.
+Drafts whose lowercase form is not a 1:1 mapping of the original (e.g. 'İ',
+or the context-dependent final sigma) are simply recounted in full. Deboost
+risk is not a feature; calculate_signal_scores still derives it from the text.
+"""
+
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Optional, Tuple
+import threading
+import time
+import uuid
+
+from .patterns import PatternEngine
+from .scorer import (
+    ContentFeatures,
+    FEATURE_PATTERN_ENGINE,
+    TextStats,
+    ViralityScorer,
+    scorer,
+)
+from .trending import TrendingIndex
+
+TextEdit = Tuple[int, int, str]  # (start, end, replacement), code point offsets
+
+
+class SessionNotFound(Exception):
+    """Raised when an analysis ID is unknown, expired or already superseded"""
+
+
+class InvalidEdit(Exception):
+    """Raised when an edit does not apply to the session's current text"""
+
+
+@dataclass
+class PatternCounts:
+    """Start-position counts of one engine over one text"""
+    engine: PatternEngine
+    starts: Counter
+    anchored: frozenset
+
+    @classmethod
+    def of(cls, engine: PatternEngine, text: str) -> "PatternCounts":
+        return cls(engine, engine.count_starts(text, 0, len(text)), engine.anchored_ids(text))
+
+    def hits(self) -> Dict[str, int]:
+        return self.engine.family_counts(
+            [pid for pid, count in self.starts.items() if count > 0] + list(self.anchored)
+        )
+
+    def update(self, old_text: str, new_text: str, lo: int, old_hi: int, new_hi: int,
+               old_chunk_end: int, new_chunk_end: int) -> None:
+        self.starts.subtract(self.engine.count_starts(old_text, lo, old_hi, old_chunk_end))
+        self.starts.update(self.engine.count_starts(new_text, lo, new_hi, new_chunk_end))
+        self.anchored = self.engine.anchored_ids(new_text)
+
+
+@dataclass
+class TrendingCounts:
+    """Per-term occurrence counts of one trending index over one text"""
+    index: TrendingIndex
+    occurrences: Counter
+
+    @classmethod
+    def of(cls, index: TrendingIndex, text: str) -> "TrendingCounts":
+        return cls(index, index.count_starts(text, 0, len(text)))
+
+    def hits(self) -> int:
+        return sum(1 for count in self.occurrences.values() if count > 0)
+
+    def update(self, old_text: str, new_text: str, chunk_lo: int, old_hi: int, new_hi: int) -> None:
+        # Text before chunk_lo is unchanged, so the window starts at the same offset in both
+        lo = self.index.window_start(old_text, chunk_lo)
+        self.occurrences.subtract(self.index.count_starts(old_text, lo, old_hi))
+        self.occurrences.update(self.index.count_starts(new_text, lo, new_hi))
+
+
+@dataclass
+class LiveSession:
+    """Everything needed to update one draft's features from an edit"""
+    content: str
+    content_lower: str
+    has_media: bool
+    media_type: str
+    video_duration_ms: int
+    stats: TextStats
+    feature_counts: PatternCounts
+    trending_counts: TrendingCounts
+    features: Optional[ContentFeatures]
+    touched_at: float
+
+
+def _lower_is_aligned(content: str, content_lower: str) -> bool:
+    """True when lowercasing maps each character to exactly one, independently of context"""
+    return len(content_lower) == len(content) and "Σ" not in content
+
+
+class IncrementalAnalyzer:
+    """
+    Session store plus incremental feature maintenance.
+
+    Sessions are kept in an LRU with a TTL. Applying edits consumes the
+    previous analysis ID and issues a new one, so a stale or replayed ID is
+    rejected rather than silently applied to the wrong text.
+    """
+
+    def __init__(self, base: ViralityScorer, max_sessions: int = 10000,
+                 ttl_seconds: float = 1800.0, max_chars: int = 4000):
+        self.base = base
+        self.max_chars = max_chars
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, LiveSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # -- session store -------------------------------------------------------
+
+    def _store(self, session: LiveSession) -> str:
+        analysis_id = uuid.uuid4().hex
+        with self._lock:
+            self._sessions[analysis_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return analysis_id
+
+    def _take(self, analysis_id: str) -> LiveSession:
+        with self._lock:
+            session = self._sessions.pop(analysis_id, None)
+        if session is None or time.monotonic() - session.touched_at > self.ttl_seconds:
+            raise SessionNotFound(f"Unknown or expired analysis ID {analysis_id!r}")
+        return session
+
+    # -- analysis ------------------------------------------------------------
+
+    def start(self, content: str, has_media: bool, media_type: str,
+              video_duration_ms: int) -> Tuple[str, ContentFeatures]:
+        """Full analysis of a draft; returns the analysis ID for subsequent edits"""
+        session = self.session(content, has_media, media_type, video_duration_ms)
+        return self._store(session), session.features
+
+    def session(self, content: str, has_media: bool, media_type: str,
+                video_duration_ms: int) -> LiveSession:
+        """Full analysis of a draft, as an unstored session"""
+        content_lower = content.lower()
+        session = LiveSession(
+            content=content,
+            content_lower=content_lower,
+            has_media=has_media,
+            media_type=media_type,
+            video_duration_ms=video_duration_ms,
+            stats=TextStats.of(content),
+            feature_counts=PatternCounts.of(FEATURE_PATTERN_ENGINE, content_lower),
+            trending_counts=TrendingCounts.of(self.base.trending.index, content_lower),
+            features=None,
+            touched_at=time.monotonic(),
+        )
+        session.features = self._features(session)
+        return session
+
+    def fork(self, session: LiveSession, edits: Iterable[TextEdit]) -> LiveSession:
+        """
+        Copy of an unstored session with edits applied (in order, each against
+        the text left by the previous one); the original is left untouched.
+        """
+        index = self.base.trending.index
+        trending = session.trending_counts
+        copy = replace(
+            session,
+            feature_counts=replace(session.feature_counts, starts=Counter(session.feature_counts.starts)),
+            trending_counts=(TrendingCounts(index, Counter(trending.occurrences)) if trending.index is index
+                             else TrendingCounts.of(index, session.content_lower)),
+        )
+        for start, end, text in edits:
+            self._apply_edit(copy, start, end, text)
+        copy.features = self._features(copy)
+        return copy
+
+    def apply(self, analysis_id: str, edits: Iterable[TextEdit],
+              has_media: Optional[bool] = None, media_type: Optional[str] = None,
+              video_duration_ms: Optional[int] = None) -> Tuple[str, ContentFeatures]:
+        """
+        Apply edits (in order, each against the text left by the previous one)
+        to a previous analysis; returns the new analysis ID and features.
+
+        The previous ID is consumed even if an edit turns out to be invalid;
+        the client then starts over with the full draft.
+        """
+        session = self._take(analysis_id)
+        index = self.base.trending.index
+        if session.trending_counts.index is not index:
+            session.trending_counts = TrendingCounts.of(index, session.content_lower)
+        for start, end, text in edits:
+            self._apply_edit(session, start, end, text)
+
+        if has_media is not None:
+            session.has_media = has_media
+        if media_type is not None:
+            session.media_type = media_type
+        if video_duration_ms is not None:
+            session.video_duration_ms = video_duration_ms
+
+        session.features = self._features(session)
+        session.touched_at = time.monotonic()
+        return self._store(session), session.features
+
+    def _features(self, session: LiveSession) -> ContentFeatures:
+        features = self.base._assemble_features(
+            session.content, session.content_lower, session.has_media, session.media_type,
+            session.video_duration_ms, session.stats, session.feature_counts.hits(),
+            session.trending_counts.hits(),
+        )
+        return self.base._attach_diversity(features)
+
+    def _apply_edit(self, session: LiveSession, start: int, end: int, text: str) -> None:
+        old = session.content
+        if not 0 <= start <= end <= len(old):
+            raise InvalidEdit(f"Edit [{start}, {end}) is outside the draft (length {len(old)})")
+        new = old[:start] + text + old[end:]
+        if not 0 < len(new) <= self.max_chars:
+            raise InvalidEdit(f"Edited draft must be 1-{self.max_chars} characters, got {len(new)}")
+        new_lower = new.lower()
+
+        if not (_lower_is_aligned(old, session.content_lower) and _lower_is_aligned(new, new_lower)):
+            # Character offsets differ between the draft and its lowercase form
+            session.content, session.content_lower = new, new_lower
+            session.stats = TextStats.of(new)
+            session.feature_counts = PatternCounts.of(FEATURE_PATTERN_ENGINE, new_lower)
+            session.trending_counts = TrendingCounts.of(session.trending_counts.index, new_lower)
+            return
+
+        shift = len(text) - (end - start)
+
+        # Whitespace-delimited chunk range around the edit: [chunk_lo, chunk_hi)
+        chunk_lo = start
+        while chunk_lo > 0 and not old[chunk_lo - 1].isspace():
+            chunk_lo -= 1
+        chunk_hi = end
+        while chunk_hi < len(old) and not old[chunk_hi].isspace():
+            chunk_hi += 1
+
+        session.stats = (session.stats
+                         - TextStats.of(old[chunk_lo:chunk_hi])
+                         + TextStats.of(new[chunk_lo:chunk_hi + shift]))
+
+        # Literals starting up to max_literal_len - 1 before the edit can span it
+        counts = session.feature_counts
+        lo = min(chunk_lo, max(0, start - counts.engine.max_literal_len + 1))
+        counts.update(session.content_lower, new_lower, lo, end, start + len(text),
+                      chunk_hi, chunk_hi + shift)
+
+        session.trending_counts.update(session.content_lower, new_lower,
+                                       chunk_lo, chunk_hi, chunk_hi + shift)
+
+        session.content, session.content_lower = new, new_lower
+
+
+# Singleton instance
+incremental_analyzer = IncrementalAnalyzer(scorer)
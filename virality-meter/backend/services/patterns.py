@@ -0,0 +1,189 @@
+"""
+Compiled Pattern Engine
+
+Matches every pattern family used by the scorer (questions, CTAs, emotions,
+viral hooks, controversy, deboost) with patterns compiled once at import.
+
+Literal patterns (the vast majority) are folded into one prefix-trie
+alternation, so every literal of every family is found in one walk over the
+text; the handful of true regex patterns (``\\?$``, ``\\d+\\)`` ...) are
+compiled once and searched individually. Hits are counted per family as the
+number of distinct patterns that matched, which is exactly what the
+per-pattern ``re.search`` loops used to compute.
+"""
+
+from collections import Counter
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import re
+
+_REGEX_METACHARS = set(".^$*+?{}[]|()\\")
+
+
+def _as_literal(pattern: str) -> Optional[str]:
+    """Return the literal string a pattern matches, or None if it is a real regex"""
+    literal = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                return None  # \d, \w, \b ... are character classes, not escapes
+            literal.append(pattern[i + 1])
+            i += 2
+            continue
+        if char in _REGEX_METACHARS:
+            return None
+        literal.append(char)
+        i += 1
+    return "".join(literal)
+
+
+def _trie_regex(words: List[str]) -> str:
+    """Build a regex alternation that factors common prefixes (longest match first)"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + render(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: prefer the longer literal, fall back to the prefix
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+class PatternEngine:
+    """
+    Single-pass matcher over a set of named pattern families.
+
+    Families map a name to a list of regex patterns. Identical patterns shared
+    by several families are matched once and credited to each of them.
+    """
+
+    def __init__(self, families: Dict[str, List[str]]):
+        self.families = tuple(families)
+
+        # Each distinct pattern gets an id; remember which families it counts for
+        pattern_ids: Dict[str, int] = {}
+        owners: List[List[str]] = []
+        for family, patterns in families.items():
+            for pattern in patterns:
+                pid = pattern_ids.setdefault(pattern, len(pattern_ids))
+                if pid == len(owners):
+                    owners.append([])
+                if family not in owners[pid]:
+                    owners[pid].append(family)
+        self._owners: Tuple[Tuple[str, ...], ...] = tuple(tuple(o) for o in owners)
+
+        literals: Dict[str, int] = {}
+        regexes: List[Tuple[int, str]] = []
+        for pattern, pid in pattern_ids.items():
+            literal = _as_literal(pattern)
+            if literal:
+                literals[literal] = pid
+            else:
+                regexes.append((pid, pattern))
+
+        # A literal match also implies a match of every literal that prefixes it
+        # (e.g. 'follow for follow' implies 'follow'), since the alternation
+        # only reports the longest literal starting at each position.
+        self._literal_hits: Dict[str, FrozenSet[int]] = {
+            literal: frozenset(pid2 for lit2, pid2 in literals.items() if literal.startswith(lit2))
+            for literal in literals
+        }
+
+        self._regexes = tuple((pid, re.compile(pattern)) for pid, pattern in regexes)
+        self._literal_regex = re.compile(_trie_regex(list(literals))) if literals else None
+
+        # For incremental matching (see count_starts): end-anchored regexes
+        # depend on where the text ends, so they are always evaluated globally.
+        self.max_literal_len = max(map(len, literals), default=0)
+        self._anchored = tuple((pid, rx) for pid, rx in self._regexes if "$" in rx.pattern)
+        self._windowed = tuple((pid, rx) for pid, rx in self._regexes if "$" not in rx.pattern)
+
+    def matched_ids(self, text: str) -> FrozenSet[int]:
+        """Return ids of all distinct patterns found anywhere in text"""
+        hits = set()
+
+        # Literals: one walk over the text. Restarting right after each match
+        # start (rather than its end) keeps overlapping hits such as
+        # 'a thread' / 'thread' or 'disagree?' / 'agree?'.
+        if self._literal_regex is not None:
+            search = self._literal_regex.search
+            found = set()
+            match = search(text)
+            while match is not None:
+                found.add(match.group())
+                match = search(text, match.start() + 1)
+            literal_hits = self._literal_hits
+            for literal in found:
+                hits.update(literal_hits[literal])
+
+        for pid, regex in self._regexes:
+            if regex.search(text):
+                hits.add(pid)
+
+        return frozenset(hits)
+
+    def scan(self, text: str) -> Dict[str, int]:
+        """Count distinct matched patterns per family in one pass over text"""
+        return self.family_counts(self.matched_ids(text))
+
+    def family_counts(self, pattern_ids) -> Dict[str, int]:
+        """Count distinct pattern ids per family"""
+        counts = dict.fromkeys(self.families, 0)
+        owners = self._owners
+        for pid in pattern_ids:
+            for family in owners[pid]:
+                counts[family] += 1
+        return counts
+
+    # -------------------------------------------------------------------------
+    # Incremental matching
+    #
+    # Instead of presence, callers keep the number of start positions at which
+    # each pattern matches. After an edit only starts inside a window around
+    # the edit can change: literals are at most max_literal_len long, and the
+    # unanchored regexes never match whitespace, so starts before the
+    # whitespace-delimited chunk holding the edit are unaffected too.
+    # -------------------------------------------------------------------------
+
+    def count_starts(self, text: str, lo: int, hi: int, regex_endpos: Optional[int] = None) -> Counter:
+        """
+        Number of match start positions in [lo, hi) per pattern id (anchored
+        regexes excluded). regex_endpos may bound the unanchored regex search
+        at the first whitespace after hi, since no match can extend past it.
+        """
+        starts: Counter = Counter()
+        if lo >= hi:
+            return starts
+        if self._literal_regex is not None:
+            search = self._literal_regex.search
+            literal_hits = self._literal_hits
+            endpos = hi + self.max_literal_len  # no literal starting before hi ends past this
+            match = search(text, lo, endpos)
+            while match is not None and match.start() < hi:
+                starts.update(literal_hits[match.group()])
+                match = search(text, match.start() + 1, endpos)
+        if regex_endpos is None:
+            regex_endpos = len(text)
+        for pid, regex in self._windowed:
+            match = regex.search(text, lo, regex_endpos)
+            while match is not None and match.start() < hi:
+                starts[pid] += 1
+                match = regex.search(text, match.start() + 1, regex_endpos)
+        return starts
+
+    def anchored_ids(self, text: str) -> FrozenSet[int]:
+        """Ids of end-anchored regexes that match text (always a global check)"""
+        return frozenset(pid for pid, regex in self._anchored if regex.search(text))
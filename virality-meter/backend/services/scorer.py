@@ -9,10 +9,18 @@ Based on the actual X recommendation algorithm from:
 This service analyzes content and predicts virality based on algorithm signals.
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from array import array
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import re
 import math
+import os
+
+from .emoji import EMOJI_RE
+from .improvements import DEFAULT_TIP_RULES, Tip, TipRuleTable
+from .patterns import PatternEngine
+from .timing import timed
+from .trending import TrendingTopics
 
 # =============================================================================
 # ALGORITHM WEIGHTS (Derived from X's weighted_scorer.rs)
@@ -48,6 +56,59 @@ NEGATIVE_WEIGHTS = {
     "report": -0.30,
 }
 
+# Static metadata of every predicted signal, in scoring order. Per-request
+# results only carry the scores (see SignalScores).
+@dataclass(frozen=True)
+class SignalSpec:
+    """Weight, impact and explanation of one predicted signal"""
+    name: str
+    weight: float
+    impact: str
+    explanation: str
+
+
+SIGNAL_SPECS: Tuple[SignalSpec, ...] = (
+    SignalSpec("favorite", ENGAGEMENT_WEIGHTS["favorite"], "positive",
+               "Likes driven by emotional resonance and visual content"),
+    SignalSpec("reply", ENGAGEMENT_WEIGHTS["reply"], "positive",
+               "Questions and controversial takes drive conversations"),
+    SignalSpec("retweet", ENGAGEMENT_WEIGHTS["retweet"], "positive",
+               "Viral hooks and trending topics increase shareability"),
+    SignalSpec("quote", ENGAGEMENT_WEIGHTS["quote"], "positive",
+               "Controversial content gets quote tweeted more"),
+    SignalSpec("follow_author", ENGAGEMENT_WEIGHTS["follow_author"], "positive",
+               "High-quality viral content attracts new followers"),
+    SignalSpec("click", ENGAGEMENT_WEIGHTS["click"], "positive",
+               "Longer content and threads drive click engagement"),
+    SignalSpec("profile_click", ENGAGEMENT_WEIGHTS["profile_click"], "positive",
+               "Interesting content makes people check your profile"),
+    SignalSpec("photo_expand", ENGAGEMENT_WEIGHTS["photo_expand"], "positive",
+               "Images dramatically increase engagement"),
+    SignalSpec("video_quality_view", ENGAGEMENT_WEIGHTS["video_quality_view"], "positive",
+               "Videos 30s-2min have highest completion rates"),
+    SignalSpec("dwell_time", ENGAGEMENT_WEIGHTS["dwell_time"], "positive",
+               "Longer, well-structured content keeps attention"),
+    SignalSpec("share", ENGAGEMENT_WEIGHTS["share"], "positive",
+               "Share-worthy content has clear value"),
+    SignalSpec("share_dm", ENGAGEMENT_WEIGHTS["share_dm"], "positive",
+               "Personal/relatable content gets DM'd"),
+    SignalSpec("share_copy_link", ENGAGEMENT_WEIGHTS["share_copy_link"], "positive",
+               "Reference-worthy content gets saved/shared"),
+    SignalSpec("not_interested", NEGATIVE_WEIGHTS["not_interested"], "negative",
+               "Spammy signals make people hide your content"),
+    SignalSpec("block_author", NEGATIVE_WEIGHTS["block_author"], "negative",
+               "Aggressive content leads to blocks"),
+    SignalSpec("mute_author", NEGATIVE_WEIGHTS["mute_author"], "negative",
+               "Annoying patterns lead to mutes"),
+    SignalSpec("report", NEGATIVE_WEIGHTS["report"], "negative",
+               "Policy violations lead to reports"),
+    SignalSpec("deboost", -0.10, "negative",
+               "Spammy or engagement-farming keywords can deboost reach"),
+)
+SIGNAL_NAMES: Tuple[str, ...] = tuple(spec.name for spec in SIGNAL_SPECS)
+SIGNAL_INDEX: Dict[str, int] = {name: i for i, name in enumerate(SIGNAL_NAMES)}
+SIGNAL_WEIGHTS: Tuple[float, ...] = tuple(spec.weight for spec in SIGNAL_SPECS)
+
 # Content feature impact weights
 CONTENT_WEIGHTS = {
     "optimal_length": 0.08,
@@ -107,8 +168,122 @@ DEBOOST_PATTERNS = [
     r'giveaway' # Giveaway is often deboosted unless verified
 ]
 
+# Controversy signals (drive replies/quotes)
+CONTROVERSY_PATTERNS = [
+    r'unpopular opinion', r'hot take', r'controversial', r'fight me',
+    r'ratio', r'L take', r'W take', r'wrong', r'actually',
+    r'disagree', r'overrated', r'underrated', r'mid',
+]
+
+# Compiled once at import: every family is matched in a single pass.
+# Deboost is matched separately because it runs against the original-case text.
+FEATURE_PATTERN_ENGINE = PatternEngine({
+    "question": QUESTION_PATTERNS,
+    "cta": CTA_PATTERNS,
+    **{f"emotion:{emotion}": patterns for emotion, patterns in EMOTIONAL_PATTERNS.items()},
+    "viral_hook": VIRAL_HOOKS,
+    "controversy": CONTROVERSY_PATTERNS,
+})
+DEBOOST_PATTERN_ENGINE = PatternEngine({"deboost": DEBOOST_PATTERNS})
+
+# The feature pattern pass, as a timed stage (plain bound method unless PIPELINE_TIMING is on)
+scan_feature_patterns = timed("patterns")(FEATURE_PATTERN_ENGINE.scan)
+
+# Built-in trending terms, replaced by TRENDING_TOPICS_FILE when set (re-read
+# whenever it changes, checked every TRENDING_TOPICS_REFRESH_SECONDS)
+trending_topics = TrendingTopics(
+    TRENDING_TOPICS,
+    path=os.environ.get("TRENDING_TOPICS_FILE") or None,
+    refresh_seconds=float(os.environ.get("TRENDING_TOPICS_REFRESH_SECONDS", 300)),
+)
+
+# Basic count patterns. None of them can match whitespace, so counts over a
+# text are the sum of counts over its whitespace-separated chunks. Emoji are
+# matched by services.emoji.EMOJI_RE.
+HASHTAG_RE = re.compile(r'#\w+')
+MENTION_RE = re.compile(r'@\w+')
+URL_RE = re.compile(r'https?://\S+')
+
+# Letters for the caps ratio are ASCII only: they are counted on the text's
+# ASCII bytes by deleting every other byte (bytes.translate runs in C and
+# builds no per-letter lists).
+_ASCII = bytes(range(128))
+NOT_ALPHA = bytes(b for b in _ASCII if not chr(b).isalpha())
+NOT_UPPER = bytes(b for b in _ASCII if not chr(b).isupper())
+
 
 @dataclass
+class TextStats:
+    """Additive character/token counts of a text (or of a whitespace-delimited slice of one)"""
+    word_count: int
+    hashtag_count: int
+    mention_count: int
+    url_count: int
+    emoji_count: int
+    newline_count: int
+    alpha_count: int
+    upper_count: int
+
+    @classmethod
+    @timed("text_stats")
+    def of(cls, text: str) -> "TextStats":
+        ascii_bytes = text.encode("ascii", "ignore")
+        return cls(
+            word_count=len(text.split()),
+            hashtag_count=len(HASHTAG_RE.findall(text)),
+            mention_count=len(MENTION_RE.findall(text)),
+            url_count=len(URL_RE.findall(text)),
+            emoji_count=len(EMOJI_RE.findall(text)),
+            newline_count=text.count('\n'),
+            alpha_count=len(ascii_bytes.translate(None, NOT_ALPHA)),
+            upper_count=len(ascii_bytes.translate(None, NOT_UPPER)),
+        )
+
+    def __add__(self, other: "TextStats") -> "TextStats":
+        return TextStats(**{f: getattr(self, f) + getattr(other, f) for f in _TEXT_STATS_FIELDS})
+
+    def __sub__(self, other: "TextStats") -> "TextStats":
+        return TextStats(**{f: getattr(self, f) - getattr(other, f) for f in _TEXT_STATS_FIELDS})
+
+    @property
+    def line_count(self) -> int:
+        return self.newline_count + 1
+
+    @property
+    def caps_ratio(self) -> float:
+        return self.upper_count / max(self.alpha_count, 1)
+
+
+# (minimum score, tier, description), highest first
+DIVERSITY_TIERS: Tuple[Tuple[int, str, str], ...] = (
+    (80, "HIGHLY_DIVERSE", "Excellent content variety - algorithm will favor distribution"),
+    (60, "WELL_BALANCED", "Good content balance - solid engagement potential"),
+    (40, "MODERATE", "Some variety present - consider adding more elements"),
+    (20, "LIMITED", "Low diversity - content may feel repetitive"),
+    (0, "MONOTONE", "Very limited variety - high risk of reduced reach"),
+)
+
+
+@dataclass(slots=True)
+class DiversityReport:
+    """
+    Every diversity factor of one feature record, computed in a single pass.
+
+    score is the 0-1 value stored in ContentFeatures.diversity_score; the
+    remaining fields back the detailed breakdown from calculate_diversity_score.
+    """
+    score: float
+    format_score: float
+    format_elements: int
+    length_score: float
+    engagement_score: float
+    engagement_drivers: Tuple[str, ...]
+    topic_richness: float
+    deboost_risk: float
+    diversity_score: int
+
+
+@dataclass(slots=True)
 class ContentFeatures:
     """Extracted features from content"""
     char_count: int
@@ -131,6 +306,57 @@ class ContentFeatures:
     caps_ratio: float
     diversity_score: float
     content: str
+    # Set by extract_features; reused by calculate_diversity_score and the
+    # deboost signal. Stale if the record is modified afterwards.
+    diversity: Optional[DiversityReport] = field(default=None, repr=False, compare=False)
+
+
+_TEXT_STATS_FIELDS = tuple(f.name for f in fields(TextStats))
+
+
+class SignalScores:
+    """
+    Predicted score of every signal, indexed like SIGNAL_SPECS.
+
+    Weights, impacts and explanations are shared module-level metadata, so a
+    result is a single flat array of doubles.
+    """
+
+    __slots__ = ("scores",)
+
+    def __init__(self, scores: array):
+        self.scores = scores
+
+    def __getitem__(self, name: str) -> float:
+        return self.scores[SIGNAL_INDEX[name]]
+
+    def __iter__(self) -> Iterator[Tuple[SignalSpec, float]]:
+        return zip(SIGNAL_SPECS, self.scores)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SignalScores) and self.scores == other.scores
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Materialize the {name: {score, weight, impact, explanation}} form"""
+        return {
+            spec.name: {
+                "score": score,
+                "weight": spec.weight,
+                "impact": spec.impact,
+                "explanation": spec.explanation,
+            }
+            for spec, score in self
+        }
+
+
+# Improvement tip rules (see services.improvements); IMPROVEMENT_TIPS_FILE
+# replaces the built-in table.
+_TIP_OPERANDS = dict(feature_names=[f.name for f in fields(ContentFeatures)], signal_names=SIGNAL_NAMES)
+tip_rules = (
+    TipRuleTable.load_file(os.environ["IMPROVEMENT_TIPS_FILE"], **_TIP_OPERANDS)
+    if os.environ.get("IMPROVEMENT_TIPS_FILE")
+    else TipRuleTable.from_dicts(DEFAULT_TIP_RULES, **_TIP_OPERANDS)
+)
 
 
 class ViralityScorer:
@@ -138,82 +364,72 @@ class ViralityScorer:
     Scores content for viral potential based on X's algorithm signals.
     """
 
-    def __init__(self):
+    def __init__(self, trending: Optional[TrendingTopics] = None,
+                 tips: Optional[TipRuleTable] = None):
+        self.trending = trending or trending_topics
+        self.tips = tips if tips is not None else tip_rules
         self.engagement_weights = ENGAGEMENT_WEIGHTS
         self.negative_weights = NEGATIVE_WEIGHTS
         self.content_weights = CONTENT_WEIGHTS
 
+    @timed("extract_features")
     def extract_features(self, content: str, has_media: bool = False,
                          media_type: str = "none", video_duration_ms: int = 0) -> ContentFeatures:
         """Extract all relevant features from content"""
 
+        features = self._extract_preliminary_features(
+            content, has_media, media_type, video_duration_ms
+        )
+
+        # Calculate diversity score based on all other features
+        return self._attach_diversity(features)
+
+    def _extract_preliminary_features(self, content: str, has_media: bool,
+                                      media_type: str, video_duration_ms: int) -> ContentFeatures:
+        """Extract every feature except diversity_score, which is derived from the others"""
+
         content_lower = content.lower()
 
         # Basic counts
-        char_count = len(content)
-        word_count = len(content.split())
-        hashtag_count = len(re.findall(r'#\w+', content))
-        mention_count = len(re.findall(r'@\w+', content))
-        url_count = len(re.findall(r'https?://\S+', content))
-        emoji_count = len(re.findall(r'[\U0001F300-\U0001F9FF]', content))
-        line_count = len(content.split('\n'))
-
-        # Caps ratio (shouting detection)
-        alpha_chars = re.findall(r'[a-zA-Z]', content)
-        caps_ratio = sum(1 for c in alpha_chars if c.isupper()) / max(len(alpha_chars), 1)
+        stats = TextStats.of(content)
+
+        # All pattern families in one pass
+        pattern_hits = scan_feature_patterns(content_lower)
+        trending_matches = self.trending.count(content_lower)
+
+        return self._assemble_features(content, content_lower, has_media, media_type,
+                                       video_duration_ms, stats, pattern_hits, trending_matches)
+
+    def _assemble_features(self, content: str, content_lower: str, has_media: bool,
+                           media_type: str, video_duration_ms: int, stats: TextStats,
+                           pattern_hits: Dict[str, int], trending_matches: int) -> ContentFeatures:
+        """Build the preliminary feature record from counts and pattern hits"""
 
         # Question detection
-        has_question = any(re.search(p, content_lower) for p in QUESTION_PATTERNS)
+        has_question = pattern_hits["question"] > 0
 
         # CTA detection
-        has_cta = any(re.search(p, content_lower) for p in CTA_PATTERNS)
+        has_cta = pattern_hits["cta"] > 0
 
         # Emotional analysis
-        emotional_tone, emotional_intensity = self._analyze_emotion(content_lower)
+        emotional_tone, emotional_intensity = self._analyze_emotion(content_lower, pattern_hits)
 
         # Controversy score
-        controversy_score = self._calculate_controversy(content_lower)
+        controversy_score = self._calculate_controversy(content_lower, pattern_hits)
 
         # Trending alignment
-        trending_alignment = self._calculate_trending_alignment(content_lower)
+        trending_alignment = self._calculate_trending_alignment(content_lower, trending_matches)
 
         # Viral hooks
-        viral_hook_count = sum(1 for p in VIRAL_HOOKS if re.search(p, content_lower))
-
-        # Create preliminary features for diversity calculation
-        preliminary_features = ContentFeatures(
-            char_count=char_count,
-            word_count=word_count,
-            hashtag_count=hashtag_count,
-            mention_count=mention_count,
-            url_count=url_count,
-            emoji_count=emoji_count,
-            has_question=has_question,
-            has_cta=has_cta,
-            has_media=has_media,
-            media_type=media_type,
-            video_duration_ms=video_duration_ms,
-            emotional_tone=emotional_tone,
-            emotional_intensity=emotional_intensity,
-            controversy_score=controversy_score,
-            trending_alignment=trending_alignment,
-            viral_hook_count=viral_hook_count,
-            line_count=line_count,
-            caps_ratio=caps_ratio,
-            diversity_score=0.0,  # Calculated next
-            content=content,
-        )
-
-        # Calculate diversity score based on all features
-        diversity_score = self._calculate_diversity_score(preliminary_features)
+        viral_hook_count = pattern_hits["viral_hook"]
 
         return ContentFeatures(
-            char_count=char_count,
-            word_count=word_count,
-            hashtag_count=hashtag_count,
-            mention_count=mention_count,
-            url_count=url_count,
-            emoji_count=emoji_count,
+            char_count=len(content),
+            word_count=stats.word_count,
+            hashtag_count=stats.hashtag_count,
+            mention_count=stats.mention_count,
+            url_count=stats.url_count,
+            emoji_count=stats.emoji_count,
             has_question=has_question,
             has_cta=has_cta,
             has_media=has_media,
@@ -224,54 +440,63 @@ class ViralityScorer:
             controversy_score=controversy_score,
             trending_alignment=trending_alignment,
             viral_hook_count=viral_hook_count,
-            line_count=line_count,
-            caps_ratio=caps_ratio,
-            diversity_score=diversity_score,
+            line_count=stats.line_count,
+            caps_ratio=stats.caps_ratio,
+            diversity_score=0.0,  # Calculated by extract_features
             content=content,
         )
 
+    @timed("deboost")
     def _analyze_deboost_risk(self, content: str) -> float:
         """Calculate deboost/shadowban risk probability"""
-        matches = sum(1 for p in DEBOOST_PATTERNS if re.search(p, content))
+        matches = DEBOOST_PATTERN_ENGINE.scan(content)["deboost"]
         return min(matches / 3, 1.0)
 
-    def _analyze_emotion(self, content: str) -> Tuple[str, float]:
+    def _analyze_emotion(self, content: str, pattern_hits: Optional[Dict[str, int]] = None) -> Tuple[str, float]:
         """Analyze emotional content"""
-        scores = {}
-        for emotion, patterns in EMOTIONAL_PATTERNS.items():
-            matches = sum(1 for p in patterns if re.search(p, content))
-            scores[emotion] = matches
+        if pattern_hits is None:
+            pattern_hits = FEATURE_PATTERN_ENGINE.scan(content)
+        scores = {emotion: pattern_hits[f"emotion:{emotion}"] for emotion in EMOTIONAL_PATTERNS}
 
         max_emotion = max(scores, key=scores.get) if any(scores.values()) else "neutral"
         intensity = min(scores.get(max_emotion, 0) / 3, 1.0)
 
         return max_emotion, intensity
 
-    def _calculate_controversy(self, content: str) -> float:
+    def _calculate_controversy(self, content: str, pattern_hits: Optional[Dict[str, int]] = None) -> float:
         """Calculate controversy potential (drives replies/quotes)"""
-        controversy_signals = [
-            r'unpopular opinion', r'hot take', r'controversial', r'fight me',
-            r'ratio', r'L take', r'W take', r'wrong', r'actually',
-            r'disagree', r'overrated', r'underrated', r'mid',
-        ]
-        matches = sum(1 for p in controversy_signals if re.search(p, content))
+        if pattern_hits is None:
+            pattern_hits = FEATURE_PATTERN_ENGINE.scan(content)
+        matches = pattern_hits["controversy"]
         return min(matches / 4, 1.0)
 
-    def _calculate_trending_alignment(self, content: str) -> float:
-        """Check alignment with trending topics"""
-        matches = sum(1 for topic in TRENDING_TOPICS if topic in content)
+    def _calculate_trending_alignment(self, content: str, matches: Optional[int] = None) -> float:
+        """Check alignment with trending topics (whole words only)"""
+        if matches is None:
+            matches = self.trending.count(content)
         return min(matches / 3, 1.0)
 
-    def _calculate_diversity_score(self, features: ContentFeatures) -> float:
+    def _attach_diversity(self, features: ContentFeatures) -> ContentFeatures:
+        """Compute the diversity report of a preliminary record and store it on the record"""
+        report = self._analyze_diversity(features)
+        features.diversity = report
+        features.diversity_score = report.score
+        return features
+
+    def _analyze_diversity(self, features: ContentFeatures) -> DiversityReport:
         """
-        Calculate content diversity score based on X algorithm's diversity principles.
+        Calculate content diversity based on X algorithm's diversity principles.
 
         From author_diversity_scorer.rs:
         - Favors varied content types (text, media, links)
         - Rewards mixed engagement patterns
         - Penalizes overly repetitive content
         - Considers content richness (emojis, hashtags, mentions)
+
+        Produces both the compact 0-1 score used as a feature and the factor
+        scores behind the detailed 0-100 breakdown (calculate_diversity_score).
         """
+        # Compact score (0-1)
         diversity = 0.0
         max_score = 1.0
 
@@ -353,14 +578,119 @@ class ViralityScorer:
 
         diversity = max(0, min(diversity - spam_penalty, max_score))
 
-        return round(diversity, 3)
+        # Detailed factors (0-100 breakdown)
+        total_score = 0.0
+
+        # 1. Format diversity (text structure variety)
+        format_diversity = 0.0
+        format_elements = 0
+
+        if features.has_question:
+            format_elements += 1
+            format_diversity += 0.15
+        if features.has_cta:
+            format_elements += 1
+            format_diversity += 0.10
+        if features.hashtag_count > 0:
+            format_elements += 1
+            format_diversity += 0.10
+        if features.mention_count > 0:
+            format_elements += 1
+            format_diversity += 0.10
+        if features.emoji_count > 0:
+            format_elements += 1
+            format_diversity += 0.10
+        if features.url_count > 0:
+            format_elements += 1
+            format_diversity += 0.10
+        if features.line_count > 2:  # Multi-line content
+            format_elements += 1
+            format_diversity += 0.15
+        if features.has_media:
+            format_elements += 1
+            format_diversity += 0.20
+
+        total_score += format_diversity * 0.25
+
+        # 2. Length diversity (optimal for different attention spans)
+        length_optimization = 0.0
+        if 100 <= features.char_count <= 200:
+            length_optimization = 1.0  # Sweet spot
+        elif 50 <= features.char_count < 100:
+            length_optimization = 0.7  # Quick punchy posts
+        elif 200 < features.char_count <= 280:
+            length_optimization = 0.9  # Standard tweets
+        elif 280 < features.char_count <= 500:
+            length_optimization = 0.6  # Longer form
+        elif features.char_count > 500:
+            length_optimization = 0.4  # Very long (better as thread)
+        else:
+            length_optimization = 0.3  # Too short
+
+        total_score += length_optimization * 0.15
+
+        # 3. Engagement bait diversity (driving different types of engagement)
+        engagement_diversity = 0.0
+        engagement_drivers = []
+
+        # Reply drivers
+        if features.has_question or features.controversy_score > 0.3:
+            engagement_diversity += 0.25
+            engagement_drivers.append("reply_driver")
+
+        # Like drivers
+        if features.emotional_intensity > 0.3 or features.has_media:
+            engagement_diversity += 0.25
+            engagement_drivers.append("like_driver")
+
+        # Retweet drivers
+        if features.viral_hook_count > 0 or features.has_cta:
+            engagement_diversity += 0.25
+            engagement_drivers.append("share_driver")
+
+        # Quote drivers
+        if features.controversy_score > 0.2:
+            engagement_diversity += 0.25
+            engagement_drivers.append("quote_driver")
+
+        total_score += engagement_diversity * 0.30
 
-    def calculate_signal_scores(self, features: ContentFeatures) -> Dict[str, Dict]:
+        # 4. Topic richness (trending + emotional + viral hooks)
+        topic_richness = 0.0
+
+        topic_richness += features.trending_alignment * 0.4
+        topic_richness += features.emotional_intensity * 0.3
+        topic_richness += min(features.viral_hook_count * 0.15, 0.3)
+
+        total_score += topic_richness * 0.20
+
+        # 5. Uniqueness penalty (deboost patterns reduce diversity)
+        deboost_risk = self._analyze_deboost_risk(features.content)
+        uniqueness_score = 1.0 - deboost_risk
+
+        total_score += uniqueness_score * 0.10
+
+        return DiversityReport(
+            score=round(diversity, 3),
+            format_score=format_diversity,
+            format_elements=format_elements,
+            length_score=length_optimization,
+            engagement_score=engagement_diversity,
+            engagement_drivers=tuple(engagement_drivers),
+            topic_richness=topic_richness,
+            deboost_risk=deboost_risk,
+            # Final diversity score (0-100)
+            diversity_score=int(min(total_score * 100, 100)),
+        )
+
+    @timed("signal_scores")
+    def calculate_signal_scores(self, features: ContentFeatures) -> SignalScores:
         """
         Calculate predicted engagement signals based on content features.
         Returns probability estimates for each engagement type.
         """
-        signals = {}
+        scores = array("d", bytes(8 * len(SIGNAL_SPECS)))
+        index = SIGNAL_INDEX
 
         # Base scores from content quality
         base_quality = self._calculate_base_quality(features)
@@ -371,12 +701,7 @@ class ViralityScorer:
             favorite_score += 0.15
         if features.emotional_intensity > 0.5:
             favorite_score += 0.10
-        signals["favorite"] = {
-            "score": min(favorite_score, 1.0),
-            "weight": self.engagement_weights["favorite"],
-            "impact": "positive",
-            "explanation": "Likes driven by emotional resonance and visual content"
-        }
+        scores[index["favorite"]] = min(favorite_score, 1.0)
 
         # Reply prediction (controversy + questions drive replies)
         reply_score = base_quality * 0.5
@@ -384,12 +709,7 @@ class ViralityScorer:
             reply_score += 0.25
         if features.controversy_score > 0.3:
             reply_score += 0.20
-        signals["reply"] = {
-            "score": min(reply_score, 1.0),
-            "weight": self.engagement_weights["reply"],
-            "impact": "positive",
-            "explanation": "Questions and controversial takes drive conversations"
-        }
+        scores[index["reply"]] = min(reply_score, 1.0)
 
         # Retweet prediction (shareability + value)
         retweet_score = base_quality * 0.5
@@ -399,12 +719,7 @@ class ViralityScorer:
             retweet_score += 0.15
         if features.has_cta:
             retweet_score += 0.10
-        signals["retweet"] = {
-            "score": min(retweet_score, 1.0),
-            "weight": self.engagement_weights["retweet"],
-            "impact": "positive",
-            "explanation": "Viral hooks and trending topics increase shareability"
-        }
+        scores[index["retweet"]] = min(retweet_score, 1.0)
 
         # Quote tweet prediction
         quote_score = base_quality * 0.4
@@ -412,56 +727,31 @@ class ViralityScorer:
             quote_score += 0.25
         if features.emotional_tone == "controversial":
             quote_score += 0.15
-        signals["quote"] = {
-            "score": min(quote_score, 1.0),
-            "weight": self.engagement_weights["quote"],
-            "impact": "positive",
-            "explanation": "Controversial content gets quote tweeted more"
-        }
+        scores[index["quote"]] = min(quote_score, 1.0)
 
         # Follow author prediction
         follow_score = base_quality * 0.3
         if features.viral_hook_count >= 2:
             follow_score += 0.15
-        signals["follow_author"] = {
-            "score": min(follow_score, 1.0),
-            "weight": self.engagement_weights["follow_author"],
-            "impact": "positive",
-            "explanation": "High-quality viral content attracts new followers"
-        }
+        scores[index["follow_author"]] = min(follow_score, 1.0)
 
         # Click prediction
         click_score = base_quality * 0.6
         if features.line_count > 3:  # Thread/longer content
             click_score += 0.15
-        signals["click"] = {
-            "score": min(click_score, 1.0),
-            "weight": self.engagement_weights["click"],
-            "impact": "positive",
-            "explanation": "Longer content and threads drive click engagement"
-        }
+        scores[index["click"]] = min(click_score, 1.0)
 
         # Profile click prediction
         profile_score = base_quality * 0.4
         if features.controversy_score > 0.3:
             profile_score += 0.10
-        signals["profile_click"] = {
-            "score": min(profile_score, 1.0),
-            "weight": self.engagement_weights["profile_click"],
-            "impact": "positive",
-            "explanation": "Interesting content makes people check your profile"
-        }
+        scores[index["profile_click"]] = min(profile_score, 1.0)
 
         # Photo expand prediction
         photo_score = 0.1
         if features.has_media and features.media_type == "image":
             photo_score = base_quality * 0.7 + 0.2
-        signals["photo_expand"] = {
-            "score": min(photo_score, 1.0),
-            "weight": self.engagement_weights["photo_expand"],
-            "impact": "positive",
-            "explanation": "Images dramatically increase engagement"
-        }
+        scores[index["photo_expand"]] = min(photo_score, 1.0)
 
         # Video quality view prediction
         vqv_score = 0.1
@@ -471,12 +761,7 @@ class ViralityScorer:
             if features.video_duration_ms:
                 if 30000 <= features.video_duration_ms <= 120000:
                     vqv_score += 0.15
-        signals["video_quality_view"] = {
-            "score": min(vqv_score, 1.0),
-            "weight": self.engagement_weights["video_quality_view"],
-            "impact": "positive",
-            "explanation": "Videos 30s-2min have highest completion rates"
-        }
+        scores[index["video_quality_view"]] = min(vqv_score, 1.0)
 
         # Dwell time prediction
         dwell_score = base_quality * 0.5
@@ -484,33 +769,13 @@ class ViralityScorer:
             dwell_score += 0.15
         if features.line_count > 2:
             dwell_score += 0.10
-        signals["dwell_time"] = {
-            "score": min(dwell_score, 1.0),
-            "weight": self.engagement_weights["dwell_time"],
-            "impact": "positive",
-            "explanation": "Longer, well-structured content keeps attention"
-        }
+        scores[index["dwell_time"]] = min(dwell_score, 1.0)
 
         # Share predictions
         share_base = base_quality * 0.4
-        signals["share"] = {
-            "score": min(share_base + 0.1, 1.0),
-            "weight": self.engagement_weights["share"],
-            "impact": "positive",
-            "explanation": "Share-worthy content has clear value"
-        }
-        signals["share_dm"] = {
-            "score": min(share_base * 0.8, 1.0),
-            "weight": self.engagement_weights["share_dm"],
-            "impact": "positive",
-            "explanation": "Personal/relatable content gets DM'd"
-        }
-        signals["share_copy_link"] = {
-            "score": min(share_base * 0.7, 1.0),
-            "weight": self.engagement_weights["share_copy_link"],
-            "impact": "positive",
-            "explanation": "Reference-worthy content gets saved/shared"
-        }
+        scores[index["share"]] = min(share_base + 0.1, 1.0)
+        scores[index["share_dm"]] = min(share_base * 0.8, 1.0)
+        scores[index["share_copy_link"]] = min(share_base * 0.7, 1.0)
 
         # Negative signal predictions
         negative_base = 0.05  # Base risk
@@ -521,46 +786,24 @@ class ViralityScorer:
             not_interested += 0.15
         if features.hashtag_count > 5:  # Hashtag spam
             not_interested += 0.20
-        signals["not_interested"] = {
-            "score": min(not_interested, 1.0),
-            "weight": self.negative_weights["not_interested"],
-            "impact": "negative",
-            "explanation": "Spammy signals make people hide your content"
-        }
+        scores[index["not_interested"]] = min(not_interested, 1.0)
 
         # Block/mute/report risk (usually from extreme content)
         extreme_risk = negative_base
         if features.caps_ratio > 0.7:
             extreme_risk += 0.10
-        signals["block_author"] = {
-            "score": min(extreme_risk, 1.0),
-            "weight": self.negative_weights["block_author"],
-            "impact": "negative",
-            "explanation": "Aggressive content leads to blocks"
-        }
-        signals["mute_author"] = {
-            "score": min(extreme_risk + 0.05, 1.0),
-            "weight": self.negative_weights["mute_author"],
-            "impact": "negative",
-            "explanation": "Annoying patterns lead to mutes"
-        }
-        signals["report"] = {
-            "score": min(extreme_risk * 0.5, 1.0),
-            "weight": self.negative_weights["report"],
-            "impact": "negative",
-            "explanation": "Policy violations lead to reports"
-        }
+        scores[index["block_author"]] = min(extreme_risk, 1.0)
+        scores[index["mute_author"]] = min(extreme_risk + 0.05, 1.0)
+        scores[index["report"]] = min(extreme_risk * 0.5, 1.0)
 
         # Deboost/Shadowban risk
-        deboost_risk = self._analyze_deboost_risk(getattr(features, 'content', ''))
-        signals["deboost"] = {
-            "score": deboost_risk,
-            "weight": -0.10,
-            "impact": "negative",
-            "explanation": "Spammy or engagement-farming keywords can deboost reach"
-        }
+        if features.diversity is not None:
+            deboost_risk = features.diversity.deboost_risk
+        else:
+            deboost_risk = self._analyze_deboost_risk(getattr(features, 'content', ''))
+        scores[index["deboost"]] = deboost_risk
 
-        return signals
+        return SignalScores(scores)
 
     def _calculate_base_quality(self, features: ContentFeatures) -> float:
         """Calculate base content quality score"""
@@ -595,6 +838,7 @@ class ViralityScorer:
 
         return min(max(score, 0.1), 0.9)
 
+    @timed("diversity")
     def calculate_diversity_score(self, features: ContentFeatures) -> Dict[str, Any]:
         """
         Calculate content diversity score based on X's author_diversity_scorer.rs
@@ -604,153 +848,58 @@ class ViralityScorer:
         - Engagement pattern diversity (likes vs replies vs retweets)
         - Topic/niche diversity signals
         - Formatting diversity (emojis, line breaks, structure)
-        """
-        diversity_factors = {}
-        total_score = 0.0
-
-        # 1. Format diversity (text structure variety)
-        format_diversity = 0.0
-        format_elements = 0
 
-        if features.has_question:
-            format_elements += 1
-            format_diversity += 0.15
-        if features.has_cta:
-            format_elements += 1
-            format_diversity += 0.10
-        if features.hashtag_count > 0:
-            format_elements += 1
-            format_diversity += 0.10
-        if features.mention_count > 0:
-            format_elements += 1
-            format_diversity += 0.10
-        if features.emoji_count > 0:
-            format_elements += 1
-            format_diversity += 0.10
-        if features.url_count > 0:
-            format_elements += 1
-            format_diversity += 0.10
-        if features.line_count > 2:  # Multi-line content
-            format_elements += 1
-            format_diversity += 0.15
-        if features.has_media:
-            format_elements += 1
-            format_diversity += 0.20
-
-        diversity_factors["format_diversity"] = {
-            "score": min(format_diversity, 1.0),
-            "elements_used": format_elements,
-            "description": "Variety of content elements used (media, hashtags, mentions, etc.)"
-        }
-        total_score += format_diversity * 0.25
-
-        # 2. Length diversity (optimal for different attention spans)
-        length_score = 0.0
-        if 100 <= features.char_count <= 200:
-            length_score = 1.0  # Sweet spot
-        elif 50 <= features.char_count < 100:
-            length_score = 0.7  # Quick punchy posts
-        elif 200 < features.char_count <= 280:
-            length_score = 0.9  # Standard tweets
-        elif 280 < features.char_count <= 500:
-            length_score = 0.6  # Longer form
-        elif features.char_count > 500:
-            length_score = 0.4  # Very long (better as thread)
-        else:
-            length_score = 0.3  # Too short
-
-        diversity_factors["length_optimization"] = {
-            "score": length_score,
-            "char_count": features.char_count,
-            "description": "How well content length matches optimal engagement patterns"
-        }
-        total_score += length_score * 0.15
-
-        # 3. Engagement bait diversity (driving different types of engagement)
-        engagement_diversity = 0.0
-        engagement_drivers = []
-
-        # Reply drivers
-        if features.has_question or features.controversy_score > 0.3:
-            engagement_diversity += 0.25
-            engagement_drivers.append("reply_driver")
-
-        # Like drivers
-        if features.emotional_intensity > 0.3 or features.has_media:
-            engagement_diversity += 0.25
-            engagement_drivers.append("like_driver")
-
-        # Retweet drivers
-        if features.viral_hook_count > 0 or features.has_cta:
-            engagement_diversity += 0.25
-            engagement_drivers.append("share_driver")
-
-        # Quote drivers
-        if features.controversy_score > 0.2:
-            engagement_diversity += 0.25
-            engagement_drivers.append("quote_driver")
-
-        diversity_factors["engagement_diversity"] = {
-            "score": min(engagement_diversity, 1.0),
-            "drivers": engagement_drivers,
-            "description": "Ability to drive multiple engagement types (likes, replies, RTs, quotes)"
-        }
-        total_score += engagement_diversity * 0.30
-
-        # 4. Topic richness (trending + emotional + viral hooks)
-        topic_richness = 0.0
-
-        topic_richness += features.trending_alignment * 0.4
-        topic_richness += features.emotional_intensity * 0.3
-        topic_richness += min(features.viral_hook_count * 0.15, 0.3)
-
-        diversity_factors["topic_richness"] = {
-            "score": min(topic_richness, 1.0),
-            "trending_alignment": features.trending_alignment,
-            "emotional_intensity": features.emotional_intensity,
-            "description": "Alignment with trending topics and emotional resonance"
-        }
-        total_score += topic_richness * 0.20
-
-        # 5. Uniqueness penalty (deboost patterns reduce diversity)
-        deboost_risk = self._analyze_deboost_risk(features.content)
-        uniqueness_score = 1.0 - deboost_risk
-
-        diversity_factors["uniqueness"] = {
-            "score": uniqueness_score,
-            "spam_risk": deboost_risk,
-            "description": "How unique/original vs spammy/templated the content appears"
+        The factors come from the report cached on the record by
+        extract_features; it is only computed here for records built elsewhere.
+        """
+        report = features.diversity
+        if report is None:
+            report = self._attach_diversity(features).diversity
+
+        diversity_factors = {
+            "format_diversity": {
+                "score": min(report.format_score, 1.0),
+                "elements_used": report.format_elements,
+                "description": "Variety of content elements used (media, hashtags, mentions, etc.)"
+            },
+            "length_optimization": {
+                "score": report.length_score,
+                "char_count": features.char_count,
+                "description": "How well content length matches optimal engagement patterns"
+            },
+            "engagement_diversity": {
+                "score": min(report.engagement_score, 1.0),
+                "drivers": list(report.engagement_drivers),
+                "description": "Ability to drive multiple engagement types (likes, replies, RTs, quotes)"
+            },
+            "topic_richness": {
+                "score": min(report.topic_richness, 1.0),
+                "trending_alignment": features.trending_alignment,
+                "emotional_intensity": features.emotional_intensity,
+                "description": "Alignment with trending topics and emotional resonance"
+            },
+            "uniqueness": {
+                "score": 1.0 - report.deboost_risk,
+                "spam_risk": report.deboost_risk,
+                "description": "How unique/original vs spammy/templated the content appears"
+            },
         }
-        total_score += uniqueness_score * 0.10
-
-        # Calculate final diversity score (0-100)
-        final_diversity_score = int(min(total_score * 100, 100))
 
         # Determine diversity tier
-        if final_diversity_score >= 80:
-            diversity_tier = "HIGHLY_DIVERSE"
-            tier_description = "Excellent content variety - algorithm will favor distribution"
-        elif final_diversity_score >= 60:
-            diversity_tier = "WELL_BALANCED"
-            tier_description = "Good content balance - solid engagement potential"
-        elif final_diversity_score >= 40:
-            diversity_tier = "MODERATE"
-            tier_description = "Some variety present - consider adding more elements"
-        elif final_diversity_score >= 20:
-            diversity_tier = "LIMITED"
-            tier_description = "Low diversity - content may feel repetitive"
-        else:
-            diversity_tier = "MONOTONE"
-            tier_description = "Very limited variety - high risk of reduced reach"
+        diversity_tier, tier_description = next(
+            (tier, description) for minimum, tier, description in DIVERSITY_TIERS
+            if report.diversity_score >= minimum
+        )
 
         return {
-            "diversity_score": final_diversity_score,
+            "diversity_score": report.diversity_score,
             "diversity_tier": diversity_tier,
             "tier_description": tier_description,
             "factors": diversity_factors
         }
 
-    def calculate_final_score(self, signals: Dict[str, Dict]) -> Tuple[int, Dict]:
+    @timed("final_score")
+    def calculate_final_score(self, signals: SignalScores) -> Tuple[int, Dict]:
         """
         Calculate final virality score (0-100) using weighted combination.
         Mimics weighted_scorer.rs logic.
@@ -759,10 +908,7 @@ class ViralityScorer:
         negative_sum = 0.0
         weights_sum = 0.0
 
-        for signal_name, signal_data in signals.items():
-            score = signal_data["score"]
-            weight = signal_data["weight"]
-
+        for weight, score in zip(SIGNAL_WEIGHTS, signals.scores):
             if weight > 0:
                 positive_sum += score * weight
                 weights_sum += weight
@@ -783,178 +929,21 @@ class ViralityScorer:
 
         breakdown = {
             "engagement_potential": positive_normalized,
-            "shareability": signals.get("retweet", {}).get("score", 0) * 0.5 +
-                           signals.get("quote", {}).get("score", 0) * 0.3 +
-                           signals.get("share", {}).get("score", 0) * 0.2,
-            "controversy_risk": signals.get("quote", {}).get("score", 0) * 0.5 +
-                               (signals.get("reply", {}).get("score", 0) - 0.3) * 0.5,
+            "shareability": signals["retweet"] * 0.5 +
+                           signals["quote"] * 0.3 +
+                           signals["share"] * 0.2,
+            "controversy_risk": signals["quote"] * 0.5 +
+                               (signals["reply"] - 0.3) * 0.5,
             "negative_signal_risk": negative_sum,
         }
 
         return final_score, breakdown
 
+    @timed("improvements")
     def generate_improvements(self, features: ContentFeatures,
-                             signals: Dict[str, Dict]) -> List[Dict]:
-        """Generate actionable improvement tips with specific examples"""
-        tips = []
-
-        # Check for missing question
-        if not features.has_question and signals["reply"]["score"] < 0.6:
-            tips.append({
-                "signal": "reply",
-                "tip": "Add a question to spark replies",
-                "action": "End with: 'What's your take?' or 'Anyone else experience this?' or 'Thoughts?'",
-                "example": "→ 'The best time to post is 9am EST. Agree or disagree?'",
-                "impact": "+15-20%",
-                "priority": "high",
-                "emoji": "❓"
-            })
-
-        # Check for missing media
-        if not features.has_media:
-            tips.append({
-                "signal": "favorite",
-                "tip": "Add visual content for 2x engagement",
-                "action": "Attach an image, screenshot, meme, or short video clip",
-                "example": "→ Screenshots of tweets, charts, behind-the-scenes photos work best",
-                "impact": "+25-40%",
-                "priority": "high",
-                "emoji": "🖼️"
-            })
-
-        # Check for missing viral hook
-        if features.viral_hook_count == 0:
-            tips.append({
-                "signal": "retweet",
-                "tip": "Open with a viral hook",
-                "action": "Start with: 'Thread:', 'Hot take:', 'POV:', 'Nobody talks about...'",
-                "example": "→ 'Unpopular opinion: [your take]' or '1/ Here's why...'",
-                "impact": "+10-15%",
-                "priority": "medium",
-                "emoji": "🪝"
-            })
-
-        # Check for suboptimal length
-        if features.char_count < 80:
-            tips.append({
-                "signal": "dwell_time",
-                "tip": "Expand your post for better engagement",
-                "action": "Add context, reasoning, or a personal angle to reach 100-200 chars",
-                "example": "→ Instead of 'AI is changing everything' try 'AI is changing everything. I spent 3 hours on a task that now takes 10 minutes. Here's how...'",
-                "impact": "+8-12%",
-                "priority": "medium",
-                "emoji": "📝"
-            })
-        elif features.char_count > 400:
-            tips.append({
-                "signal": "favorite",
-                "tip": "Break into a numbered thread",
-                "action": "Split into 3-5 tweets with '1/', '2/', '3/' format",
-                "example": "→ First tweet hooks, subsequent tweets deliver value. End with a CTA to follow.",
-                "impact": "+10-15%",
-                "priority": "medium",
-                "emoji": "🧵"
-            })
-
-        # Check hashtag usage
-        if features.hashtag_count > 3:
-            tips.append({
-                "signal": "not_interested",
-                "tip": "Remove excess hashtags",
-                "action": "Keep only 1-2 most relevant hashtags at the end",
-                "example": "→ '#AI #Tech' is fine. '#AI #Tech #Future #Innovation #Startup #Growth' is spam.",
-                "impact": "-15% risk",
-                "priority": "high",
-                "emoji": "🚫"
-            })
-        elif features.hashtag_count == 0 and features.trending_alignment < 0.3:
-            tips.append({
-                "signal": "retweet",
-                "tip": "Add 1-2 discovery hashtags",
-                "action": "Add relevant trending or niche hashtags at the end",
-                "example": "→ If posting about crypto, add '#Bitcoin' or '#Crypto'. For tech, '#AI' or '#Tech'.",
-                "impact": "+5-10%",
-                "priority": "low",
-                "emoji": "#️⃣"
-            })
-
-        # Check for CTA
-        if not features.has_cta and signals["retweet"]["score"] < 0.5:
-            tips.append({
-                "signal": "retweet",
-                "tip": "Add a call-to-action",
-                "action": "End with a soft CTA that encourages engagement",
-                "example": "→ 'Bookmark this for later' or 'RT to help others' or 'Follow for more'",
-                "impact": "+8-12%",
-                "priority": "medium",
-                "emoji": "📣"
-            })
-
-        # Check for caps abuse
-        if features.caps_ratio > 0.3:
-            tips.append({
-                "signal": "not_interested",
-                "tip": "Reduce ALL CAPS usage",
-                "action": "Use caps sparingly for ONE word emphasis only",
-                "example": "→ 'This is HUGE' ✓ vs 'THIS IS HUGE NEWS EVERYONE' ✗",
-                "impact": "-10% risk",
-                "priority": "high",
-                "emoji": "🔇"
-            })
-
-        # Check emotional content
-        if features.emotional_intensity < 0.2:
-            tips.append({
-                "signal": "favorite",
-                "tip": "Add emotional language",
-                "action": "Include words that trigger emotion: amazing, terrible, mind-blowing, frustrating",
-                "example": "→ 'New feature released' vs 'This new feature is absolutely game-changing'",
-                "impact": "+10-15%",
-                "priority": "medium",
-                "emoji": "💥"
-            })
-
-        # Check for controversy (can be positive)
-        if features.controversy_score < 0.2 and signals["quote"]["score"] < 0.4:
-            tips.append({
-                "signal": "quote",
-                "tip": "Add a contrarian angle",
-                "action": "Challenge conventional wisdom or share an unpopular take",
-                "example": "→ 'Everyone says X but I think Y because...' drives quote tweets",
-                "impact": "+15-25%",
-                "priority": "low",
-                "emoji": "🌶️"
-            })
-
-        # Check for mention usage
-        if features.mention_count == 0 and signals["reply"]["score"] < 0.5:
-            tips.append({
-                "signal": "reply",
-                "tip": "Tag relevant accounts",
-                "action": "Mention 1-2 accounts who'd find this valuable or might engage",
-                "example": "→ Tag the creator you're discussing or someone in your niche",
-                "impact": "+5-10%",
-                "priority": "low",
-                "emoji": "📍"
-            })
-
-        # Check for emoji usage
-        if features.emoji_count == 0 and features.emotional_intensity < 0.3:
-            tips.append({
-                "signal": "click",
-                "tip": "Add 1-2 relevant emojis",
-                "action": "Use emojis to break up text and add visual interest",
-                "example": "→ Lead with an emoji: '🚀 Just launched...' or '💡 Pro tip:...'",
-                "impact": "+3-5%",
-                "priority": "low",
-                "emoji": "✨"
-            })
-
-        # Sort by priority
-        priority_order = {"high": 0, "medium": 1, "low": 2}
-        tips.sort(key=lambda x: priority_order.get(x["priority"], 2))
-
-        return tips[:6]  # Return top 6 tips
+                             signals: SignalScores) -> List[Tip]:
+        """Top actionable improvement tips, highest priority first"""
+        return self.tips.select(features, signals)
 
 
 # Singleton instance
@@ -0,0 +1,71 @@
+"""
+Thread Splitting
+
+Splits a thread draft into its tweets so each can be scored on its own:
+
+- Numbered threads: tweets start at "1/", "2/", ... (or "1/8", "2/8", ...)
+  markers, counted up from 1. Text before "1/" is a separate opening tweet.
+- Otherwise tweets are separated by blank lines.
+
+The tweets are scored together in one vectorized batch pass (services.batch),
+so a long thread costs about as much as scoring its text as a single post.
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence
+import re
+
+# Tweets allowed in one thread
+MAX_THREAD_TWEETS = 100
+
+# Content type bonus for threads (shared with /api/analyze/combined)
+THREAD_MULTIPLIER = 1.15
+
+# Weight of the opening tweet in the aggregate score: it is the one shown in
+# the feed, and the rest of the thread only gets read if it lands.
+HOOK_WEIGHT = 0.4
+
+# "1/", "12/" or "3/10", standing alone between whitespace
+NUMBER_MARKER_RE = re.compile(r'(?<!\S)(\d{1,3})/(?:\d{1,3})?(?!\S)')
+BLANK_LINE_RE = re.compile(r'\n[ \t]*\n')
+
+
+@dataclass
+class ThreadSplit:
+    """The tweets of a thread and how they were found"""
+    tweets: List[str]
+    split_by: str  # "numbered", "blank_lines" or "single"
+
+
+def split_thread(content: str) -> ThreadSplit:
+    """Split a thread on numbered markers, or else on blank lines"""
+    starts = []
+    expected = 1
+    for match in NUMBER_MARKER_RE.finditer(content):
+        if int(match.group(1)) == expected:
+            starts.append(match.start())
+            expected += 1
+
+    if len(starts) > 1:
+        split_by = "numbered"
+        bounds = ([0] if content[:starts[0]].strip() else []) + starts
+        tweets = [content[start:end].strip() for start, end in zip(bounds, bounds[1:] + [len(content)])]
+    else:
+        tweets = [tweet.strip() for tweet in BLANK_LINE_RE.split(content)]
+        tweets = [tweet for tweet in tweets if tweet]
+        split_by = "blank_lines" if len(tweets) > 1 else "single"
+
+    if not tweets:
+        raise ValueError("Thread has no content")
+    if len(tweets) > MAX_THREAD_TWEETS:
+        raise ValueError(f"Thread has {len(tweets)} tweets; at most {MAX_THREAD_TWEETS} are supported")
+    return ThreadSplit(tweets=tweets, split_by=split_by)
+
+
+def aggregate_thread_score(scores: Sequence[int]) -> int:
+    """
+    Thread score from its tweets' scores (0-100): the opening tweet weighs
+    HOOK_WEIGHT, the average over all tweets the rest, times the thread bonus.
+    """
+    mean = sum(scores) / len(scores)
+    return max(0, min(100, int((scores[0] * HOOK_WEIGHT + mean * (1 - HOOK_WEIGHT)) * THREAD_MULTIPLIER)))
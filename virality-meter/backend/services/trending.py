@@ -0,0 +1,257 @@
+"""
+Trending Topic Index
+
+Matches a (potentially very large) set of trending terms against a post.
+
+Terms and text are split into word tokens (``\\w+``), so terms only match
+whole words: 'ai' matches "AI is here" and "ai-powered" but not "said".
+Multi-word terms ('federal reserve') match consecutive tokens. The index
+maps each term's first token to the term lengths starting with it, so a
+match costs one dict lookup per token of text plus a set lookup per
+candidate length - linear in the text, independent of the number of terms.
+
+TrendingTopics owns the live index. It can load terms from a file (one term
+per line, '#' comments) and re-load it in a background thread whenever the
+file changes; the new index is built off to the side and swapped in with a
+single reference assignment, so requests never wait on a reload. Each index
+has a version derived from its terms, so results computed with different
+term lists (e.g. cached analyses) can be told apart across processes.
+"""
+
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+from .timing import timed
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r'\w+')
+
+Term = Tuple[str, ...]
+
+
+def _is_word_char(char: str) -> bool:
+    """Same character class as \\w for str patterns"""
+    return char.isalnum() or char == "_"
+
+
+class TrendingIndex:
+    """
+    Immutable word-boundary matcher over a set of terms (lowercase text).
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        normalized = set()
+        for term in terms:
+            tokens = tuple(WORD_RE.findall(term.lower()))
+            if tokens:
+                normalized.add(tokens)
+        self.terms: FrozenSet[Term] = frozenset(normalized)
+        self.max_words = max(map(len, self.terms), default=1)
+        self.version = hashlib.blake2b(
+            "\n".join(sorted(" ".join(tokens) for tokens in self.terms)).encode(), digest_size=8
+        ).hexdigest()
+
+        # One-word terms are matched with a C-level set intersection; longer
+        # terms are looked up by their first token.
+        self._single: FrozenSet[str] = frozenset(tokens[0] for tokens in self.terms if len(tokens) == 1)
+        lengths: Dict[str, set] = {}
+        for tokens in self.terms:
+            if len(tokens) > 1:
+                lengths.setdefault(tokens[0], set()).add(len(tokens))
+        self._multi_lengths: Dict[str, Tuple[int, ...]] = {
+            first: tuple(sorted(sizes)) for first, sizes in lengths.items()
+        }
+        self._multi_first: FrozenSet[str] = frozenset(lengths)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _iter_terms(self, tokens: List[str], stop: int) -> Iterator[Term]:
+        """Every term occurrence starting at tokens[0:stop]"""
+        single = self._single
+        lengths = self._multi_lengths
+        terms = self.terms
+        n = len(tokens)
+        for i in range(stop):
+            token = tokens[i]
+            if token in single:
+                yield (token,)
+            for size in lengths.get(token, ()):
+                if i + size > n:
+                    break
+                term = tuple(tokens[i:i + size])
+                if term in terms:
+                    yield term
+
+    def matched_terms(self, text: str) -> FrozenSet[Term]:
+        """Distinct terms found in text"""
+        tokens = WORD_RE.findall(text)
+        return frozenset(self._iter_terms(tokens, len(tokens)))
+
+    def count(self, text: str) -> int:
+        """Number of distinct terms found in text"""
+        tokens = WORD_RE.findall(text)
+        matches = len(self._single.intersection(tokens))
+        if not self._multi_first.isdisjoint(tokens):
+            matches += len({term for term in self._iter_terms(tokens, len(tokens)) if len(term) > 1})
+        return matches
+
+    # -------------------------------------------------------------------------
+    # Incremental matching (see services.incremental)
+    #
+    # Callers keep the number of occurrences of each term. After an edit only
+    # occurrences that include a token touched by the edit change; they start
+    # at most max_words - 1 tokens before it.
+    # -------------------------------------------------------------------------
+
+    def window_start(self, text: str, pos: int) -> int:
+        """Start of the token max_words - 1 tokens before pos (pos must not be inside a token)"""
+        for _ in range(self.max_words - 1):
+            while pos > 0 and not _is_word_char(text[pos - 1]):
+                pos -= 1
+            while pos > 0 and _is_word_char(text[pos - 1]):
+                pos -= 1
+        return pos
+
+    def count_starts(self, text: str, lo: int, hi: int) -> Counter:
+        """Occurrences per term of terms whose first token starts in [lo, hi); lo must not be inside a token"""
+        starts: Counter = Counter()
+        if lo >= hi:
+            return starts
+        tokens: List[str] = []
+        first_outside = None
+        for match in WORD_RE.finditer(text, lo):
+            if match.start() >= hi:
+                if first_outside is None:
+                    first_outside = len(tokens)
+                if len(tokens) - first_outside >= self.max_words - 1:
+                    break
+            tokens.append(match.group())
+        starts.update(self._iter_terms(tokens, len(tokens) if first_outside is None else first_outside))
+        return starts
+
+
+class TrendingTopics:
+    """
+    The live trending index, optionally backed by a file that is re-loaded
+    in the background when it changes.
+    """
+
+    def __init__(self, default_terms: Iterable[str], path: Optional[str] = None,
+                 refresh_seconds: float = 300.0):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+
+        self._index = TrendingIndex(default_terms)
+        self._mtime: Optional[float] = None
+        self._watcher_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self.source = "builtin"
+        self.loaded_at = time.time()
+        self.load_seconds = 0.0
+        self.loads = 0
+        self.load_errors = 0
+        self.last_error: Optional[str] = None
+        self.match_calls = 0
+        self.match_seconds = 0.0
+
+        if path:
+            self.reload()
+
+    @property
+    def index(self) -> TrendingIndex:
+        """Current index (starts the file watcher in this process on first use)"""
+        if self.path and self._watcher_pid != os.getpid():
+            self._start_watcher()
+        return self._index
+
+    @property
+    def version(self) -> str:
+        """Version of the current index (same terms, same version in every process)"""
+        return self.index.version
+
+    @timed("trending")
+    def count(self, text: str) -> int:
+        """Number of distinct trending terms in (lowercase) text"""
+        index = self.index
+        started = time.perf_counter()
+        matches = index.count(text)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.match_calls += 1
+            self.match_seconds += elapsed
+        return matches
+
+    def reload(self) -> bool:
+        """Load the terms file and swap in the new index; keeps the current one on failure"""
+        try:
+            started = time.perf_counter()
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                terms = [line.strip() for line in f]
+            index = TrendingIndex(term for term in terms if term and not term.startswith("#"))
+            load_seconds = time.perf_counter() - started
+        except (OSError, UnicodeDecodeError) as e:
+            self.load_errors += 1
+            self.last_error = str(e)
+            logger.warning("Could not load trending topics from %s: %s", self.path, e)
+            return False
+
+        self._index = index  # Atomic swap; in-flight matches finish on the old index
+        self._mtime = mtime
+        self.source = self.path
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.loads += 1
+        self.last_error = None
+        return True
+
+    def _start_watcher(self) -> None:
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()  # Threads do not survive a fork; restart per process
+            self._stop.clear()
+        thread = threading.Thread(target=self._watch, name="trending-reload", daemon=True)
+        thread.start()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+            except OSError:
+                changed = True  # Let reload() record the error
+            if changed:
+                self.reload()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._watcher_pid = None
+
+    def stats(self) -> Dict[str, object]:
+        """Index size, load timings and match timings"""
+        with self._lock:
+            calls, seconds = self.match_calls, self.match_seconds
+        return {
+            "source": self.source,
+            "terms": len(self._index),
+            "version": self._index.version,
+            "max_words": self._index.max_words,
+            "loaded_at": self.loaded_at,
+            "load_ms": round(self.load_seconds * 1000, 3),
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "last_error": self.last_error,
+            "refresh_seconds": self.refresh_seconds if self.path else None,
+            "match_calls": calls,
+            "match_avg_us": round(seconds / calls * 1e6, 3) if calls else 0.0,
+        }
@@ -0,0 +1,230 @@
+"""
+Draft Variants
+
+Turns the improvement tips that fire for a draft into concrete rewrites
+(add a question, prepend a hook, trim hashtags, add a CTA, ...) and scores
+all of them at once:
+
+- Each variant is a list of text edits. For longer drafts, the draft is
+  analyzed once into an incremental session (services.incremental) and
+  variant features are derived from it by recounting only the edited
+  windows; short drafts, and rewrites of most of the text, are re-extracted.
+- The base draft and every variant are then scored together in one
+  vectorized batch pass (services.batch).
+
+Rewrites are keyed by tip rule name, so they follow the configured tip table:
+a rule with no rewrite here (add media, tag accounts, ...) yields no variant.
+Variants are ranked by score delta against the base draft.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import re
+
+from .batch import BatchResult, BatchScorer, batch_scorer
+from .incremental import IncrementalAnalyzer, TextEdit, incremental_analyzer
+from .scorer import HASHTAG_RE, MENTION_RE, URL_RE
+
+# Hashtags kept by the trim rewrite (the tip recommends 1-2)
+KEPT_HASHTAGS = 2
+
+# Below this length re-extracting a variant is cheaper than an incremental
+# update (which has a fixed cost of a few window scans)
+INCREMENTAL_MIN_CHARS = 280
+
+SENTENCE_START_RE = re.compile(r'(^|[.!?]\s+)([a-z])')
+# Spans sentence_case leaves as written: links and handles may be case-sensitive
+KEEP_CASE_RE = re.compile('|'.join(
+    pattern.pattern for pattern in (URL_RE, MENTION_RE, HASHTAG_RE, re.compile(r'\bI\b'))
+))
+
+# Edits against a text (applied in order); None when the rewrite does not apply
+Rewrite = Callable[[str], Optional[List[TextEdit]]]
+
+
+def append(suffix: str) -> Rewrite:
+    """Replace trailing whitespace with suffix"""
+    def rewrite(content: str) -> Optional[List[TextEdit]]:
+        end = len(content.rstrip())
+        return [(end, len(content), suffix)]
+    return rewrite
+
+
+def prepend(prefix: str) -> Rewrite:
+    """Replace leading whitespace with prefix"""
+    def rewrite(content: str) -> Optional[List[TextEdit]]:
+        return [(0, len(content) - len(content.lstrip()), prefix)]
+    return rewrite
+
+
+def trim_hashtags(content: str) -> Optional[List[TextEdit]]:
+    """Drop every hashtag after the first KEPT_HASHTAGS, with the whitespace before it"""
+    extra = list(HASHTAG_RE.finditer(content))[KEPT_HASHTAGS:]
+    edits = []
+    for match in reversed(extra):  # Right to left, so earlier offsets stay valid
+        start = match.start()
+        while start > 0 and content[start - 1].isspace():
+            start -= 1
+        edits.append((start, match.end(), ""))
+    return edits or None
+
+
+def sentence_case(content: str) -> Optional[List[TextEdit]]:
+    """Lowercase the draft, capitalizing sentence starts; URLs, mentions, hashtags and "I" are kept"""
+    pieces: List[str] = []
+    kept: List[Tuple[int, int]] = []  # Kept spans, as offsets into the rewritten text
+    length = position = 0
+    for match in KEEP_CASE_RE.finditer(content):
+        lowered = content[position:match.start()].lower()  # May change length (e.g. 'İ')
+        pieces += [lowered, match.group()]
+        length += len(lowered)
+        kept.append((length, length + len(match.group())))
+        length += len(match.group())
+        position = match.end()
+    pieces.append(content[position:].lower())
+    lowered = "".join(pieces)
+
+    def capitalize(match: re.Match) -> str:
+        if any(start <= match.start(2) < end for start, end in kept):
+            return match.group()
+        return match.group(1) + match.group(2).upper()
+
+    rewritten = SENTENCE_START_RE.sub(capitalize, lowered)
+    return [(0, len(content), rewritten)] if rewritten != content else None
+
+
+@dataclass(frozen=True)
+class VariantRule:
+    """One rewrite offered when a tip fires"""
+    kind: str
+    description: str
+    rewrite: Rewrite
+
+
+# Tip rule name -> rewrites, first one preferred for the combined variant.
+# Order is the order rewrites are applied in the combined variant.
+REWRITES: Dict[str, Tuple[VariantRule, ...]] = {
+    "remove_hashtags": (
+        VariantRule("trim_hashtags", f"Keep only the first {KEPT_HASHTAGS} hashtags", trim_hashtags),
+    ),
+    "reduce_caps": (
+        VariantRule("sentence_case", "Rewrite in sentence case", sentence_case),
+    ),
+    "add_question": (
+        VariantRule("add_question", "End with a question", append("\n\nWhat's your take?")),
+        VariantRule("add_question", "End with a question", append(" Agree or disagree?")),
+    ),
+    "add_cta": (
+        VariantRule("add_cta", "End with a call-to-action", append("\n\nBookmark this for later.")),
+        VariantRule("add_cta", "End with a call-to-action", append(" Follow for more.")),
+    ),
+    "add_viral_hook": (
+        VariantRule("add_hook", "Open with a viral hook", prepend("Hot take: ")),
+        VariantRule("add_hook", "Open with a viral hook", prepend("Nobody talks about this: ")),
+        VariantRule("add_hook", "Open with a viral hook", prepend("Unpopular opinion: ")),
+    ),
+    "add_emojis": (
+        VariantRule("add_emoji", "Lead with an emoji", prepend("🚀 ")),
+        VariantRule("add_emoji", "Lead with an emoji", prepend("💡 ")),
+    ),
+}
+
+
+@dataclass
+class DraftVariant:
+    """One rewrite of the draft"""
+    kind: str
+    rule: str  # Tip rule the rewrite applies, or "combined"
+    description: str
+    content: str
+    row: int  # Row of this variant in the batch result (row 0 is the draft)
+
+
+@dataclass
+class VariantSet:
+    """A draft, its variants ranked by score delta, and their batch scores"""
+    variants: List[DraftVariant]
+    result: BatchResult
+
+    def delta(self, variant: DraftVariant) -> int:
+        return int(self.result.final_scores[variant.row] - self.result.final_scores[0])
+
+
+def _apply(content: str, edits: Sequence[TextEdit]) -> str:
+    for start, end, text in edits:
+        content = content[:start] + text + content[end:]
+    return content
+
+
+class VariantGenerator:
+    """
+    Generates and scores rewrites of a draft for the tips that fire on it.
+    """
+
+    def __init__(self, incremental: IncrementalAnalyzer, batch: BatchScorer):
+        self.incremental = incremental
+        self.batch = batch
+        self.base = incremental.base
+
+    def fired_rules(self, features, signals) -> List[str]:
+        """Names of the tip rules matching a draft, highest priority first"""
+        return [rule.name for rule in self.base.tips.rules if rule.matches(features, signals)]
+
+    def generate(self, content: str, has_media: bool, media_type: str,
+                 video_duration_ms: int) -> VariantSet:
+        # Incremental sessions only pay off on longer drafts; short ones are re-extracted
+        session = None
+        if len(content) >= INCREMENTAL_MIN_CHARS:
+            session = self.incremental.session(content, has_media, media_type, video_duration_ms)
+            base_features = session.features
+        else:
+            base_features = self.base.extract_features(content, has_media, media_type, video_duration_ms)
+        fired = set(self.fired_rules(base_features, self.base.calculate_signal_scores(base_features)))
+
+        # (tip rule, kind, description, edits), plus one variant chaining the
+        # first rewrite of every fired rule
+        candidates: List[Tuple[str, str, str, List[TextEdit]]] = []
+        combined_edits: List[TextEdit] = []
+        combined_text = content
+        combined_kinds = []
+        for name, options in REWRITES.items():
+            if name not in fired:
+                continue
+            for option in options:
+                edits = option.rewrite(content)
+                if edits is not None:
+                    candidates.append((name, option.kind, option.description, edits))
+            edits = options[0].rewrite(combined_text)
+            if edits is not None:
+                combined_edits += edits
+                combined_text = _apply(combined_text, edits)
+                combined_kinds.append(options[0].kind)
+        if len(combined_kinds) > 1:
+            candidates.append(("combined", "combined", "Apply " + ", ".join(combined_kinds), combined_edits))
+
+        features = [base_features]
+        variants: List[DraftVariant] = []
+        seen = {content}
+        for name, kind, description, edits in candidates:
+            text = _apply(content, edits)
+            if text in seen or not 0 < len(text) <= self.incremental.max_chars:
+                continue
+            seen.add(text)
+            edited = sum(end - start + len(replacement) for start, end, replacement in edits)
+            if session is not None and edited <= len(content) // 2:
+                features.append(self.incremental.fork(session, edits).features)
+            else:
+                features.append(self.base._extract_preliminary_features(
+                    text, has_media, media_type, video_duration_ms
+                ))
+            variants.append(DraftVariant(kind, name, description, text, len(features) - 1))
+
+        result = self.batch.score_features(features)
+        scores = result.final_scores
+        # list.sort() is stable: equal scores keep the REWRITES order
+        variants.sort(key=lambda variant: -int(scores[variant.row]))
+        return VariantSet(variants=variants, result=result)
+
+
+# Singleton instance
+variant_generator = VariantGenerator(incremental_analyzer, batch_scorer)
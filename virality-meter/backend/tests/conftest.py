@@ -0,0 +1,11 @@
+"""
+Puts the backend directory on sys.path so the tests import main, routers and
+services wherever pytest is run from.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,274 @@
+"""
+Golden-output corpus for the content scorer.
+
+tests/golden/scorer_outputs.jsonl.gz records, for a few thousand generated
+drafts, what the reference ViralityScorer (built-in trending topics and tip
+rules) returns from extract_features, calculate_signal_scores,
+calculate_final_score, generate_improvements and calculate_diversity_score.
+Any alternative engine exposing those methods can be checked against it;
+values must match exactly (floats included) unless a tolerance is given.
+
+Usage (from virality-meter/backend):
+    python tests/golden.py check                                  # reference scorer
+    python tests/golden.py check --engine mypkg.fast:FastScorer   # instance, class or factory
+    python tests/golden.py check --engine mypkg.fast:scorer --rel-tol 1e-12
+    python tests/golden.py record                                 # after an intended change
+
+Re-record only when a scoring change is deliberate, and review the diff of
+`check` output first.
+"""
+
+import argparse
+import dataclasses
+import gzip
+import importlib
+import json
+import math
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from services.improvements import DEFAULT_TIP_RULES, TipRuleTable  # noqa: E402
+from services.scorer import (  # noqa: E402
+    _TIP_OPERANDS, CONTROVERSY_PATTERNS, CTA_PATTERNS, DEBOOST_PATTERNS, EMOTIONAL_PATTERNS,
+    QUESTION_PATTERNS, SIGNAL_NAMES, TRENDING_TOPICS, VIRAL_HOOKS, ContentFeatures, ViralityScorer,
+)
+from services.trending import TrendingTopics  # noqa: E402
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "scorer_outputs.jsonl.gz")
+FORMAT_VERSION = 1
+CORPUS_SIZE = 4000
+CORPUS_SEED = 17
+
+# Recorded feature fields; content is the input and diversity is derived
+FEATURE_FIELDS = tuple(
+    f.name for f in dataclasses.fields(ContentFeatures) if f.name not in ("content", "diversity")
+)
+OUTPUTS = ("features", "signals", "final_score", "improvements", "diversity")
+
+WORDS = [
+    "the", "a", "I", "we", "you", "it", "is", "was", "just", "really", "never", "always",
+    "said", "training", "explain", "repaid", "domain", "mainstream", "algorithms", "marketing",
+    "launch", "shipped", "users", "growth", "money", "today", "why", "how", "week", "people",
+    "L", "W", "mid", "actually", "wrong", "overrated", "live", "sad", "best", "love", "hate",
+]
+EMOJI = [
+    "🚀", "🔥", "😂", "🎉", "💡", "👀", "🙌", "🤖", "📈", "🧵", "😀", "🙏",    # U+1F300-1F9FF
+    "✨", "❤️", "☀️", "⚡", "✅", "🫠", "🥹", "🫶", "👍🏽", "🇺🇸", "👩‍👧", "#️⃣",  # outside it / sequences
+]
+NOISE = ["#AI", "#Tech", "#F4F", "#bitcoin", "#", "@elon", "@", "@team_x", "https://x.com/a/b",
+         "http://t.co/xyz", "1/", "2/", "10)", "?", "!", "...", "—", "é", "ß", "İ", "中文",
+         "\n", "\n\n", "\t", "  ", "'", "\"", "'?", "?\"", "don't @ me", "DON'T"]
+
+
+def _fragments() -> List[str]:
+    patterns = [*QUESTION_PATTERNS, *CTA_PATTERNS, *VIRAL_HOOKS, *DEBOOST_PATTERNS, *CONTROVERSY_PATTERNS,
+                *TRENDING_TOPICS]
+    for family in EMOTIONAL_PATTERNS.values():
+        patterns += family
+    return [pattern.replace("\\d+", "3").replace("\\", "").rstrip("$") for pattern in patterns]
+
+
+def build_corpus(count: int = CORPUS_SIZE, seed: int = CORPUS_SEED) -> Iterator[Dict[str, Any]]:
+    """Deterministic, deliberately varied drafts (lengths 0-4000, casing, emoji, media)"""
+    rng = random.Random(seed)
+    fragments = _fragments()
+    pools = [WORDS, fragments, EMOJI, NOISE]
+    for i in range(count):
+        shape = i % 8
+        if shape == 0:
+            # Tweet-length prose
+            parts = [rng.choice(WORDS if rng.random() < 0.7 else fragments) for _ in range(rng.randint(1, 45))]
+        elif shape == 1:
+            # Longform; every other one runs into the 4000-char limit
+            words = rng.randint(300, 900) if i % 16 == 1 else rng.randint(60, 250)
+            parts = [rng.choice(rng.choice(pools)) for _ in range(words)]
+        elif shape == 2:
+            # Emoji-heavy
+            parts = [rng.choice(EMOJI if rng.random() < 0.7 else WORDS) for _ in range(rng.randint(1, 80))]
+        elif shape == 3:
+            # Hashtag / mention / link spam
+            parts = [rng.choice(NOISE[:10] + DEBOOST_PATTERNS) for _ in range(rng.randint(1, 40))]
+        elif shape == 4:
+            # Threads
+            parts = []
+            for n in range(1, rng.randint(2, 12)):
+                parts += [f"{n}/"] + [rng.choice(WORDS) for _ in range(rng.randint(3, 30))] + ["\n\n"]
+        elif shape == 5:
+            # Tiny edge cases
+            parts = [rng.choice(["", " ", "?", "a", "A", "🚀", "#", "@", "\n", "AI", "ai?", "1/"])
+                     for _ in range(rng.randint(0, 3))]
+        else:
+            # Anything goes
+            parts = [rng.choice(rng.choice(pools)) for _ in range(rng.randint(1, 120))]
+
+        content = rng.choice([" ", " ", " ", "", "\n"]).join(parts)
+        case = rng.random()
+        if case < 0.1:
+            content = content.upper()
+        elif case < 0.15:
+            content = content.title()
+        media_type = rng.choice(["none", "none", "image", "video", "gif"])
+        yield {
+            "content": content[:4000],
+            "has_media": media_type != "none" or rng.random() < 0.1,
+            "media_type": media_type,
+            "video_duration_ms": rng.choice([0, 0, 5000, 30000, 120000, 600000]) if media_type == "video" else 0,
+        }
+
+
+def api_drafts(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Corpus drafts the analysis endpoints accept (empty content is dropped)"""
+    return [draft for draft in build_corpus(count, seed) if draft["content"]]
+
+
+def reference_engine() -> ViralityScorer:
+    """The scorer the recordings come from, independent of TRENDING_TOPICS_FILE / IMPROVEMENT_TIPS_FILE"""
+    return ViralityScorer(
+        trending=TrendingTopics(TRENDING_TOPICS),
+        tips=TipRuleTable.from_dicts(DEFAULT_TIP_RULES, **_TIP_OPERANDS),
+    )
+
+
+def _plain(value: Any) -> Any:
+    """JSON-shaped copy of an engine output (dataclasses to dicts, tuples to lists)"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _plain(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _signal_score(signals: Any, name: str) -> float:
+    value = signals[name]
+    return value["score"] if isinstance(value, dict) else value
+
+
+def run_engine(engine: Any, draft: Dict[str, Any]) -> Dict[str, Any]:
+    """Recorded outputs of one draft; each stage is fed the engine's own earlier outputs"""
+    features = engine.extract_features(
+        draft["content"], draft["has_media"], draft["media_type"], draft["video_duration_ms"]
+    )
+    signals = engine.calculate_signal_scores(features)
+    score, breakdown = engine.calculate_final_score(signals)
+    return {
+        "features": {name: getattr(features, name) for name in FEATURE_FIELDS},
+        "signals": [_signal_score(signals, name) for name in SIGNAL_NAMES],
+        "final_score": [score, _plain(breakdown)],
+        "improvements": _plain(engine.generate_improvements(features, signals)),
+        "diversity": _plain(engine.calculate_diversity_score(features)),
+    }
+
+
+def record(path: str = GOLDEN_PATH, engine: Optional[Any] = None) -> int:
+    engine = engine or reference_engine()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    count = 0
+    # mtime=0 keeps the file byte-identical across re-recordings of the same outputs
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        header = {"format": FORMAT_VERSION, "features": FEATURE_FIELDS, "signals": SIGNAL_NAMES}
+        f.write((json.dumps(header) + "\n").encode("utf-8"))
+        for draft in build_corpus():
+            line = {"input": draft, **run_engine(engine, draft)}
+            f.write((json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+            count += 1
+    return count
+
+
+def load(path: str = GOLDEN_PATH) -> List[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported golden format {header.get('format')!r}")
+        if list(header["features"]) != list(FEATURE_FIELDS) or list(header["signals"]) != list(SIGNAL_NAMES):
+            raise ValueError(f"{path}: recorded feature/signal layout differs from the scorer; re-record")
+        return [json.loads(line) for line in f]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def differences(expected: Any, actual: Any, path: str, rel_tol: float = 0.0) -> Iterator[str]:
+    """Paths where actual differs from expected (numbers compare by value, bools and strings exactly)"""
+    if _is_number(expected) and _is_number(actual):
+        if expected != actual and not math.isclose(expected, actual, rel_tol=rel_tol, abs_tol=rel_tol):
+            yield f"{path}: expected {expected!r}, got {actual!r}"
+    elif isinstance(expected, dict) and isinstance(actual, dict):
+        if expected.keys() != actual.keys():
+            yield f"{path}: expected keys {sorted(expected)}, got {sorted(actual)}"
+            return
+        for key in expected:
+            yield from differences(expected[key], actual[key], f"{path}.{key}", rel_tol)
+    elif isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            yield f"{path}: expected {len(expected)} items, got {len(actual)}"
+            return
+        for i, (want, got) in enumerate(zip(expected, actual)):
+            yield from differences(want, got, f"{path}[{i}]", rel_tol)
+    elif type(expected) is not type(actual) or expected != actual:
+        yield f"{path}: expected {expected!r}, got {actual!r}"
+
+
+def check(engine: Any, path: str = GOLDEN_PATH, rel_tol: float = 0.0,
+          outputs=OUTPUTS, limit: int = 20) -> List[str]:
+    """Mismatches of engine against the recordings (at most limit of them; [] when equivalent)"""
+    mismatches: List[str] = []
+    for i, recorded in enumerate(load(path)):
+        actual = run_engine(engine, recorded["input"])
+        for output in outputs:
+            for difference in differences(recorded[output], actual[output], f"#{i} {output}", rel_tol):
+                mismatches.append(difference)
+                if len(mismatches) >= limit:
+                    return mismatches
+    return mismatches
+
+
+def load_engine(spec: Optional[str]) -> Any:
+    """'module:attribute' to an engine; classes and factories are called without arguments"""
+    if not spec:
+        return reference_engine()
+    module_name, _, attribute = spec.partition(":")
+    engine = getattr(importlib.import_module(module_name), attribute or "scorer")
+    if isinstance(engine, type) or not hasattr(engine, "extract_features"):
+        engine = engine()
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["check", "record"])
+    parser.add_argument("--engine", help="module:attribute of the engine (default: reference scorer)")
+    parser.add_argument("--path", default=GOLDEN_PATH)
+    parser.add_argument("--outputs", nargs="+", choices=OUTPUTS, default=list(OUTPUTS))
+    parser.add_argument("--rel-tol", type=float, default=0.0, help="allowed relative float difference")
+    parser.add_argument("--limit", type=int, default=20, help="mismatches to report before stopping")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engine = load_engine(args.engine)
+    if args.command == "record":
+        count = record(args.path, engine)
+        print(f"recorded {count} drafts to {args.path} in {time.perf_counter() - started:.1f}s")
+        return
+
+    mismatches = check(engine, args.path, args.rel_tol, args.outputs, args.limit)
+    elapsed = time.perf_counter() - started
+    if mismatches:
+        print(f"engine differs from the golden outputs ({elapsed:.1f}s):", file=sys.stderr)
+        for line in mismatches:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+    print(f"engine matches the golden outputs ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
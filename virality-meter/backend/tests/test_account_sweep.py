@@ -0,0 +1,100 @@
+"""
+Tests for the account what-if sweep (AccountGrid and /api/account/simulate/sweep).
+"""
+
+import itertools
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from models.schemas import AccountSimulationRequest
+from models.tiers import get_tier_for_score
+from services.account import MAX_SWEEP_POINTS, AccountGrid, account_scorer
+
+ACCOUNT = {"followers_count": 1200, "following_count": 300, "avg_likes": 20, "avg_replies": 3}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+def _sweep(client, body):
+    response = client.post("/api/account/simulate/sweep", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    header, *chunks = (json.loads(line) for line in response.text.splitlines())
+    return header, chunks
+
+
+def test_sweep_matches_account_scorer_point_by_point(client):
+    header, chunks = _sweep(client, {
+        "account": ACCOUNT,
+        "axes": [
+            {"field": "followers_count", "start": 0, "stop": 10000, "steps": 4},
+            {"field": "posts_per_week", "values": [0, 3.5, 14, 70]},
+            {"field": "is_verified", "values": [0, 1]},
+        ],
+        "chunk_size": 7,
+    })
+
+    assert header["fields"] == ["followers_count", "posts_per_week", "is_verified"]
+    assert header["shape"] == [4, 4, 2] and header["points"] == 32
+    assert header["axes"]["followers_count"] == [0, 3333, 6667, 10000]  # Whole-number field, rounded
+    assert [chunk["start"] for chunk in chunks] == [0, 7, 14, 21, 28]
+
+    overall = [score for chunk in chunks for score in chunk["overall_score"]]
+    levels = [level for chunk in chunks for level in chunk["tier_level"]]
+    viral = [p for chunk in chunks for p in chunk["viral_post_probability"]]
+    points = itertools.product(*(header["axes"][name] for name in header["fields"]))  # Last axis fastest
+    for i, values in enumerate(points):
+        account = AccountSimulationRequest(**{**ACCOUNT, **dict(zip(header["fields"], values))})
+        expected = account_scorer.score_accounts([account])
+        assert overall[i] == int(expected.overall_score[0])
+        assert levels[i] == get_tier_for_score(overall[i]).level
+        assert viral[i] == round(float(expected.viral_probability[0]), 3)
+
+        single = client.post("/api/account/simulate", json=account.model_dump()).json()
+        assert single["account_tier"] == levels[i]
+
+
+def test_sweep_without_axes_scores_the_base_account(client):
+    header, chunks = _sweep(client, {"account": ACCOUNT, "axes": []})
+    expected = account_scorer.score_accounts([AccountSimulationRequest(**ACCOUNT)])
+    assert header["points"] == 1
+    assert chunks == [{
+        "start": 0,
+        "overall_score": [int(expected.overall_score[0])],
+        "tier_level": [get_tier_for_score(int(expected.overall_score[0])).level],
+        "viral_post_probability": [round(float(expected.viral_probability[0]), 3)],
+    }]
+
+
+def test_grid_size_limit():
+    values = list(range(1000))
+    assert AccountGrid(AccountSimulationRequest(**ACCOUNT), [
+        ("avg_likes", values), ("avg_replies", values),
+    ]).size == MAX_SWEEP_POINTS
+    with pytest.raises(ValueError, match="limit is 1000000"):
+        AccountGrid(AccountSimulationRequest(**ACCOUNT), [
+            ("avg_likes", values), ("avg_replies", values), ("is_verified", [0, 1]),
+        ])
+
+
+@pytest.mark.parametrize("axes,status", [
+    # 2M points, past MAX_SWEEP_POINTS
+    ([{"field": "avg_likes", "start": 0, "stop": 100, "steps": 1000},
+      {"field": "avg_replies", "start": 0, "stop": 100, "steps": 1000},
+      {"field": "is_verified", "values": [0, 1]}], 400),
+    ([{"field": "avg_likes", "values": [1]}, {"field": "avg_likes", "values": [2]}], 400),
+    ([{"field": "avg_likes", "start": 0, "stop": 10}], 400),
+    ([{"field": "account_age_days", "values": [0, 30]}], 400),
+    ([{"field": "is_verified", "values": [0.5]}], 400),
+    ([{"field": "niche", "values": [1]}], 422),
+    ([{"field": "avg_likes", "values": [1]}] * 9, 422),
+])
+def test_invalid_sweeps_are_rejected(client, axes, status):
+    response = client.post("/api/account/simulate/sweep", json={"account": ACCOUNT, "axes": axes})
+    assert response.status_code == status
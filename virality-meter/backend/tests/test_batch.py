@@ -0,0 +1,63 @@
+"""
+The batch scorer must score every draft exactly like the scalar scorer.
+"""
+
+from fastapi.testclient import TestClient
+
+import golden
+import main
+from services.batch import batch_scorer
+from services.scorer import scorer
+
+
+def _items(count: int, seed: int):
+    return [
+        (draft["content"], draft["has_media"], draft["media_type"], draft["video_duration_ms"])
+        for draft in golden.build_corpus(count, seed)
+    ]
+
+
+def test_batch_scores_equal_scalar_scores():
+    items = [("a", True, "video", 0)] + _items(300, seed=2)
+    result = batch_scorer.score(items)
+
+    assert result.signal_scores.shape == (len(items), len(result.signal_weights))
+    for i, (content, has_media, media_type, video_duration_ms) in enumerate(items):
+        features = scorer.extract_features(content, has_media, media_type, video_duration_ms)
+        signals = scorer.calculate_signal_scores(features)
+        final_score, breakdown = scorer.calculate_final_score(signals)
+
+        assert result.features[i] == features
+        assert result.signal_scores[i].tolist() == list(signals.scores)
+        assert int(result.final_scores[i]) == final_score
+        for name, value in breakdown.items():
+            assert float(result.breakdown[name][i]) == value, name
+        assert result.diversity_scores[i] == features.diversity_score
+
+
+def test_batch_endpoint_matches_analyze():
+    client = TestClient(main.app)
+    body = {"items": golden.api_drafts(20, seed=3)}
+    response = client.post("/api/analyze/batch", json=body)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == len(body["items"])
+
+    for item, result in zip(body["items"], results):
+        single = client.post("/api/analyze", json=item).json()
+        assert result["score"] == single["score"]
+        assert result["tier_level"] == single["tier_level"]
+        assert result["engagement_potential"] == single["engagement_potential"]
+        assert result["diversity_score"] == single["content_stats"]["diversity_score"]
+
+
+def test_score_features_leaves_the_records_passed_in_untouched():
+    items = _items(40, seed=4)
+    records = [scorer._extract_preliminary_features(*item) for item in items]
+    full = [scorer.extract_features(*item) for item in items]
+    result = batch_scorer.score_features(records + full)
+
+    assert all(record.diversity_score == 0.0 and record.diversity is None for record in records)
+    for i, expected in enumerate(full + full):
+        assert result.features[i] == expected
+        assert scorer.calculate_diversity_score(result.features[i]) == scorer.calculate_diversity_score(expected)
@@ -0,0 +1,115 @@
+"""
+Tests for the bulk scoring CLI: ordered and unordered output, and resuming
+with --start-offset.
+"""
+
+import csv
+import json
+
+import pytest
+
+import bulk_score
+import golden
+from services.batch import batch_scorer
+
+
+def _rows(count: int, seed: int = 9):
+    rows = [{"id": f"post-{i}", **draft} for i, draft in enumerate(golden.api_drafts(count * 2, seed)[:count])]
+    rows[7]["content"] = ""  # Reported as an error, keeps its offset
+    rows[11]["media_type"] = "hologram"
+    return rows
+
+
+@pytest.fixture
+def jsonl_input(tmp_path):
+    rows = _rows(120)
+    lines = [json.dumps(row, ensure_ascii=False) for row in rows]
+    lines.insert(30, "")  # Blank lines are not records
+    lines[50] = "{not json"  # Offset 49
+    path = tmp_path / "posts.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def _run(*argv) -> None:
+    assert bulk_score.main([*map(str, argv), "--quiet"]) == 0
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_ordered_output_matches_batch_scorer(jsonl_input, tmp_path):
+    output = tmp_path / "scores.ndjson"
+    _run(jsonl_input, "-o", output, "--workers", 1, "--chunk-size", 16)
+    results = _read(output)
+
+    assert [result["offset"] for result in results] == list(range(120))
+    assert "error" in results[7] and "media_type" in results[11]["error"]
+    assert results[49]["error"].startswith("invalid JSON")
+
+    rows = _rows(120)
+    scored = [(i, row) for i, row in enumerate(rows) if i not in (7, 11, 49)]
+    batch = batch_scorer.score([
+        (row["content"], row["has_media"], row["media_type"], row["video_duration_ms"]) for _, row in scored
+    ])
+    for (i, row), score in zip(scored, batch.final_scores.tolist()):
+        assert results[i]["id"] == row["id"]
+        assert results[i]["score"] == score
+
+
+def test_process_pool_output_ordered_and_unordered(jsonl_input, tmp_path):
+    single = tmp_path / "single.ndjson"
+    ordered = tmp_path / "ordered.ndjson"
+    unordered = tmp_path / "unordered.ndjson"
+    _run(jsonl_input, "-o", single, "--workers", 1, "--chunk-size", 8)
+    _run(jsonl_input, "-o", ordered, "--workers", 2, "--chunk-size", 8)
+    _run(jsonl_input, "-o", unordered, "--workers", 2, "--chunk-size", 8, "--unordered")
+
+    assert ordered.read_text(encoding="utf-8") == single.read_text(encoding="utf-8")
+    assert sorted(_read(unordered), key=lambda result: result["offset"]) == _read(single)
+
+
+def test_resume_appends_the_remaining_records(jsonl_input, tmp_path):
+    full = tmp_path / "full.ndjson"
+    resumed = tmp_path / "resumed.ndjson"
+    _run(jsonl_input, "-o", full, "--workers", 1)
+    _run(jsonl_input, "-o", resumed, "--workers", 1, "--limit", 45)
+    _run(jsonl_input, "-o", resumed, "--workers", 1, "--start-offset", 45, "--append", "--limit", 20)
+    _run(jsonl_input, "-o", resumed, "--workers", 1, "--start-offset", 65, "--append")
+
+    assert resumed.read_text(encoding="utf-8") == full.read_text(encoding="utf-8")
+
+
+def test_resume_skips_records_without_decoding_them(jsonl_input, tmp_path, monkeypatch):
+    decoded = []
+    loads = json.loads
+    monkeypatch.setattr(bulk_score.json, "loads", lambda line: decoded.append(line) or loads(line))
+    with open(jsonl_input, encoding="utf-8") as f:
+        records = list(bulk_score.read_jsonl(f, "content", "id", start_offset=100))
+
+    assert [record[0] for record in records] == list(range(100, 120))
+    assert len(decoded) == 20
+
+
+def test_csv_resume(tmp_path):
+    rows = _rows(40)
+    path = tmp_path / "posts.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        for i, row in enumerate(rows):
+            writer.writerow(row)
+            if i == 10:
+                f.write("\r\n")  # A blank row, not a record
+    full = tmp_path / "full.ndjson"
+    resumed = tmp_path / "resumed.ndjson"
+    _run(path, "-o", full, "--workers", 1)
+    _run(path, "-o", resumed, "--workers", 1, "--limit", 25)
+    _run(path, "-o", resumed, "--workers", 1, "--start-offset", 25, "--append")
+
+    results = _read(full)
+    assert [result["offset"] for result in results] == list(range(40))
+    assert [result["id"] for result in results] == [row["id"] for row in rows]
+    assert resumed.read_text(encoding="utf-8") == full.read_text(encoding="utf-8")
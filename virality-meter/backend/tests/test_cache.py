@@ -0,0 +1,160 @@
+"""
+Tests for the analysis cache: LRU eviction by entries and bytes, TTL expiry,
+its counters and its use by /api/analyze.
+"""
+
+import sys
+
+from fastapi.testclient import TestClient
+
+import main
+from services import cache as cache_module
+from services.cache import ENTRY_OVERHEAD_BYTES, AnalysisCache
+from services.executor import scoring_executor
+from services.scorer import scorer, trending_topics
+
+
+def _analysis(content: str):
+    features = scorer.extract_features(content)
+    return features, scorer.calculate_signal_scores(features)
+
+
+def _key(content: str) -> str:
+    return AnalysisCache.make_key(content, False, "none", 0)
+
+
+def test_key_covers_every_extraction_input():
+    keys = {
+        AnalysisCache.make_key("post", False, "none", 0),
+        AnalysisCache.make_key("post ", False, "none", 0),
+        AnalysisCache.make_key("post", True, "none", 0),
+        AnalysisCache.make_key("post", True, "video", 0),
+        AnalysisCache.make_key("post", True, "video", 30000),
+    }
+    assert len(keys) == 5
+
+
+def test_evicts_least_recently_used_entry():
+    cache = AnalysisCache(max_entries=2)
+    for content in ("a", "b"):
+        cache.put(_key(content), _analysis(content))
+    assert cache.get(_key("a")) is not None  # "b" is now least recently used
+
+    cache.put(_key("c"), _analysis("c"))
+
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) is not None and cache.get(_key("c")) is not None
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+    assert stats["hit_rate"] == 0.75
+
+
+def test_evicts_to_stay_within_byte_budget():
+    entry_size = sys.getsizeof("x" * 100) + ENTRY_OVERHEAD_BYTES
+    cache = AnalysisCache(max_entries=100, max_bytes=entry_size * 2)
+    for i in range(3):
+        content = f"{i}" * 100
+        cache.put(_key(content), _analysis(content))
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["approx_bytes"] == entry_size * 2
+    assert cache.get(_key("0" * 100)) is None
+
+    # An entry larger than the whole budget is not stored and evicts nothing
+    cache.put(_key("y" * 10000), _analysis("y" * 10000))
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = AnalysisCache(ttl_seconds=60)
+    cache.put(_key("a"), _analysis("a"))
+
+    now[0] += 59
+    assert cache.get(_key("a")) is not None
+    now[0] += 2
+    assert cache.get(_key("a")) is None
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["approx_bytes"], stats["expirations"]) == (0, 0, 1)
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_repeated_analyze_is_a_hit_and_skips_extraction(monkeypatch):
+    monkeypatch.setattr(scoring_executor, "mode", "inline")
+    extracted = []
+    extract_features = scorer.extract_features
+
+    def counting_extract_features(*args, **kwargs):
+        extracted.append(kwargs.get("content"))
+        return extract_features(*args, **kwargs)
+
+    monkeypatch.setattr(scorer, "extract_features", counting_extract_features)
+    client = TestClient(main.app)
+    body = {"content": "A draft only this cache test sends. What do you think? 🧪"}
+    before = client.get("/api/cache/stats").json()
+
+    first = client.post("/api/analyze", json=body)
+    second = client.post("/api/analyze", json=body)
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert len(extracted) == 1
+    after = client.get("/api/cache/stats").json()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+
+def test_hits_are_served_without_the_scoring_pool(monkeypatch):
+    monkeypatch.setattr(scoring_executor, "mode", "inline")
+    client = TestClient(main.app)
+    body = {"content": "Cached drafts skip the pool. What do you think?"}
+    first = client.post("/api/analyze", json=body)
+
+    # A saturated pool rejects every job, yet the hit is still answered
+    monkeypatch.setattr(scoring_executor, "mode", "thread")
+    monkeypatch.setattr(scoring_executor, "max_pending", 0)
+    monkeypatch.setattr(scoring_executor, "rejected", 0)
+    second = client.post("/api/analyze", json=body)
+    miss = client.post("/api/analyze", json={"content": "A draft the cache has not seen"})
+
+    assert second.status_code == 200 and second.content == first.content
+    assert miss.status_code == 503
+    assert scoring_executor.rejected == 1
+
+
+def test_trending_reload_invalidates_cached_analyses(monkeypatch, tmp_path):
+    monkeypatch.setattr(scoring_executor, "mode", "inline")
+    monkeypatch.setattr(trending_topics, "_index", trending_topics._index)
+    monkeypatch.setattr(trending_topics, "path", str(tmp_path / "trending.txt"))
+    extracted = []
+    extract_features = scorer.extract_features
+
+    def counting_extract_features(*args, **kwargs):
+        extracted.append(kwargs.get("content"))
+        return extract_features(*args, **kwargs)
+
+    monkeypatch.setattr(scorer, "extract_features", counting_extract_features)
+    client = TestClient(main.app)
+    body = {"content": "Zebra crossings and okapi sightings, a cache test only"}
+
+    try:
+        (tmp_path / "trending.txt").write_text("unrelated\n", encoding="utf-8")
+        assert trending_topics.reload()
+        before = client.post("/api/analyze", json=body).json()
+        assert client.post("/api/analyze", json=body).json() == before
+        assert len(extracted) == 1
+
+        # Same draft after the term list changes: re-scored, then cached again
+        (tmp_path / "trending.txt").write_text("zebra\nokapi\n", encoding="utf-8")
+        assert trending_topics.reload()
+        after = client.post("/api/analyze", json=body).json()
+        assert len(extracted) == 2
+        assert after["signal_scores"] != before["signal_scores"]
+        assert client.post("/api/analyze", json=body).json() == after
+        assert len(extracted) == 2
+    finally:
+        trending_topics.stop()
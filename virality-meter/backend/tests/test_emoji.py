@@ -0,0 +1,41 @@
+"""
+Emoji counting over the full emoji range, one count per emoji as displayed.
+"""
+
+import pytest
+
+from services.emoji import count_emoji
+from services.scorer import TextStats
+
+
+@pytest.mark.parametrize("text,count", [
+    ("Launch day 🚀🔥", 2),
+    ("👍\U0001F3FD", 1),  # Skin tone
+    ("\U0001F1FA\U0001F1F8\U0001F1EC\U0001F1E7", 2),  # Two flags
+    ("\U0001F469‍\U0001F467", 1),  # ZWJ family
+    ("\U0001F468‍\U0001F469‍\U0001F467‍\U0001F466", 1),
+    ("\U0001F3F4\U000E0067\U000E0062\U000E0073\U000E0063\U000E0074\U000E007F", 1),  # Subdivision flag
+    ("❤️ ☀ ✅", 3),  # Misc Symbols and Dingbats
+    ("#️⃣ 1️⃣", 2),  # Keycaps
+    ("\U0001FAE0", 1),  # Symbols & Pictographs Extended-A
+    ("©️", 1),
+    ("© 2024, #tag, 50*2", 0),  # Text-style symbols and plain # and * are not emoji
+])
+def test_count_emoji(text, count):
+    assert count_emoji(text) == count
+
+
+def test_text_stats_counts():
+    stats = TextStats.of("HELLO wörld 🚀\n#Tag @you \U0001F469‍\U0001F467")
+    assert stats.alpha_count == 15  # ASCII letters only
+    assert stats.upper_count == 6
+    assert stats.emoji_count == 2
+    assert stats.hashtag_count == 1 and stats.mention_count == 1
+
+
+def test_text_stats_are_additive_over_whitespace_chunks():
+    text = "Big news \U0001F469‍\U0001F467 today!! \U0001F1FA\U0001F1F8 #Launch"
+    whole = TextStats.of(text)
+    chunks = [TextStats.of(chunk) for chunk in text.split(" ")]
+    assert whole.emoji_count == sum(chunk.emoji_count for chunk in chunks)
+    assert whole.alpha_count == sum(chunk.alpha_count for chunk in chunks)
@@ -0,0 +1,88 @@
+"""
+Tests for the scoring executor: mode selection and 503 backpressure.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.executor import ExecutorSaturated, ScoringExecutor, scoring_executor
+
+
+def test_inline_is_the_default_mode():
+    assert ScoringExecutor().mode == "inline"
+    with pytest.raises(ValueError):
+        ScoringExecutor(mode="fibers")
+
+
+def test_rejects_jobs_beyond_max_pending():
+    executor = ScoringExecutor(mode="thread", max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(abs, -1)
+        assert executor.stats()["pending"] == 2
+
+        release.set()
+        await asyncio.gather(*running)
+        return await executor.run(abs, -1)
+
+    try:
+        assert asyncio.run(scenario()) == 1
+    finally:
+        executor.shutdown()
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["pending"] == 0
+
+
+def test_cancelled_requests_keep_their_slot_until_the_job_ends():
+    executor = ScoringExecutor(mode="thread", max_workers=1, max_pending=2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def job():
+        started.set()
+        release.wait()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(job))
+        queued = asyncio.ensure_future(executor.run(job))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+
+        # The queued job never starts, but the running one cannot be stopped
+        assert executor.stats()["pending"] == 1
+        release.set()
+        while executor.stats()["pending"]:
+            await asyncio.sleep(0.001)
+        return await executor.run(abs, -1)
+
+    try:
+        assert asyncio.run(scenario()) == 1
+    finally:
+        release.set()
+        executor.shutdown()
+    assert executor.stats()["pending"] == 0
+
+
+def test_saturated_executor_answers_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(scoring_executor, "mode", "thread")
+    monkeypatch.setattr(scoring_executor, "max_pending", 0)
+    monkeypatch.setattr(scoring_executor, "rejected", 0)
+    client = TestClient(main.app)
+
+    response = client.post("/api/analyze", json={"content": "Is anyone there?"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert "retry" in response.json()["detail"]
+    assert client.get("/api/executor/stats").json()["rejected"] == 1
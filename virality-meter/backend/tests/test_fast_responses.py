@@ -0,0 +1,72 @@
+"""
+Contract test for the fast response mode (FAST_RESPONSES).
+
+Every analysis endpoint must return byte-for-byte the same body and content
+type whether the payload is validated against its response_model by FastAPI
+or encoded directly, with or without stage timing (which validates and
+encodes inside the handler).
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import golden
+import main
+from routers import analyze
+
+
+def _accounts(count: int, seed: int = 41):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield {
+            "followers_count": rng.choice([0, 1, rng.randint(0, 10**7)]),
+            "following_count": rng.choice([0, rng.randint(0, 10**5)]),
+            "avg_likes": rng.uniform(0, 5000),
+            "avg_replies": rng.uniform(0, 500),
+            "avg_retweets": rng.uniform(0, 500),
+            "posts_per_week": rng.choice([0, 7, 35, 70, rng.uniform(0, 150)]),
+            "account_age_days": rng.randint(1, 4000),
+            "is_verified": rng.random() < 0.5,
+            "niche": rng.choice([None, "default", "unknown-niche"]),
+        }
+
+
+CASES = (
+    [("/api/analyze", draft) for draft in golden.api_drafts(40, seed=14)]
+    + [("/api/account/simulate", account) for account in _accounts(40)]
+    + [
+        ("/api/analyze/combined", {**draft, **account, "content_type": content_type})
+        for draft, account, content_type in zip(
+            golden.api_drafts(40, seed=7), _accounts(40, seed=8),
+            ["short", "thread", "article", "longform", "quote"] * 8,
+        )
+    ]
+    + [("/api/analyze/batch", {"items": golden.api_drafts(100, seed=2)})]
+    + [("/api/account/simulate/batch", {"items": list(_accounts(300, seed=9))})]
+    + [
+        ("/api/analyze/thread", {**draft, "content": separator.join(f"{n}/ {draft['content'][:500]}" for n in range(1, 8))})
+        for draft, separator in zip(golden.api_drafts(10, seed=18), ["\n", "\n\n", " "] * 4)
+    ]
+    + [("/api/analyze/variants", draft) for draft in golden.api_drafts(20, seed=19)]
+)
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("timing", [False, True])
+@pytest.mark.parametrize("path,body", CASES)
+def test_fast_response_is_byte_identical(client, monkeypatch, path, body, timing):
+    monkeypatch.setattr(analyze, "FAST_RESPONSES", False)
+    validated = client.post(path, json=body)
+    monkeypatch.setattr(analyze, "TIMING_ENABLED", timing)
+    monkeypatch.setattr(analyze, "FAST_RESPONSES", True)
+    fast = client.post(path, json=body)
+
+    assert validated.status_code == fast.status_code == 200
+    assert fast.headers["content-type"] == validated.headers["content-type"]
+    assert fast.content == validated.content
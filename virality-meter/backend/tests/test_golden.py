@@ -0,0 +1,46 @@
+"""
+The scorer must reproduce the golden outputs in tests/golden exactly.
+
+A failure here means scores changed. If the change is intended, re-record
+with `python tests/golden.py record` and commit the new recordings.
+"""
+
+import os
+
+import pytest
+
+import golden
+from services.scorer import ViralityScorer, scorer
+
+
+@pytest.fixture(scope="module")
+def recordings():
+    return golden.load()
+
+
+def test_corpus_generator_matches_recorded_inputs(recordings):
+    assert [item["input"] for item in recordings] == list(golden.build_corpus())
+
+
+def test_reference_scorer_matches_golden_outputs():
+    assert golden.check(golden.reference_engine()) == []
+
+
+@pytest.mark.skipif(
+    bool(os.environ.get("TRENDING_TOPICS_FILE") or os.environ.get("IMPROVEMENT_TIPS_FILE")),
+    reason="configured trending topics or tip rules differ from the recorded built-ins",
+)
+def test_service_scorer_matches_golden_outputs():
+    assert golden.check(scorer) == []
+
+
+def test_differences_are_reported():
+    class Drifting(ViralityScorer):
+        def calculate_final_score(self, signals):
+            score, breakdown = super().calculate_final_score(signals)
+            return score, {**breakdown, "shareability": breakdown["shareability"] * (1 + 1e-9)}
+
+    engine = Drifting(trending=golden.reference_engine().trending, tips=golden.reference_engine().tips)
+    mismatches = golden.check(engine, limit=1)
+    assert len(mismatches) == 1 and "final_score[1].shareability" in mismatches[0]
+    assert golden.check(engine, rel_tol=1e-6, limit=1) == []
@@ -0,0 +1,113 @@
+"""
+Tests for the improvement tip rule table and IMPROVEMENT_TIPS_FILE loading.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.executor import scoring_executor
+from services.improvements import DEFAULT_TIP_RULES, MAX_TIPS, Tip, TipRuleTable
+from services.scorer import _TIP_OPERANDS, ViralityScorer, scorer
+
+
+def _rule(name, when, priority="medium", **tip):
+    return {"name": name, "when": when,
+            "tip": {"signal": "reply", "tip": f"Tip {name}", "impact": "+1%", "priority": priority,
+                    "emoji": "✅", **tip}}
+
+
+def _write(tmp_path, data):
+    path = tmp_path / "tips.json"
+    path.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def test_rules_are_ordered_by_priority_and_capped():
+    always = [["char_count", ">=", 0]]
+    table = TipRuleTable.from_dicts([
+        _rule("low_1", always, "low"),
+        _rule("medium_1", always, "medium"),
+        _rule("high_1", always, "high"),
+        _rule("never", [["char_count", "<", 0]], "high"),
+        _rule("medium_2", always, "medium"),
+        _rule("high_2", always, "high"),
+        _rule("low_2", always, "low"),
+        _rule("high_3", always, "high"),
+    ], **_TIP_OPERANDS)
+    features = scorer.extract_features("Anything")
+    signals = scorer.calculate_signal_scores(features)
+
+    tips = table.select(features, signals)
+    assert len(tips) == MAX_TIPS
+    assert [tip.tip for tip in tips] == [
+        "Tip high_1", "Tip high_2", "Tip high_3", "Tip medium_1", "Tip medium_2", "Tip low_1",
+    ]
+    assert table.select(features, signals, limit=0) == []
+
+
+def test_conditions_on_features_and_signals():
+    table = TipRuleTable.from_dicts([
+        _rule("question", [["has_question", "==", True], ["signals.reply", ">", 0.0]]),
+        _rule("short", [["char_count", "<", 10]]),
+    ], **_TIP_OPERANDS)
+    for content, expected in [("Why?", ["question", "short"]), ("Why though, really?", ["question"]),
+                              ("Short", ["short"]), ("A longer statement.", [])]:
+        features = scorer.extract_features(content)
+        tips = table.select(features, scorer.calculate_signal_scores(features))
+        assert [tip.tip for tip in tips] == [f"Tip {name}" for name in expected]
+
+
+def test_valid_file_replaces_the_default_tips(tmp_path, monkeypatch):
+    path = _write(tmp_path, [
+        _rule("add_question", [["has_question", "==", False]], "high", tip="Ask your readers something"),
+        _rule("always", [], "low", action="Do it", example="→ Like this"),
+    ])
+    table = TipRuleTable.load_file(path, **_TIP_OPERANDS)
+    assert len(table) == 2
+    features = scorer.extract_features("No question here")
+    assert ViralityScorer(tips=table).generate_improvements(
+        features, scorer.calculate_signal_scores(features)
+    ) == [
+        Tip(signal="reply", tip="Ask your readers something", impact="+1%", priority="high", emoji="✅"),
+        Tip(signal="reply", tip="Tip always", impact="+1%", priority="low", emoji="✅",
+            action="Do it", example="→ Like this"),
+    ]
+
+    # The API serves the configured table
+    monkeypatch.setattr(scoring_executor, "mode", "inline")
+    monkeypatch.setattr(scorer, "tips", table)
+    response = TestClient(main.app).post("/api/analyze", json={"content": "No question here, tips test"})
+    assert [tip["tip"] for tip in response.json()["improvements"]] == [
+        "Ask your readers something", "Tip always",
+    ]
+
+
+def test_default_rules_compile():
+    assert len(TipRuleTable.from_dicts(DEFAULT_TIP_RULES, **_TIP_OPERANDS)) == len(DEFAULT_TIP_RULES)
+
+
+@pytest.mark.parametrize("data,message", [
+    ("[{\"name\": ", "invalid JSON"),
+    ({"name": "not a list"}, "expected a list of tip rules"),
+    (["add_question"], "Tip rule 0: expected an object"),
+    ([_rule("bad_feature", [["follower_count", ">", 1]])], "'bad_feature': unknown feature 'follower_count'"),
+    ([_rule("bad_signal", [["signals.likes", ">", 0.5]])], "'bad_signal': unknown signal 'likes'"),
+    ([_rule("bad_operator", [["char_count", "=>", 1]])], "'bad_operator': unknown operator '=>'"),
+    ([_rule("short_condition", [["char_count", ">"]])], "is not [operand, operator, value]"),
+    ([_rule("string_condition", ["abc"])], "is not [operand, operator, value]"),
+    ([_rule("when_object", {"char_count": 1})], "'when' must be a list"),
+    ([{"name": "no_tip", "when": []}], "'no_tip': missing 'tip' object"),
+    ([_rule("bad_priority", [], "urgent")], "priority must be one of"),
+    ([_rule("extra_field", [], colour="red")], "unknown tip fields ['colour']"),
+    ([{"name": "missing_fields", "when": [], "tip": {"tip": "Hi", "priority": "high"}}],
+     "missing 3 required"),
+])
+def test_malformed_files_fail_with_a_clear_error(tmp_path, data, message):
+    path = _write(tmp_path, data)
+    with pytest.raises(ValueError) as error:
+        TipRuleTable.load_file(path, **_TIP_OPERANDS)
+    assert str(error.value).startswith(f"{path}: ")
+    assert message in str(error.value)
@@ -0,0 +1,173 @@
+"""
+Incremental re-analysis must give the same features as a full pass.
+
+Random edits are applied to live sessions and the resulting features are
+compared with extract_features of the edited text, including multi-word
+trending terms and a trending reload in the middle of a session.
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import golden
+import main
+from services.incremental import IncrementalAnalyzer, InvalidEdit, SessionNotFound
+from services.scorer import ViralityScorer
+from services.trending import TrendingTopics
+
+TERMS = ["ai", "bitcoin", "federal reserve", "just announced", "new york city", "new york"]
+RELOADED_TERMS = ["grok", "federal reserve bank", "york city", "hot take"]
+
+
+def _aligned(text: str) -> bool:
+    return text.lower() == "".join(ch.lower() for ch in text)
+
+
+# Pieces and casings of the terms above, mixed with golden's pools in edits
+TERM_FRAGMENTS = [
+    "AI", "ai-powered", "bitcoin", "federal", "reserve", "Federal Reserve bank", "just", "announced",
+    "New York City", "york", "new",
+]
+# Lowercasing all of these is 1:1 per character, so edits take the incremental path
+FRAGMENTS = [fragment for fragment in golden.WORDS + golden.EMOJI + golden.NOISE if _aligned(fragment)]
+# Lowercasing these is not 1:1 per character, which forces a full recount
+UNALIGNED = ["ΣΑΣ", "İstanbul"]
+
+
+@pytest.fixture
+def trending(tmp_path):
+    path = tmp_path / "trending.txt"
+    path.write_text("\n".join(["# test terms"] + TERMS), encoding="utf-8")
+    topics = TrendingTopics([], path=str(path), refresh_seconds=3600)
+    yield topics
+    topics.stop()
+
+
+def _fragment(rng: random.Random) -> str:
+    if rng.random() < 0.005:
+        return rng.choice(UNALIGNED)
+    return rng.choice(TERM_FRAGMENTS if rng.random() < 0.5 else FRAGMENTS)
+
+
+def _text(rng: random.Random, max_fragments: int) -> str:
+    return "".join(
+        _fragment(rng) + rng.choice(["", " ", " ", "\n"]) for _ in range(rng.randint(1, max_fragments))
+    )
+
+
+def _edit(rng: random.Random, content: str):
+    """A random edit; a third of them at the start or end of the text"""
+    where = rng.random()
+    if where < 0.15:
+        start = 0
+    elif where < 0.3:
+        start = max(0, len(content) - rng.choice([0, 0, 1, 3]))
+    else:
+        start = rng.randint(0, len(content))
+    end = min(len(content), start + rng.choice([0, 0, 1, 2, rng.randint(0, 30)]))
+    text = _text(rng, 3) if rng.random() < 0.7 else ""
+    if rng.random() < 0.3:
+        text = text[rng.randint(0, len(text)):]  # Partial words and emoji sequences
+    if len(content) - (end - start) + len(text) > 4000:
+        text = ""
+    if len(content) - (end - start) + len(text) == 0:
+        text = "x"
+    return start, end, text
+
+
+def test_random_edits_match_full_extraction(trending):
+    scorer = ViralityScorer(trending=trending)
+    analyzer = IncrementalAnalyzer(scorer)
+    rng = random.Random(5)
+    drafts = [draft for draft in golden.api_drafts(80, seed=5) if _aligned(draft["content"])]
+
+    for session_number, draft in enumerate(drafts[:40]):
+        content = draft["content"]
+        media = (draft["has_media"], draft["media_type"], draft["video_duration_ms"])
+        analysis_id, features = analyzer.start(content, *media)
+        assert features == scorer.extract_features(content, *media)
+
+        for _ in range(25):
+            edits = []
+            for _ in range(rng.choice([1, 1, 1, 2, 3])):
+                start, end, text = _edit(rng, content)
+                edits.append((start, end, text))
+                content = content[:start] + text + content[end:]
+            analysis_id, features = analyzer.apply(analysis_id, edits)
+            assert features == scorer.extract_features(content, *media), (session_number, edits)
+
+
+def test_trending_reload_during_a_session(trending):
+    scorer = ViralityScorer(trending=trending)
+    analyzer = IncrementalAnalyzer(scorer)
+    content = "Grok says the Federal Reserve bank in New York City is a hot take"
+    analysis_id, features = analyzer.start(content, False, "none", 0)
+    assert features.trending_alignment == scorer.extract_features(content).trending_alignment
+
+    with open(trending.path, "w", encoding="utf-8") as f:
+        f.write("\n".join(RELOADED_TERMS))
+    assert trending.reload()
+
+    edits = [(0, 4, "GROK"), (len(content), len(content), " ai")]
+    content = "GROK" + content[4:] + " ai"
+    analysis_id, features = analyzer.apply(analysis_id, edits)
+    assert features == scorer.extract_features(content)
+    assert scorer.trending.index.count(content.lower()) == 4
+
+    # Forked sessions pick up the reloaded index too
+    session = analyzer.session("the federal reserve", False, "none", 0)
+    with open(trending.path, "w", encoding="utf-8") as f:
+        f.write("federal reserve")
+    assert trending.reload()
+    fork = analyzer.fork(session, [(19, 19, " bank")])
+    assert fork.features == scorer.extract_features("the federal reserve bank")
+
+
+def test_analysis_ids_are_single_use():
+    analyzer = IncrementalAnalyzer(ViralityScorer())
+    analysis_id, _ = analyzer.start("First draft", False, "none", 0)
+    new_id, _ = analyzer.apply(analysis_id, [(0, 5, "Second")])
+
+    assert new_id != analysis_id
+    with pytest.raises(SessionNotFound):
+        analyzer.apply(analysis_id, [])
+    analyzer.apply(new_id, [])
+
+
+@pytest.mark.parametrize("edit", [(-1, 0, "x"), (3, 2, "x"), (0, 99, "x"), (0, 11, ""), (0, 0, "x" * 4000)])
+def test_invalid_edits_are_rejected(edit):
+    analyzer = IncrementalAnalyzer(ViralityScorer())
+    analysis_id, _ = analyzer.start("First draft", False, "none", 0)
+    with pytest.raises(InvalidEdit):
+        analyzer.apply(analysis_id, [edit])
+    # The ID is consumed even though the edit failed
+    with pytest.raises(SessionNotFound):
+        analyzer.apply(analysis_id, [])
+
+
+def test_live_endpoints():
+    client = TestClient(main.app)
+    start = client.post("/api/analyze/live", json={"content": "Hot take: AI is overrated"})
+    assert start.status_code == 200
+    analysis_id = start.json()["analysis_id"]
+
+    edit = client.post("/api/analyze/live/edit", json={
+        "analysis_id": analysis_id,
+        "edits": [{"start": 25, "end": 25, "text": ". What do you think?"}],
+    })
+    assert edit.status_code == 200
+    full = client.post("/api/analyze", json={"content": "Hot take: AI is overrated. What do you think?"})
+    assert edit.json()["score"] == full.json()["score"]
+    assert edit.json()["content_stats"]["has_question"] is True
+
+    # Reusing a consumed ID, and edits outside the draft
+    reused = client.post("/api/analyze/live/edit", json={"analysis_id": analysis_id, "edits": []})
+    assert reused.status_code == 404
+    invalid = client.post("/api/analyze/live/edit", json={
+        "analysis_id": edit.json()["analysis_id"],
+        "edits": [{"start": 40, "end": 100, "text": "x"}],
+    })
+    assert invalid.status_code == 400
+    assert "outside the draft" in invalid.json()["detail"]
@@ -0,0 +1,65 @@
+"""
+Thread splitting and the /api/analyze/thread endpoint.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.executor import score_draft
+from services.thread import MAX_THREAD_TWEETS, aggregate_thread_score, split_thread
+
+
+@pytest.mark.parametrize("content,tweets,split_by", [
+    ("1/ First\n2/ Second\n3/ Third", ["1/ First", "2/ Second", "3/ Third"], "numbered"),
+    ("1/3 First 2/3 Second 3/3 Third", ["1/3 First", "2/3 Second", "3/3 Third"], "numbered"),
+    ("A thread 🧵\n\n1/ First\n\n2/ Second", ["A thread 🧵", "1/ First", "2/ Second"], "numbered"),
+    # Markers must count up from 1; others stay inside their tweet
+    ("1/ It went 50/50 and 3/ of us\n2/ Then", ["1/ It went 50/50 and 3/ of us", "2/ Then"], "numbered"),
+    ("First\n\nSecond\n  \nThird\n\n\n", ["First", "Second", "Third"], "blank_lines"),
+    ("Only 1/ marker\nand lines", ["Only 1/ marker\nand lines"], "single"),
+])
+def test_split_thread(content, tweets, split_by):
+    thread = split_thread(content)
+    assert thread.tweets == tweets
+    assert thread.split_by == split_by
+
+
+def test_split_thread_limits():
+    with pytest.raises(ValueError):
+        split_thread(" \n\n ")
+    with pytest.raises(ValueError):
+        split_thread("\n\n".join(["tweet"] * (MAX_THREAD_TWEETS + 1)))
+
+
+def test_aggregate_thread_score():
+    assert aggregate_thread_score([50]) == 57
+    assert aggregate_thread_score([100, 100]) == 100
+    assert aggregate_thread_score([80, 20, 20]) == int((80 * 0.4 + 40 * 0.6) * 1.15)
+
+
+def test_thread_endpoint_scores_each_tweet_like_analyze():
+    client = TestClient(main.app)
+    content = "Hot take 🧵\n\n1/ Nobody talks about this. What do you think?\n2/ Bookmark this #AI\n3/ ok"
+    response = client.post("/api/analyze/thread", json={"content": content, "has_media": True, "media_type": "image"})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["tweet_count"] == 4 and body["split_by"] == "numbered"
+    for i, tweet in enumerate(body["tweets"]):
+        media = ("image", True) if i == 0 else ("none", False)
+        expected = score_draft(tweet["content"], media[1], media[0], 0)
+        assert tweet["index"] == i
+        assert tweet["score"] == expected.final_score
+        assert tweet["signals"]["reply"] == round(expected.signals["reply"], 3)
+
+    scores = [tweet["score"] for tweet in body["tweets"]]
+    assert body["hook_score"] == scores[0]
+    assert body["aggregate_score"] == aggregate_thread_score(scores)
+    assert body["tweets"][body["weakest_tweet"]]["score"] == min(scores)
+
+
+def test_thread_endpoint_rejects_oversized_threads():
+    client = TestClient(main.app)
+    response = client.post("/api/analyze/thread", json={"content": "\n\n".join(["x"] * (MAX_THREAD_TWEETS + 1))})
+    assert response.status_code == 400
@@ -0,0 +1,107 @@
+"""
+Tests for tier schemes, TIER_SCHEMES_FILE loading and /api/tiers caching.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from models.tiers import (
+    VIRALITY_TIERS,
+    TierRegistry,
+    TierScheme,
+    get_all_tiers,
+    get_tier_for_score,
+    tier_registry,
+)
+
+CRYPTO = [
+    {"level": level, "min_score": low, "max_score": high}
+    for level, (low, high) in enumerate(
+        [(0, 20), (21, 35), (36, 45), (46, 55), (56, 65), (66, 72), (73, 80), (81, 87), (88, 94), (95, 100)],
+        start=1,
+    )
+]
+
+
+def test_default_scheme_lookup():
+    assert get_tier_for_score(0).level == 1
+    assert get_tier_for_score(10).level == 1 and get_tier_for_score(11).level == 2
+    assert get_tier_for_score(100).level == 10
+    assert get_tier_for_score(-5).level == 1 and get_tier_for_score(250).level == 10
+    assert get_tier_for_score(55, scheme="no-such-niche") == get_tier_for_score(55)
+
+
+def test_all_tiers_are_copies():
+    tiers = get_all_tiers()
+    tiers[0]["name"] = "Changed"
+    tiers.pop()
+
+    assert len(get_all_tiers()) == 10
+    assert get_all_tiers()[0]["name"] == VIRALITY_TIERS[0].name
+    with pytest.raises(TypeError):
+        tier_registry.default.dicts[0]["name"] = "Changed"
+
+
+@pytest.mark.parametrize("spans,message", [
+    ([(0, 50), (52, 100)], "without gaps"),
+    ([(0, 50), (50, 100)], "without gaps or overlaps"),
+    ([(1, 50), (51, 100)], "expected a start at 0"),
+    ([(0, 50), (51, 99)], "must end at 100"),
+    ([(0, 50), (51, 40), (41, 100)], "without gaps"),
+])
+def test_schemes_must_cover_0_to_100_once(spans, message):
+    items = [{"level": i + 1, "min_score": low, "max_score": high} for i, (low, high) in enumerate(spans)]
+    with pytest.raises(ValueError, match=message):
+        TierScheme.from_dicts("broken", items, base=tier_registry.default)
+
+
+def test_load_file_inherits_fields_from_default(tmp_path):
+    path = tmp_path / "schemes.json"
+    path.write_text(json.dumps({"crypto": CRYPTO}), encoding="utf-8")
+    registry = TierRegistry(VIRALITY_TIERS)
+
+    (crypto,) = registry.load_file(str(path))
+
+    assert registry.names() == ["default", "crypto"]
+    assert crypto.tier_for(20).level == 1 and crypto.tier_for(21).level == 2
+    assert crypto.tier_for(20).name == VIRALITY_TIERS[0].name
+    assert registry.resolve("crypto") is crypto
+    assert registry.resolve("unknown") is registry.default
+
+
+def test_load_file_rejects_a_bad_scheme(tmp_path):
+    path = tmp_path / "schemes.json"
+    path.write_text(json.dumps({"crypto": CRYPTO[:-1]}), encoding="utf-8")
+    registry = TierRegistry(VIRALITY_TIERS)
+
+    with pytest.raises(ValueError, match="'crypto' must end at 100"):
+        registry.load_file(str(path))
+    assert registry.names() == ["default"]
+
+
+def test_tiers_endpoint_etag_and_304(monkeypatch, tmp_path):
+    monkeypatch.setattr(tier_registry, "_schemes", tier_registry._schemes)
+    path = tmp_path / "schemes.json"
+    path.write_text(json.dumps({"crypto": CRYPTO}), encoding="utf-8")
+    tier_registry.load_file(str(path))
+    client = TestClient(main.app)
+
+    response = client.get("/api/tiers")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+    assert response.json() == {"tiers": get_all_tiers()}
+
+    cached = client.get("/api/tiers", headers={"If-None-Match": f'"other", {etag}'})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert client.get("/api/tiers", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    crypto = client.get("/api/tiers", params={"scheme": "crypto"})
+    assert crypto.status_code == 200 and crypto.headers["etag"] != etag
+    assert crypto.json()["tiers"][0]["max_score"] == 20
+    assert client.get("/api/tiers", params={"scheme": "crypto"},
+                      headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/api/tiers", params={"scheme": "missing"}).status_code == 404
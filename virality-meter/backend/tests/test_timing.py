@@ -0,0 +1,80 @@
+"""
+Tests for the stage latency histograms and their Prometheus rendering.
+"""
+
+import random
+
+from fastapi.testclient import TestClient
+
+import main
+from routers import analyze
+from services.timing import (
+    BUCKET_COUNT,
+    MAX_VALUE,
+    LatencyHistogram,
+    StageMetrics,
+    StageTimes,
+    _bucket_index,
+    _bucket_upper,
+)
+
+
+def test_buckets_are_contiguous_and_precise():
+    previous_upper = -1
+    for index in range(BUCKET_COUNT):
+        upper = _bucket_upper(index)
+        assert upper > previous_upper
+        assert _bucket_index(previous_upper + 1) == index
+        assert _bucket_index(upper) == index
+        lower = previous_upper + 1
+        assert upper - lower <= max(lower, 1) / 32  # ~3% relative precision
+        previous_upper = upper
+    assert previous_upper == MAX_VALUE
+
+
+def test_percentiles_match_exact_order_statistics():
+    rng = random.Random(15)
+    values = [int(rng.lognormvariate(11, 1.5)) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = ordered[int(q * len(values) + 0.999999) - 1]
+        reported = histogram.percentile(q)
+        assert exact <= reported <= exact * 1.04
+    assert histogram.percentile(1.0) == max(values)
+    assert histogram.count == len(values)
+    assert histogram.total_ns == sum(values)
+
+
+def test_prometheus_histogram_is_cumulative():
+    metrics = StageMetrics()
+    for ns in (5_000, 40_000, 40_000, 2_000_000, 80_000_000_000):
+        times = StageTimes()
+        times.add("score", ns)
+        metrics.record(times)
+
+    lines = metrics.prometheus().splitlines()
+    buckets = [line for line in lines if line.startswith('virality_stage_duration_seconds_bucket{stage="score"')]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+    assert buckets[-1].endswith('le="+Inf"} 5')
+    assert 'virality_stage_duration_seconds_bucket{stage="score",le="5e-05"} 3' in lines
+    assert 'virality_stage_duration_seconds_count{stage="score"} 5' in lines
+    assert any(line.startswith('virality_stage_latency_seconds{stage="score",quantile="0.5"}') for line in lines)
+
+
+def test_server_timing_header_and_metrics_endpoint(monkeypatch):
+    monkeypatch.setattr(analyze, "TIMING_ENABLED", True)
+    client = TestClient(main.app)
+
+    response = client.post("/api/analyze", json={"content": "What do you think about AI? 🚀"})
+    stages = dict(entry.split(";dur=") for entry in response.headers["server-timing"].split(", "))
+    assert {"cache", "executor", "validate", "serialize", "total"} <= set(stages)
+    assert all(float(duration) >= 0 for duration in stages.values())
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'virality_stage_duration_seconds_count{stage="total"}' in metrics.text
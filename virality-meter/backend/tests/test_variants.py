@@ -0,0 +1,63 @@
+"""
+Draft variants: every rewrite must score exactly like analyzing its text from scratch.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import golden
+import main
+from services.executor import score_draft
+from services.variants import sentence_case, trim_hashtags, variant_generator
+
+
+@pytest.mark.parametrize("draft", golden.api_drafts(60, seed=19))
+def test_variants_score_like_a_full_analysis(draft):
+    content, has_media, media_type = draft["content"], draft["has_media"], draft["media_type"]
+    variant_set = variant_generator.generate(content, has_media, media_type, 0)
+    result = variant_set.result
+
+    assert result.final_scores[0] == score_draft(content, has_media, media_type, 0).final_score
+    for variant in variant_set.variants:
+        expected = score_draft(variant.content, has_media, media_type, 0)
+        assert result.features[variant.row] == expected.features
+        assert result.signal_scores[variant.row].tolist() == list(expected.signals.scores)
+        assert result.final_scores[variant.row] == expected.final_score
+
+    scores = [result.final_scores[variant.row] for variant in variant_set.variants]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_rewrites():
+    content = "Nice #a #b  #c and #d"
+    edits = trim_hashtags(content)
+    for start, end, text in edits:
+        content = content[:start] + text + content[end:]
+    assert content == "Nice #a #b and"
+    assert trim_hashtags("#one #two") is None
+    assert sentence_case("THIS IS HUGE. REALLY! OK") == [(0, 24, "This is huge. Really! Ok")]
+    assert sentence_case("Already fine.") is None
+    # Links, handles, hashtags and "I" keep their case, even at a sentence start
+    for content, expected in [
+        ("READ THIS https://x.com/AbC_123 BY @ElonMusk. I AM SURE #AI",
+         "Read this https://x.com/AbC_123 by @ElonMusk. I am sure #AI"),
+        ("WOW. https://x.com/AbC IS WILD. #BuildInPublic FTW, I'M IN",
+         "Wow. https://x.com/AbC is wild. #BuildInPublic ftw, I'm in"),
+        # 'İ' lowercases to two characters, shifting the kept spans
+        ("İSTANBUL IS GREAT. @BigCity AGREES", "I\u0307stanbul is great. @BigCity agrees"),
+    ]:
+        assert sentence_case(content) == [(0, len(content), expected)]
+    assert sentence_case("@ElonMusk #AI https://x.com/AbC I") is None
+
+
+def test_variants_endpoint():
+    client = TestClient(main.app)
+    response = client.post("/api/analyze/variants", json={"content": "I shipped a new feature today"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == len(body["variants"]) > 0
+    assert {variant["kind"] for variant in body["variants"]} >= {"add_question", "add_hook", "add_cta"}
+    for variant in body["variants"]:
+        analyzed = client.post("/api/analyze", json={"content": variant["content"]}).json()
+        assert variant["score"] == analyzed["score"]
+        assert variant["score_delta"] == variant["score"] - body["score"]